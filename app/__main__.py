@@ -1,16 +1,16 @@
-"""CLI entry point"""
+"""CLI entry point
+
+Commands import their integrations when they run, so `--help` and argument
+errors stay fast and never need database credentials.
+"""
 import click
 import asyncio
-from app.integrations.fec_client import FECClient
-from app.integrations.states.api.wa_pdc import WAPDCClient
-from app.utils.logging import setup_logging
-
-setup_logging()
 
 @click.group()
 def cli():
     """Ampersand Candidate Tracker CLI"""
-    pass
+    from app.utils.logging import setup_logging
+    setup_logging()
 
 @cli.command()
 def fec_backfill_initial():
@@ -23,16 +23,165 @@ def state_ingest(state):
     """Run state ingestion"""
     asyncio.run(_state_ingest(state))
 
+@cli.command()
+@click.option("--backfill", is_flag=True, help="Full FEC backfill instead of an incremental sync")
+def pipeline(backfill):
+    """Run the full ingestion pipeline as a Prefect flow"""
+    from app.flows.ingestion import full_pipeline_flow
+    asyncio.run(full_pipeline_flow(backfill=backfill))
+
+@cli.command()
+def push_flush():
+    """Deliver pending candidate changes to the enabled push destinations"""
+    asyncio.run(_push_flush())
+
+@cli.command()
+@click.option("--state", multiple=True, help="Only rebuild these states (repeatable)")
+@click.option("--cycle", type=int, help="Election cycle (defaults to the first backfill cycle)")
+def seat_profiles(state, cycle):
+    """Rebuild seat profiles from local results and calendar files"""
+    asyncio.run(_seat_profiles(list(state) or None, cycle))
+
+@cli.command()
+@click.option("--full", is_flag=True, help="Recompute every jurisdiction instead of those with new filings")
+@click.option("--cycle", type=int, help="Cycle to aggregate (defaults to the last completed cycle)")
+def jurisdiction_spend(full, cycle):
+    """Update avg/median/high spend in jurisdiction_profiles"""
+    asyncio.run(_jurisdiction_spend(full, cycle))
+
+@cli.command()
+@click.option("--source", multiple=True, help="Only ingest these sources from config/signal_sources.yml (repeatable)")
+def ingest_signals(source):
+    """Ingest posts by known candidate accounts into the signals triage queue"""
+    asyncio.run(_ingest_signals(list(source) or None))
+
+@cli.command()
+@click.option("--refresh", is_flag=True, help="Re-check candidates that already have an occupation")
+@click.option("--limit", type=int, help="Only process this many candidates")
+def extract_documents(refresh, limit):
+    """Fill occupation/current_position/bio_summary from FEC Form 2 and Form 1 documents"""
+    asyncio.run(_extract_documents(refresh, limit))
+
+@cli.command()
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+def load_contributions(paths):
+    """Load Schedule A/B itemizations from .fec files or directories into contributions"""
+    asyncio.run(_load_contributions(list(paths) or None))
+
+@cli.command()
+@click.option("--skip-archive", is_flag=True, help="Only create upcoming partitions")
+@click.option("--dry-run", is_flag=True, help="List closed partitions without archiving them")
+def maintain_partitions(skip_archive, dry_run):
+    """Create upcoming partitions of filings/media_mentions/signals and archive closed ones to Parquet"""
+    asyncio.run(_maintain_partitions(skip_archive, dry_run))
+
+@cli.command()
+@click.option("--cycle", "cycles", type=int, multiple=True, help="Only this cycle (repeatable)")
+@click.option("--deep", is_flag=True, help="Fetch every non-empty state bucket, not only mismatched ones")
+@click.option("--apply", is_flag=True, help="Upsert missing and changed candidates")
+def reconcile(cycles, deep, apply):
+    """Diff our FEC candidates against FEC by state x office bucket"""
+    asyncio.run(_reconcile(list(cycles) or None, deep, apply))
+
+@cli.command()
+@click.option("--source", help="Only this source, e.g. fec")
+@click.option("--endpoint", help="Only this endpoint, e.g. candidates")
+@click.option("--since", help="First day to replay (YYYY-MM-DD)")
+@click.option("--until", help="Last day to replay (YYYY-MM-DD)")
+@click.option("--dry-run", is_flag=True, help="Count what would be written without writing it")
+def replay_landing(source, endpoint, since, until, dry_run):
+    """Re-run transform and load from landed raw API payloads, without calling the API"""
+    asyncio.run(_replay_landing(source, endpoint, since, until, dry_run))
+
+@cli.command()
+@click.option("--days", type=int, help="Keep this many days (default: LANDING_RETENTION_DAYS)")
+def prune_landing(days):
+    """Remove landed raw payloads older than the retention"""
+    from app.landing import landing_zone
+    print(landing_zone.prune(days))
+
+@cli.command()
+@click.option("--status", "show_status", is_flag=True, help="List migrations and whether each is applied")
+@click.option("--to", "target", type=int, help="Only apply migrations up to this version")
+def migrate(show_status, target):
+    """Apply pending database migrations (schema.sql, then app/db/migrations)"""
+    asyncio.run(_migrate(show_status, target))
+
+@cli.command()
+def check_query_plans():
+    """EXPLAIN the hot queries and fail if any reads a table with a sequential scan"""
+    if not asyncio.run(_check_query_plans()):
+        raise SystemExit(1)
+
 async def _fec_backfill():
+    from app.integrations.fec_client import FECClient
     client = FECClient()
     await client.backfill_initial()
 
 async def _state_ingest(state_code):
-    if state_code == "WA":
-        client = WAPDCClient()
+    from app.integrations.states import get_jurisdiction_client, load_jurisdictions
+    jurisdiction = next((j for j in load_jurisdictions(enabled_only=False) if j["id"] == state_code), None)
+    client = get_jurisdiction_client(jurisdiction) if jurisdiction else None
+    if client:
         await client.ingest_all()
     else:
         print(f"State {state_code} not implemented yet")
 
+async def _push_flush():
+    from app.integrations.push import push_dispatcher
+    print(await push_dispatcher.flush())
+
+async def _seat_profiles(states, cycle):
+    from app.pipelines.seats import build_seat_profiles
+    print(await build_seat_profiles(states, cycle))
+
+async def _jurisdiction_spend(full, cycle):
+    from app.pipelines.spend import update_jurisdiction_spend
+    print(await update_jurisdiction_spend(full, cycle))
+
+async def _extract_documents(refresh, limit):
+    from app.pipelines.fec_documents import extract_candidate_documents
+    print(await extract_candidate_documents(refresh, limit))
+
+async def _load_contributions(paths):
+    from app.pipelines.contributions import load_contributions
+    print(await load_contributions(paths))
+
+async def _ingest_signals(sources):
+    from app.pipelines.signals import ingest_signals
+    print(await ingest_signals(sources))
+
+async def _maintain_partitions(skip_archive, dry_run):
+    from app.pipelines.archive import archive_partitions, maintain_partitions
+    if dry_run:
+        print(await archive_partitions(dry_run=True))
+    else:
+        print(await maintain_partitions(archive=not skip_archive))
+
+async def _reconcile(cycles, deep, apply):
+    from app.pipelines.reconcile import reconcile_candidates
+    print(await reconcile_candidates(cycles, deep, apply))
+
+async def _replay_landing(source, endpoint, since, until, dry_run):
+    from app.landing.replay import replay_landing
+    print(await replay_landing(source, endpoint, since, until, dry_run))
+
+async def _migrate(show_status, target):
+    from app.db.migrate import migration_status, run_migrations
+    if show_status:
+        for m in await migration_status():
+            state = m["applied_at"] or "pending"
+            print(f"{m['version']:04d} {m['name']:<32} {state}{' (file changed)' if m['changed'] else ''}")
+    else:
+        print({"applied": await run_migrations(target)})
+
+async def _check_query_plans():
+    from app.db.query_plans import check_query_plans
+    results = await check_query_plans()
+    for r in results:
+        detail = ", ".join(r["indexes"]) if r["ok"] else f"Seq Scan on {', '.join(r['seq_scans'])}"
+        print(f"{'ok  ' if r['ok'] else 'FAIL'} {r['query']:<32} {detail}")
+    return all(r["ok"] for r in results)
+
 if __name__ == "__main__":
     cli()
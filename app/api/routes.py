@@ -1,325 +1,256 @@
 """FastAPI routes - Final with Fill Gaps Endpoint"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 import httpx
+import json
 import os
+from app.config import settings
+from app.db.changes import wait_for_changes
 from app.db.client import db
+from app.db import search as search_queries
+from app.db import signals as signal_queries
+from app.graph.committees import committee_graph
+from app.integrations.push import push_dispatcher
+from app.jobs.manager import job_manager, QueueFullError
+from app.landing import landing_zone
+from app.models.common import SharedVia, SignalStatus
+from app.models.records import candidate_batch
+from app.models.signals import SignalTriage
+from app.pipelines import fec as fec_pipeline
+from app.utils.cache import cached_route, invalidates, route_cache_stats
+from app.utils.health import health_monitor
+from app.utils.http import get_http_client, http_clients
+from app.utils.metrics import registry
 import asyncio
 
 router = APIRouter()
 
+@router.get("/livez")
+async def liveness():
+    """Liveness probe: the process serves requests and its health monitor is running"""
+    if not health_monitor.alive:
+        return JSONResponse({"status": "dead", "reason": "health monitor stopped"}, status_code=503)
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness():
+    """Readiness probe from the last background dependency checks; 503 until they pass"""
+    snapshot = health_monitor.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
 @router.get("/healthz")
 async def health_check():
-    """Health check endpoint"""
-    try:
-        result = db.supabase.table('candidates').select("count", count='exact').execute()
-        candidate_count = result.count if hasattr(result, 'count') else 0
-        db_status = "connected"
-    except Exception as e:
-        candidate_count = 0
-        db_status = f"error: {str(e)}"
-    
+    """Health check endpoint; counts moved to /stats"""
+    snapshot = health_monitor.snapshot()
+    supabase = snapshot["checks"].get("supabase")
     return {
-        "status": "healthy",
+        "status": "healthy" if snapshot["ready"] else snapshot["status"],
         "version": "3.0.0-final",
         "timestamp": datetime.utcnow().isoformat(),
         "database": {
-            "status": db_status,
-            "candidate_count": candidate_count
-        }
+            "status": "connected" if supabase and supabase["status"] != "down" else
+            (f"error: {supabase.get('error')}" if supabase else "unknown")
+        },
+        "checks": snapshot["checks"],
     }
 
 
-@router.get("/collect-all-pages-fill-gaps")
-async def collect_all_pages_fill_gaps():
-    """
-    Collect ALL pages 1-12 from FEC. 
-    Skips duplicates automatically.
-    Fills any gaps in our collection.
-    """
-    fec_api_key = os.environ.get('FEC_API_KEY')
-    if not fec_api_key:
-        return {"error": "FEC_API_KEY not configured"}
-    
-    candidates_found = 0
-    candidates_stored = 0
-    pages_with_new_data = []
-    
+@router.get("/stats")
+@cached_route("stats", ttl=60, tags=("candidates", "committees", "filings"))
+async def stats():
+    """Exact row counts of the main tables"""
     try:
-        base_url = "https://api.open.fec.gov/v1/candidates/"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Go through ALL 12 pages
-            for page in range(1, 13):  # Pages 1-12
-                try:
-                    params = {
-                        "api_key": fec_api_key,
-                        "election_year": 2026,
-                        "office": "H",
-                        "party": "DEM",
-                        "per_page": 100,
-                        "page": page,
-                        "sort": "name"
-                    }
-                    
-                    await asyncio.sleep(0.5)  # Rate limit protection
-                    
-                    response = await client.get(base_url, params=params)
-                    
-                    if response.status_code != 200:
-                        continue
-                    
-                    data = response.json()
-                    candidates = data.get('results', [])
-                    candidates_found += len(candidates)
-                    
-                    stored_this_page = 0
-                    for candidate in candidates:
-                        try:
-                            candidate_record = {
-                                'full_name': candidate.get('name'),
-                                'party': 'Democratic',
-                                'jurisdiction_type': 'federal',
-                                'jurisdiction_name': 'United States',
-                                'state': candidate.get('state'),
-                                'office': 'House',
-                                'district': candidate.get('district'),
-                                'election_cycle': 2026,
-                                'status': candidate.get('candidate_status'),
-                                'incumbent': candidate.get('incumbent_challenge') == 'I',
-                                'source_url': f"https://www.fec.gov/data/candidate/{candidate.get('candidate_id')}/",
-                                'source_candidate_ID': candidate.get('candidate_id'),
-                                'source_system': 'fec'
-                            }
-                            
-                            result = db.supabase.table('candidates').insert(candidate_record).execute()
-                            
-                            if result.data:
-                                stored_this_page += 1
-                                
-                        except:
-                            # Skip duplicates
-                            continue
-                    
-                    if stored_this_page > 0:
-                        pages_with_new_data.append(f"Page {page}: +{stored_this_page}")
-                    
-                    candidates_stored += stored_this_page
-                    
-                except Exception as e:
-                    continue
-        
-        # Get final count
-        count_result = db.supabase.table('candidates').select("count", count='exact').execute()
-        final_count = count_result.count if hasattr(count_result, 'count') else 0
-        
-        return {
-            "status": "completed",
-            "fec_candidates_checked": candidates_found,
-            "new_candidates_added": candidates_stored,
-            "pages_with_new_data": pages_with_new_data,
-            "database_count_after": final_count,
-            "target": 1159,
-            "remaining_gap": 1159 - final_count if final_count < 1159 else 0
-        }
-        
+        counts = await asyncio.to_thread(_table_counts, ("candidates", "committees", "filings"))
+        return {"counts": counts, "timestamp": datetime.utcnow().isoformat()}
     except Exception as e:
         return {"error": str(e)}
 
 
+def _table_counts(tables) -> dict:
+    counts = {}
+    for table in tables:
+        result = db.supabase.table(table).select("count", count='exact').execute()
+        counts[table] = result.count if hasattr(result, 'count') else 0
+    return counts
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/http-stats")
+async def http_stats():
+    """Connection reuse and concurrency counters for the shared HTTP client"""
+    return {"hosts": http_clients.stats()}
+
+
+@router.get("/cache-stats")
+async def cache_stats():
+    """Hit rates, sizes and coalesced misses of the in-process response caches"""
+    return {"routes": route_cache_stats(), "search": search_queries.get_search_cache().stats()}
+
+
+@router.get("/collect-all-pages-fill-gaps", status_code=202)
+async def collect_all_pages_fill_gaps(resume: bool = True):
+    """
+    Queue a collection of every page of every configured cycle/office/party
+    FEC search. Skips candidates we already have, and resumes the last
+    unfinished run from its checkpoints unless resume=false. POST /reconcile
+    finds gaps without walking every page. Kept for existing callers; same
+    job as POST /collect-all-pages-fill-gaps.
+    """
+    return _enqueue("collect-all-pages-fill-gaps", resume=resume)
+
+
 @router.get("/count-and-check-duplicates")
+@cached_route("count-and-check-duplicates", ttl=60, tags=("candidates",))
 async def count_and_check_duplicates():
     """Get accurate count and check for duplicate FEC IDs"""
     try:
-        count_result = db.supabase.table('candidates').select("count", count='exact').execute()
-        total_count = count_result.count if hasattr(count_result, 'count') else 0
-        
-        all_records = []
-        page_size = 1000
-        offset = 0
-        
-        while True:
-            result = db.supabase.table('candidates')\
-                .select("source_candidate_ID, candidate_id")\
-                .range(offset, offset + page_size - 1)\
-                .execute()
-            
-            if not result.data:
-                break
-                
-            all_records.extend(result.data)
-            
-            if len(result.data) < page_size:
-                break
-                
-            offset += page_size
-        
-        fec_ids = {}
-        duplicates = []
-        
-        for record in all_records:
-            fec_id = record.get('source_candidate_ID')
-            if fec_id:
-                if fec_id in fec_ids:
-                    duplicates.append({
-                        "fec_id": fec_id,
-                        "database_ids": [fec_ids[fec_id], record.get('candidate_id')]
-                    })
-                else:
-                    fec_ids[fec_id] = record.get('candidate_id')
-        
-        return {
-            "total_candidates_in_database": total_count,
-            "unique_fec_ids": len(fec_ids),
-            "duplicates_found": len(duplicates),
-            "duplicate_examples": duplicates[:5] if duplicates else None,
-            "verdict": "✓ No duplicates" if len(duplicates) == 0 else f"⚠ {len(duplicates)} duplicates need removal"
-        }
-        
+        return await asyncio.to_thread(_duplicate_report)
     except Exception as e:
         return {"error": str(e)}
 
 
-@router.delete("/remove-duplicates")
+def _duplicate_report() -> dict:
+    count_result = db.supabase.table('candidates').select("count", count='exact').execute()
+    total_count = count_result.count if hasattr(count_result, 'count') else 0
+
+    records = db.scan('candidates', candidate_batch(["source_candidate_ID", "candidate_id"]))
+
+    fec_ids = {}
+    duplicates = []
+
+    candidate_ids = records.column('candidate_id')
+
+    # Remember row positions rather than ID strings; IDs are unpacked only for duplicates
+    for i, fec_id in enumerate(records.column('source_candidate_ID')):
+        if fec_id:
+            if fec_id in fec_ids:
+                duplicates.append({
+                    "fec_id": fec_id,
+                    "database_ids": [candidate_ids[fec_ids[fec_id]], candidate_ids[i]]
+                })
+            else:
+                fec_ids[fec_id] = i
+
+    return {
+        "total_candidates_in_database": total_count,
+        "unique_fec_ids": len(fec_ids),
+        "duplicates_found": len(duplicates),
+        "duplicate_examples": duplicates[:5] if duplicates else None,
+        "verdict": "✓ No duplicates" if len(duplicates) == 0 else f"⚠ {len(duplicates)} duplicates need removal"
+    }
+
+
+@router.delete("/remove-duplicates", status_code=202)
 async def remove_duplicates():
-    """Remove duplicate candidates keeping oldest record for each FEC ID"""
-    try:
-        all_candidates = []
-        page_size = 1000
-        offset = 0
-        
-        while True:
-            result = db.supabase.table('candidates')\
-                .select("*")\
-                .order("created_at")\
-                .range(offset, offset + page_size - 1)\
-                .execute()
-            
-            if not result.data:
-                break
-                
-            all_candidates.extend(result.data)
-            
-            if len(result.data) < page_size:
-                break
-                
-            offset += page_size
-        
-        seen_fec_ids = set()
-        to_delete = []
-        
-        for candidate in all_candidates:
-            fec_id = candidate.get('source_candidate_ID')
-            if fec_id:
-                if fec_id in seen_fec_ids:
-                    to_delete.append(candidate.get('candidate_id'))
-                else:
-                    seen_fec_ids.add(fec_id)
-        
-        deleted_count = 0
-        for candidate_id in to_delete:
-            try:
-                db.supabase.table('candidates').delete().eq('candidate_id', candidate_id).execute()
-                deleted_count += 1
-            except:
-                continue
-        
-        count_result = db.supabase.table('candidates').select("count", count='exact').execute()
-        final_count = count_result.count if hasattr(count_result, 'count') else 0
-        
-        return {
-            "status": "completed",
-            "duplicates_removed": deleted_count,
-            "final_candidate_count": final_count,
-            "message": f"Removed {deleted_count} duplicate records"
-        }
-        
-    except Exception as e:
-        return {"error": str(e)}
+    """Queue removal of duplicate candidates, keeping the oldest record for each FEC ID; same job as POST"""
+    return _enqueue("remove-duplicates")
 
 
 @router.get("/verify-data")
+@cached_route("verify-data", ttl=300, tags=("candidates", "committees", "candidate_committees", "filings"))
 async def verify_data():
-    """Verify data quality"""
+    """Run the full-table data-quality rules and report violations per rule"""
     try:
-        count_result = db.supabase.table('candidates').select("count", count='exact').execute()
-        total_count = count_result.count if hasattr(count_result, 'count') else 0
-        
-        result = db.supabase.table('candidates').select("*").limit(100).execute()
-        sample = result.data if result.data else []
-        
-        all_records = []
-        page_size = 1000
-        offset = 0
-        
-        while True:
-            result = db.supabase.table('candidates')\
-                .select("state")\
-                .range(offset, offset + page_size - 1)\
-                .execute()
-            
-            if not result.data:
-                break
-                
-            all_records.extend(result.data)
-            
-            if len(result.data) < page_size:
-                break
-                
-            offset += page_size
-        
-        states = set(r.get('state') for r in all_records if r.get('state'))
-        
-        checks = {
-            "total_candidates": total_count,
-            "expected_total": 1159,
-            "match": "✓ PERFECT!" if total_count == 1159 else f"⚠ Off by {abs(total_count - 1159)}",
-            "all_2026_cycle": all(c.get('election_cycle') == 2026 for c in sample),
-            "all_house": all(c.get('office') == 'House' for c in sample),
-            "all_democrats": all(c.get('party') == 'Democratic' for c in sample),
-            "unique_states": len(states),
-            "states": sorted(list(states)),
-            "sample_records": sample[:2]
-        }
-        
-        if checks["all_2026_cycle"] and checks["all_house"] and checks["all_democrats"]:
-            checks["quality"] = "✓ Perfect"
-        else:
-            checks["quality"] = "⚠ Issues found"
+        # pandas is only imported when a check actually runs
+        from app.quality.rules import run_quality_checks
         
-        return checks
+        report = await run_quality_checks()
+        report["total_candidates"] = report["tables"].get("candidates", 0)
+        report["quality"] = "✓ Perfect" if not report["rules_failed"] else "⚠ Issues found"
+        return report
         
     except Exception as e:
         return {"error": str(e)}
 
 
 @router.get("/candidates")
+@cached_route("candidates", ttl=30, tags=("candidates",))
 async def get_candidates():
     """Get all candidates with summary stats"""
     try:
-        count_result = db.supabase.table('candidates').select("count", count='exact').execute()
-        total_count = count_result.count if hasattr(count_result, 'count') else 0
-        
-        result = db.supabase.table('candidates').select("*").limit(5).execute()
-        sample = result.data if result.data else []
-        
-        state_result = db.supabase.table('candidates').select("state").limit(2000).execute()
-        states = {}
-        for record in state_result.data if state_result.data else []:
-            state = record.get('state', 'Unknown')
-            states[state] = states.get(state, 0) + 1
-        
-        return {
-            "total_candidates": total_count,
-            "by_state": dict(sorted(states.items())),
-            "sample_candidates": sample
-        }
-        
+        return await asyncio.to_thread(_candidates_summary)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _candidates_summary() -> dict:
+    count_result = db.supabase.table('candidates').select("count", count='exact').execute()
+    total_count = count_result.count if hasattr(count_result, 'count') else 0
+
+    result = db.supabase.table('candidates').select("*").limit(5).execute()
+    sample = result.data if result.data else []
+
+    state_result = db.supabase.table('candidates').select("state").limit(2000).execute()
+    states = {}
+    for record in state_result.data if state_result.data else []:
+        state = record.get('state', 'Unknown')
+        states[state] = states.get(state, 0) + 1
+
+    return {
+        "total_candidates": total_count,
+        "by_state": dict(sorted(states.items())),
+        "sample_candidates": sample
+    }
+
+
+@router.get("/search")
+async def search(q: str = Query(..., max_length=200), limit: int = Query(10, ge=1, le=50), mentions: bool = True):
+    """Typeahead and typo-tolerant search over candidates and media mentions"""
+    try:
+        results = await asyncio.to_thread(search_queries.search, q, limit, mentions)
+        return {"query": q, "count": len(results), "results": results}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/graph/candidates/{candidate_id}")
+async def graph_neighborhood(candidate_id: UUID, depth: int = Query(1, ge=1, le=2), limit: int = Query(100, ge=1, le=1000)):
+    """A candidate's committees with roles, and at depth 2 the candidates linked through them"""
+    try:
+        result = await committee_graph.neighborhood(str(candidate_id), depth, limit)
+        return result if result is not None else {"error": "Candidate not found"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/graph/candidates/{candidate_id}/shared")
+async def graph_shared(candidate_id: UUID, via: SharedVia = SharedVia.COMMITTEE,
+                       role: Optional[str] = Query(None, max_length=100), limit: int = Query(50, ge=1, le=1000)):
+    """Candidates sharing a committee (e.g. role=leadership) or a treasurer with this one, most shared first"""
+    try:
+        result = await committee_graph.shared(str(candidate_id), via, role, limit)
+        return result if result is not None else {"error": "Candidate not found"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/graph/stats")
+async def graph_stats():
+    """Size and freshness of the in-memory committee graph"""
+    return committee_graph.stats()
+
+
+@router.post("/graph/refresh")
+async def graph_refresh(full: bool = False):
+    """Apply committee changes now, or reload the whole graph"""
+    try:
+        return await committee_graph.refresh(full)
     except Exception as e:
         return {"error": str(e)}
 
 
 @router.delete("/wipe-candidates")
+@invalidates("candidates")
 async def wipe_candidates():
     """DANGER: Delete all candidates"""
     try:
@@ -330,7 +261,7 @@ async def wipe_candidates():
 """Add these endpoints to your routes.py for updates and enrichment"""
 
 @router.get("/check-for-new-filings")
-async def check_for_new_filings():
+async def check_for_new_filings(client: httpx.AsyncClient = Depends(get_http_client)):
     """Check FEC for candidates we don't have yet"""
     fec_api_key = os.environ.get('FEC_API_KEY')
     if not fec_api_key:
@@ -338,61 +269,43 @@ async def check_for_new_filings():
     
     try:
         # Get our current FEC IDs
-        all_records = []
-        page_size = 1000
-        offset = 0
-        
-        while True:
-            result = db.supabase.table('candidates')\
-                .select("source_candidate_ID")\
-                .range(offset, offset + page_size - 1)\
-                .execute()
-            
-            if not result.data:
-                break
-            all_records.extend(result.data)
-            if len(result.data) < page_size:
-                break
-            offset += page_size
-        
-        our_fec_ids = set(r.get('source_candidate_ID') for r in all_records if r.get('source_candidate_ID'))
+        our_fec_ids = fec_pipeline.fetch_our_fec_ids()
         
         # Check FEC for total count
         base_url = "https://api.open.fec.gov/v1/candidates/"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            params = {
-                "api_key": fec_api_key,
-                "election_year": 2026,
-                "office": "H",
-                "party": "DEM",
-                "per_page": 100,
-                "page": 1
-            }
+        params = {
+            "api_key": fec_api_key,
+            "election_year": 2026,
+            "office": "H",
+            "party": "DEM",
+            "per_page": 100,
+            "page": 1
+        }
+        
+        response = await client.get(base_url, params=params)
+        data = response.json()
+        fec_total = data.get('pagination', {}).get('count', 0)
+        fec_pages = data.get('pagination', {}).get('pages', 0)
+        
+        # Quick scan for new candidates
+        new_candidates = []
+        for page in range(1, min(fec_pages + 1, 15)):
+            params['page'] = page
+            await asyncio.sleep(0.3)
             
             response = await client.get(base_url, params=params)
-            data = response.json()
-            fec_total = data.get('pagination', {}).get('count', 0)
-            fec_pages = data.get('pagination', {}).get('pages', 0)
+            candidates = response.json().get('results', [])
             
-            # Quick scan for new candidates
-            new_candidates = []
-            for page in range(1, min(fec_pages + 1, 15)):
-                params['page'] = page
-                await asyncio.sleep(0.3)
-                
-                response = await client.get(base_url, params=params)
-                candidates = response.json().get('results', [])
-                
-                for candidate in candidates:
-                    fec_id = candidate.get('candidate_id')
-                    if fec_id and fec_id not in our_fec_ids:
-                        new_candidates.append({
-                            'fec_id': fec_id,
-                            'name': candidate.get('name'),
-                            'state': candidate.get('state'),
-                            'district': candidate.get('district')
-                        })
+            for candidate in candidates:
+                fec_id = candidate.get('candidate_id')
+                if fec_id and fec_id not in our_fec_ids:
+                    new_candidates.append({
+                        'fec_id': fec_id,
+                        'name': candidate.get('name'),
+                        'state': candidate.get('state'),
+                        'district': candidate.get('district')
+                    })
         
         return {
             "we_have": len(our_fec_ids),
@@ -406,183 +319,23 @@ async def check_for_new_filings():
         return {"error": str(e)}
 
 
-@router.get("/collect-new-filings")
+@router.get("/collect-new-filings", status_code=202)
 async def collect_new_filings():
-    """Collect ONLY new candidates we don't have yet"""
-    fec_api_key = os.environ.get('FEC_API_KEY')
-    if not fec_api_key:
-        return {"error": "FEC_API_KEY not configured"}
-    
-    try:
-        # Get our current FEC IDs
-        all_records = []
-        page_size = 1000
-        offset = 0
-        
-        while True:
-            result = db.supabase.table('candidates')\
-                .select("source_candidate_ID")\
-                .range(offset, offset + page_size - 1)\
-                .execute()
-            
-            if not result.data:
-                break
-            all_records.extend(result.data)
-            if len(result.data) < page_size:
-                break
-            offset += page_size
-        
-        our_fec_ids = set(r.get('source_candidate_ID') for r in all_records if r.get('source_candidate_ID'))
-        
-        # Collect new candidates
-        base_url = "https://api.open.fec.gov/v1/candidates/"
-        new_stored = 0
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for page in range(1, 15):
-                params = {
-                    "api_key": fec_api_key,
-                    "election_year": 2026,
-                    "office": "H",
-                    "party": "DEM",
-                    "per_page": 100,
-                    "page": page
-                }
-                
-                await asyncio.sleep(0.3)
-                response = await client.get(base_url, params=params)
-                candidates = response.json().get('results', [])
-                
-                if not candidates:
-                    break
-                
-                for candidate in candidates:
-                    fec_id = candidate.get('candidate_id')
-                    if not fec_id or fec_id in our_fec_ids:
-                        continue
-                    
-                    try:
-                        candidate_record = {
-                            'full_name': candidate.get('name'),
-                            'party': 'Democratic',
-                            'jurisdiction_type': 'federal',
-                            'jurisdiction_name': 'United States',
-                            'state': candidate.get('state'),
-                            'office': 'House',
-                            'district': candidate.get('district'),
-                            'election_cycle': 2026,
-                            'status': candidate.get('candidate_status'),
-                            'incumbent': candidate.get('incumbent_challenge') == 'I',
-                            'source_url': f"https://www.fec.gov/data/candidate/{fec_id}/",
-                            'source_candidate_ID': fec_id,
-                            'source_system': 'fec'
-                        }
-                        
-                        result = db.supabase.table('candidates').insert(candidate_record).execute()
-                        
-                        if result.data:
-                            new_stored += 1
-                            our_fec_ids.add(fec_id)  # Track to avoid duplicates in same run
-                            
-                    except:
-                        continue
-        
-        # Get final count
-        count_result = db.supabase.table('candidates').select("count", count='exact').execute()
-        final_count = count_result.count if hasattr(count_result, 'count') else 0
-        
-        return {
-            "status": "completed",
-            "new_candidates_added": new_stored,
-            "total_candidates_now": final_count,
-            "message": f"Added {new_stored} new filings. Database now has {final_count} candidates."
-        }
-        
-    except Exception as e:
-        return {"error": str(e)}
+    """Queue collection of ONLY new candidates we don't have yet; same job as POST"""
+    return _enqueue("collect-new-filings")
 
 
-@router.get("/enrich-committee-ids")
+@router.get("/enrich-committee-ids", status_code=202)
 async def enrich_committee_ids():
     """
-    Enrich candidates with their committee IDs from FEC.
-    Can run in background - takes 5-10 minutes for 1000+ candidates.
+    Queue one batch of committee ID enrichment from FEC.
+    POST /enrich-committee-ids runs several batches.
     """
-    fec_api_key = os.environ.get('FEC_API_KEY')
-    if not fec_api_key:
-        return {"error": "FEC_API_KEY not configured"}
-    
-    try:
-        # Get candidates without committee IDs
-        result = db.supabase.table('candidates')\
-            .select("candidate_id, source_candidate_ID, full_name")\
-            .is_('committee_id', 'null')\
-            .limit(200)\
-            .execute()
-        
-        candidates_to_enrich = result.data if result.data else []
-        
-        if not candidates_to_enrich:
-            return {
-                "status": "complete",
-                "message": "All candidates already have committee IDs"
-            }
-        
-        enriched = 0
-        base_url = "https://api.open.fec.gov/v1/candidate/{candidate_id}/committees/"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for candidate in candidates_to_enrich[:100]:  # Process 100 at a time
-                fec_id = candidate.get('source_candidate_ID')
-                if not fec_id:
-                    continue
-                
-                try:
-                    url = base_url.format(candidate_id=fec_id)
-                    params = {"api_key": fec_api_key}
-                    
-                    await asyncio.sleep(0.2)  # Rate limit
-                    
-                    response = await client.get(url, params=params)
-                    if response.status_code != 200:
-                        continue
-                    
-                    data = response.json()
-                    committees = data.get('results', [])
-                    
-                    # Get the most recent committee
-                    if committees:
-                        committee_id = committees[0].get('committee_id')
-                        
-                        if committee_id:
-                            db.supabase.table('candidates')\
-                                .update({'committee_id': committee_id})\
-                                .eq('candidate_id', candidate.get('candidate_id'))\
-                                .execute()
-                            enriched += 1
-                            
-                except:
-                    continue
-        
-        # Check remaining
-        remaining_result = db.supabase.table('candidates')\
-            .select("count", count='exact')\
-            .is_('committee_id', 'null')\
-            .execute()
-        remaining = remaining_result.count if hasattr(remaining_result, 'count') else 0
-        
-        return {
-            "status": "partial" if remaining > 0 else "complete",
-            "enriched_this_run": enriched,
-            "remaining_without_committees": remaining,
-            "message": f"Enriched {enriched} candidates. Run again to continue." if remaining > 0 else "All candidates enriched!"
-        }
-        
-    except Exception as e:
-        return {"error": str(e)}
+    return _enqueue("enrich-committee-ids", max_batches=1)
 
 
 @router.get("/enrichment-status")
+@cached_route("enrichment-status", ttl=15, tags=("candidates",))
 async def enrichment_status():
     """Check enrichment progress"""
     try:
@@ -617,14 +370,14 @@ async def enrichment_status():
                     "percent": round(with_occupations / total * 100, 1) if total > 0 else 0
                 }
             },
-            "next_action": "Run /enrich-committee-ids to start enrichment"
+            "next_action": "Run /enrich-committee-ids, then POST /extract-candidate-documents for occupations"
         }
         
     except Exception as e:
         return {"error": str(e)}
 
 @router.get("/explore-occupation-data")
-async def explore_occupation_data():
+async def explore_occupation_data(client: httpx.AsyncClient = Depends(get_http_client)):
     """Check what occupation data FEC provides for our candidates"""
     fec_api_key = os.environ.get('FEC_API_KEY')
     if not fec_api_key:
@@ -645,78 +398,77 @@ async def explore_occupation_data():
         
         findings = []
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for candidate in test_candidates:
-                fec_id = candidate.get('source_candidate_ID')
-                committee_id = candidate.get('committee_id')
-                
-                candidate_data = {}
-                committee_data = {}
-                filing_data = {}
-                
-                # Check 1: Candidate endpoint
-                try:
-                    url = f"https://api.open.fec.gov/v1/candidate/{fec_id}/"
-                    response = await client.get(url, params={"api_key": fec_api_key})
-                    if response.status_code == 200:
-                        data = response.json().get('results', [{}])[0]
-                        candidate_data = {
-                            "has_occupation": 'occupation' in data,
-                            "occupation": data.get('occupation'),
-                            "other_fields": list(data.keys())[:10]
-                        }
-                except:
-                    candidate_data = {"error": "Failed to fetch"}
-                
-                await asyncio.sleep(0.3)
-                
-                # Check 2: Committee endpoint
-                try:
-                    url = f"https://api.open.fec.gov/v1/committee/{committee_id}/"
-                    response = await client.get(url, params={"api_key": fec_api_key})
-                    if response.status_code == 200:
-                        data = response.json().get('results', [{}])[0]
-                        committee_data = {
-                            "has_candidate_info": 'candidate_ids' in data,
-                            "treasurer_name": data.get('treasurer_name'),
-                            "other_fields": list(data.keys())[:10]
-                        }
-                except:
-                    committee_data = {"error": "Failed to fetch"}
-                
-                await asyncio.sleep(0.3)
-                
-                # Check 3: Form 1 filings
-                try:
-                    url = "https://api.open.fec.gov/v1/filings/"
-                    params = {
-                        "api_key": fec_api_key,
-                        "committee_id": committee_id,
-                        "form_type": "F1"
+        for candidate in test_candidates:
+            fec_id = candidate.get('source_candidate_ID')
+            committee_id = candidate.get('committee_id')
+            
+            candidate_data = {}
+            committee_data = {}
+            filing_data = {}
+            
+            # Check 1: Candidate endpoint
+            try:
+                url = f"https://api.open.fec.gov/v1/candidate/{fec_id}/"
+                response = await client.get(url, params={"api_key": fec_api_key})
+                if response.status_code == 200:
+                    data = response.json().get('results', [{}])[0]
+                    candidate_data = {
+                        "has_occupation": 'occupation' in data,
+                        "occupation": data.get('occupation'),
+                        "other_fields": list(data.keys())[:10]
                     }
-                    response = await client.get(url, params=params)
-                    if response.status_code == 200:
-                        filings = response.json().get('results', [])
-                        if filings:
-                            latest = filings[0]
-                            filing_data = {
-                                "has_f1_filing": True,
-                                "filing_fields": list(latest.keys())[:15],
-                                "sample_data": {k: latest.get(k) for k in ['candidate_name', 'office', 'state'] if k in latest}
-                            }
-                        else:
-                            filing_data = {"has_f1_filing": False}
-                except:
-                    filing_data = {"error": "Failed to fetch"}
-                
-                findings.append({
-                    "name": candidate.get('full_name'),
-                    "fec_id": fec_id,
+            except:
+                candidate_data = {"error": "Failed to fetch"}
+            
+            await asyncio.sleep(0.3)
+            
+            # Check 2: Committee endpoint
+            try:
+                url = f"https://api.open.fec.gov/v1/committee/{committee_id}/"
+                response = await client.get(url, params={"api_key": fec_api_key})
+                if response.status_code == 200:
+                    data = response.json().get('results', [{}])[0]
+                    committee_data = {
+                        "has_candidate_info": 'candidate_ids' in data,
+                        "treasurer_name": data.get('treasurer_name'),
+                        "other_fields": list(data.keys())[:10]
+                    }
+            except:
+                committee_data = {"error": "Failed to fetch"}
+            
+            await asyncio.sleep(0.3)
+            
+            # Check 3: Form 1 filings
+            try:
+                url = "https://api.open.fec.gov/v1/filings/"
+                params = {
+                    "api_key": fec_api_key,
                     "committee_id": committee_id,
-                    "candidate_endpoint": candidate_data,
-                    "committee_endpoint": committee_data,
-                    "form1_filings": filing_data
-                })
+                    "form_type": "F1"
+                }
+                response = await client.get(url, params=params)
+                if response.status_code == 200:
+                    filings = response.json().get('results', [])
+                    if filings:
+                        latest = filings[0]
+                        filing_data = {
+                            "has_f1_filing": True,
+                            "filing_fields": list(latest.keys())[:15],
+                            "sample_data": {k: latest.get(k) for k in ['candidate_name', 'office', 'state'] if k in latest}
+                        }
+                    else:
+                        filing_data = {"has_f1_filing": False}
+            except:
+                filing_data = {"error": "Failed to fetch"}
+            
+            findings.append({
+                "name": candidate.get('full_name'),
+                "fec_id": fec_id,
+                "committee_id": committee_id,
+                "candidate_endpoint": candidate_data,
+                "committee_endpoint": committee_data,
+                "form1_filings": filing_data
+            })
         
         return {
             "summary": "Exploring FEC data sources for occupation",
@@ -728,7 +480,7 @@ async def explore_occupation_data():
         return {"error": str(e)}
 
 @router.get("/explore-form2-html")
-async def explore_form2_html():
+async def explore_form2_html(client: httpx.AsyncClient = Depends(get_http_client)):
     """Check if Form 2 HTML page contains occupation data we can scrape"""
     
     try:
@@ -743,64 +495,63 @@ async def explore_form2_html():
         
         fec_api_key = os.environ.get('FEC_API_KEY')
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for candidate in test_candidates:
-                fec_id = candidate.get('source_candidate_ID')
-                
-                # First get the Form 2 filing to get html_url
-                url = "https://api.open.fec.gov/v1/filings/"
-                params = {
-                    "api_key": fec_api_key,
-                    "candidate_id": fec_id,
-                    "form_type": "F2"
-                }
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    filings = response.json().get('results', [])
-                    if filings and filings[0].get('html_url'):
-                        html_url = filings[0]['html_url']
-                        pdf_url = filings[0].get('pdf_url')
+        for candidate in test_candidates:
+            fec_id = candidate.get('source_candidate_ID')
+            
+            # First get the Form 2 filing to get html_url
+            url = "https://api.open.fec.gov/v1/filings/"
+            params = {
+                "api_key": fec_api_key,
+                "candidate_id": fec_id,
+                "form_type": "F2"
+            }
+            response = await client.get(url, params=params)
+            
+            if response.status_code == 200:
+                filings = response.json().get('results', [])
+                if filings and filings[0].get('html_url'):
+                    html_url = filings[0]['html_url']
+                    pdf_url = filings[0].get('pdf_url')
+                    
+                    # Fetch the HTML page
+                    try:
+                        html_response = await client.get(html_url)
+                        html_content = html_response.text
                         
-                        # Fetch the HTML page
-                        try:
-                            html_response = await client.get(html_url)
-                            html_content = html_response.text
-                            
-                            # Look for occupation-related content
-                            # Check if certain keywords appear
-                            has_occupation_keyword = 'occupation' in html_content.lower()
-                            has_employer_keyword = 'employer' in html_content.lower()
-                            
-                            # Get a snippet of the HTML for analysis
-                            # Find relevant section if it exists
-                            snippet = html_content[:3000] if len(html_content) > 3000 else html_content
-                            
-                            findings.append({
-                                "name": candidate.get('full_name'),
-                                "fec_id": fec_id,
-                                "html_url": html_url,
-                                "pdf_url": pdf_url,
-                                "html_length": len(html_content),
-                                "has_occupation_keyword": has_occupation_keyword,
-                                "has_employer_keyword": has_employer_keyword,
-                                "html_snippet": snippet
-                            })
-                        except Exception as e:
-                            findings.append({
-                                "name": candidate.get('full_name'),
-                                "fec_id": fec_id,
-                                "html_url": html_url,
-                                "error": f"Failed to fetch HTML: {str(e)}"
-                            })
-                    else:
+                        # Look for occupation-related content
+                        # Check if certain keywords appear
+                        has_occupation_keyword = 'occupation' in html_content.lower()
+                        has_employer_keyword = 'employer' in html_content.lower()
+                        
+                        # Get a snippet of the HTML for analysis
+                        # Find relevant section if it exists
+                        snippet = html_content[:3000] if len(html_content) > 3000 else html_content
+                        
+                        findings.append({
+                            "name": candidate.get('full_name'),
+                            "fec_id": fec_id,
+                            "html_url": html_url,
+                            "pdf_url": pdf_url,
+                            "html_length": len(html_content),
+                            "has_occupation_keyword": has_occupation_keyword,
+                            "has_employer_keyword": has_employer_keyword,
+                            "html_snippet": snippet
+                        })
+                    except Exception as e:
                         findings.append({
                             "name": candidate.get('full_name'),
                             "fec_id": fec_id,
-                            "note": "No html_url available"
+                            "html_url": html_url,
+                            "error": f"Failed to fetch HTML: {str(e)}"
                         })
-                
-                await asyncio.sleep(0.3)
+                else:
+                    findings.append({
+                        "name": candidate.get('full_name'),
+                        "fec_id": fec_id,
+                        "note": "No html_url available"
+                    })
+            
+            await asyncio.sleep(0.3)
         
         return {
             "summary": "Exploring Form 2 HTML pages for occupation data",
@@ -809,3 +560,232 @@ async def explore_form2_html():
         
     except Exception as e:
         return {"error": str(e)}
+
+
+def _enqueue(kind: str, **params):
+    """Queue a background job and describe it for the caller"""
+    try:
+        job, created = job_manager.enqueue(kind, params)
+    except QueueFullError as e:
+        return {"error": str(e)}
+
+    return {
+        "job_id": str(job.job_id),
+        "kind": job.kind,
+        "status": job.status.value,
+        "deduplicated": not created,
+        "status_url": f"/jobs/{job.job_id}"
+    }
+
+
+@router.post("/collect-all-pages-fill-gaps", status_code=202)
+async def enqueue_collect_all_pages_fill_gaps(resume: bool = True):
+    """Queue /collect-all-pages-fill-gaps as a background job"""
+    return _enqueue("collect-all-pages-fill-gaps", resume=resume)
+
+
+@router.post("/collect-new-filings", status_code=202)
+async def enqueue_collect_new_filings():
+    """Queue /collect-new-filings as a background job"""
+    return _enqueue("collect-new-filings")
+
+
+@router.post("/enrich-committee-ids", status_code=202)
+async def enqueue_enrich_committee_ids(max_batches: int = 20):
+    """Queue committee enrichment as a background job, running batches until done"""
+    return _enqueue("enrich-committee-ids", max_batches=max_batches)
+
+
+@router.post("/extract-candidate-documents", status_code=202)
+async def enqueue_extract_candidate_documents(refresh: bool = False, limit: Optional[int] = None):
+    """Queue occupation/bio extraction from F2/F1 documents; refresh=true re-checks candidates that have one"""
+    return _enqueue("extract-candidate-documents", refresh=refresh, limit=limit)
+
+
+@router.post("/remove-duplicates", status_code=202)
+async def enqueue_remove_duplicates():
+    """Queue duplicate removal as a background job"""
+    return _enqueue("remove-duplicates")
+
+
+@router.post("/seat-profiles/build", status_code=202)
+async def enqueue_build_seat_profiles(state: Optional[List[str]] = Query(None), cycle: Optional[int] = None):
+    """Queue a seat profile rebuild; repeat `state` to refresh only those states"""
+    return _enqueue("build-seat-profiles", states=sorted(s.upper() for s in state) if state else None,
+                    cycle=cycle)
+
+
+@router.post("/jurisdiction-spend/update", status_code=202)
+async def enqueue_update_jurisdiction_spend(full: bool = False, cycle: Optional[int] = None):
+    """Queue spend statistics for jurisdictions with new filings (or all of them with full=true)"""
+    return _enqueue("update-jurisdiction-spend", full=full, cycle=cycle)
+
+
+@router.post("/contributions/load", status_code=202)
+async def enqueue_load_contributions(path: Optional[List[str]] = Query(None)):
+    """Queue loading Schedule A/B itemizations from server-side .fec files (default: the efile directory)"""
+    return _enqueue("load-contributions", paths=sorted(path) if path else None)
+
+
+@router.post("/partitions/maintain", status_code=202)
+async def enqueue_maintain_partitions(archive: bool = True):
+    """Queue creating upcoming partitions and, unless archive=false, archiving closed ones to Parquet"""
+    return _enqueue("maintain-partitions", archive=archive)
+
+
+@router.post("/reconcile", status_code=202)
+async def enqueue_reconcile_candidates(cycle: Optional[List[int]] = Query(None), deep: bool = False,
+                                       apply: bool = False):
+    """Queue a bucketed diff of our FEC candidates against FEC; apply=true upserts missing and changed records"""
+    return _enqueue("reconcile-candidates", cycles=sorted(cycle) if cycle else None, deep=deep, apply=apply)
+
+
+@router.post("/landing/replay", status_code=202)
+async def enqueue_replay_landing(source: Optional[str] = None, endpoint: Optional[str] = None,
+                                 since: Optional[str] = None, until: Optional[str] = None, dry_run: bool = False):
+    """Queue re-running transform and load from landed raw payloads (days since..until), with no API calls"""
+    return _enqueue("replay-landing", source=source, endpoint=endpoint, since=since, until=until, dry_run=dry_run)
+
+
+@router.get("/landing/stats")
+async def landing_stats():
+    """Days, files and compressed bytes of landed raw payloads per source"""
+    try:
+        return landing_zone.stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.post("/signals/ingest", status_code=202)
+async def enqueue_ingest_signals(source: Optional[List[str]] = Query(None)):
+    """Queue signal ingestion; repeat `source` to read only those sources"""
+    return _enqueue("ingest-signals", sources=sorted(source) if source else None)
+
+
+@router.get("/signals")
+async def list_signals(status: SignalStatus = SignalStatus.NEW, limit: int = Query(50, ge=1, le=500),
+                       cursor: Optional[str] = None, candidate_id: Optional[UUID] = None):
+    """Signals awaiting review, newest first; pass next_cursor back to get the following page"""
+    try:
+        rows, next_cursor = signal_queries.list_signals(status, limit, cursor, candidate_id)
+        return {"signals": rows, "count": len(rows), "next_cursor": next_cursor}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/signals/stats")
+async def signal_stats():
+    """Signal counts by triage status"""
+    try:
+        return signal_queries.status_counts()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.post("/signals/triage")
+async def triage_signals(triage: SignalTriage):
+    """Move a batch of signals to a new triage status"""
+    try:
+        updated = signal_queries.set_status(triage.signal_ids, triage.status)
+        return {"updated": updated, "status": triage.status.value}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/jobs")
+async def list_jobs(limit: int = 50):
+    """Active and recent background jobs"""
+    try:
+        return {
+            "backlog": job_manager.backlog,
+            "jobs": [job.model_dump(mode="json") for job in job_manager.recent(limit)]
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: UUID):
+    """Status, progress and result of a background job"""
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return {"error": f"Job {job_id} not found"}
+        return job.model_dump(mode="json")
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: UUID):
+    """Cancel a queued job, or ask a running job to stop at its next checkpoint"""
+    try:
+        job = job_manager.cancel(job_id)
+        if job is None:
+            return {"error": f"Job {job_id} not found"}
+        return job.model_dump(mode="json")
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/changes")
+async def get_changes(since: int = 0, limit: int = 500, wait: float = 0):
+    """
+    Candidate changes with seq > since, oldest first.
+    With wait > 0 the request long-polls for up to that many seconds
+    until at least one change arrives.
+    """
+    try:
+        limit = max(1, min(limit, 1000))
+        wait = max(0.0, min(wait, settings.changes_max_wait))
+        changes = await wait_for_changes(since, limit, wait)
+        return {
+            "changes": changes,
+            "next_since": changes[-1]["seq"] if changes else since,
+            "has_more": len(changes) == limit
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/changes/stream")
+async def stream_changes(request: Request, since: int = 0):
+    """Server-sent events of candidate changes; resumes from Last-Event-ID on reconnect"""
+    last_event_id = request.headers.get("last-event-id")
+    cursor = int(last_event_id) if last_event_id and last_event_id.isdigit() else since
+
+    async def events():
+        nonlocal cursor
+        while not await request.is_disconnected():
+            try:
+                changes = await wait_for_changes(cursor, 500, settings.changes_max_wait)
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+                await asyncio.sleep(settings.changes_poll_interval)
+                continue
+            if not changes:
+                yield ": keepalive\n\n"
+                continue
+            for change in changes:
+                yield f"id: {change['seq']}\nevent: change\ndata: {json.dumps(change, default=str)}\n\n"
+            cursor = changes[-1]["seq"]
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/push/stats")
+async def push_stats():
+    """Delivered events, throughput and outbox backlog per push destination"""
+    try:
+        return await asyncio.to_thread(push_dispatcher.status)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.post("/push/flush")
+async def push_flush():
+    """Enqueue pending candidate changes and deliver everything due now"""
+    try:
+        return await push_dispatcher.flush()
+    except Exception as e:
+        return {"error": str(e)}
@@ -0,0 +1,189 @@
+"""Candidate change feed
+
+Triggers on candidates append one compact row per insert, update or delete to
+candidate_changes (migration 0007) and NOTIFY the candidate_changes channel
+with the new seq. Consumers read `seq > since` in order, so catching up costs
+O(changes) rather than a scan of the candidates table.
+
+seq is allocated when a change is written, not when its transaction commits,
+and a batch upsert writes hundreds of changes in one transaction, so seq N+1
+can be visible while N is still in flight. A consumer that advanced past N
+would never see it. Reads therefore stop at a settled horizon: the last seq
+allocated, once every transaction in flight when it was read has committed
+or rolled back (candidate_changes_horizon, migration 0016). A long-running
+writer anywhere in the database holds the horizon back until it finishes.
+
+Waiters for new changes share one LISTEN connection. If the direct Postgres
+connection is unavailable they poll every changes_poll_interval seconds and
+retry LISTEN with exponential backoff.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db.client import db
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL = "candidate_changes"
+LISTEN_RETRY_MAX = 300.0
+
+
+class ChangeHorizon:
+    """Highest seq below which every change has committed or rolled back
+
+    Each advance() is one blocking round trip, so callers run it in a worker
+    thread. When writers are in flight, the last seq allocated and their xids
+    are remembered, and that seq becomes settled on a later call once all of
+    those xids have finished. The pending horizon is kept until then rather
+    than replaced, so a steady stream of writers delays the horizon by one call
+    instead of stalling it. The lock only guards folding a result into that
+    state, never the round trip, and `behind` is a plain read for the loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._settled = 0
+        self._pending: Optional[Tuple[int, List[str]]] = None
+        self.behind = False
+
+    def advance(self) -> int:
+        pending = self._pending
+        result = db.supabase.rpc('candidate_changes_horizon',
+                                 {'pending_xids': pending[1] if pending else []}).execute()
+        row = result.data[0]
+        last_seq, in_flight = row['last_seq'], row['in_flight'] or []
+        with self._lock:
+            # pending_done answers for the xids sent; a concurrent call may have settled them already
+            if pending is not None and row['pending_done']:
+                self._settled = max(self._settled, pending[0])
+                if self._pending is pending:
+                    self._pending = None
+            if not in_flight:
+                self._settled = max(self._settled, last_seq)
+                if self._pending is not None and self._pending[0] <= last_seq:
+                    self._pending = None
+            elif self._pending is None and last_seq > self._settled:
+                self._pending = (last_seq, in_flight)
+            self.behind = last_seq > self._settled
+            return self._settled
+
+
+# Global instance
+change_horizon = ChangeHorizon()
+
+
+def fetch_changes(since: int, limit: int = 500) -> List[Dict[str, Any]]:
+    """Settled changes with seq > since, oldest first; no seq is ever skipped
+
+    Two blocking round trips; async callers go through asyncio.to_thread.
+    """
+    horizon = change_horizon.advance()
+    if horizon <= since:
+        return []
+    result = db.supabase.table('candidate_changes')\
+        .select("seq, candidate_id, op, changed, changed_at")\
+        .gt('seq', since)\
+        .lte('seq', horizon)\
+        .order("seq")\
+        .limit(limit)\
+        .execute()
+    return result.data or []
+
+
+class ChangeNotifier:
+    """Wakes long-poll and SSE waiters when a change is committed"""
+
+    def __init__(self):
+        self._event: Optional[asyncio.Event] = None
+        self._conn = None
+        self._pool = None
+        self._listening = False
+        self._retry_at = 0.0
+        self._retry_delay = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _wake(self, *args):
+        if self._event is not None:
+            self._event.set()
+            self._event = asyncio.Event()
+
+    def _on_terminated(self, *args):
+        # Connection dropped; the next waiter will LISTEN again
+        self._conn = None
+        self._listening = False
+        self._wake()
+
+    def _should_listen(self) -> bool:
+        return not self._listening and asyncio.get_running_loop().time() >= self._retry_at
+
+    async def _ensure_listener(self):
+        if not self._should_listen():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._should_listen():
+                return
+            try:
+                self._pool = await db.get_pool()
+                self._conn = await self._pool.acquire()
+                await self._conn.add_listener(CHANNEL, self._wake)
+                self._conn.add_termination_listener(self._on_terminated)
+                self._listening = True
+                self._retry_delay = 0.0
+                logger.info("Listening for candidate changes", channel=CHANNEL)
+            except Exception as e:
+                if self._conn is not None:
+                    try:
+                        await self._pool.release(self._conn)
+                    except Exception:
+                        pass
+                    self._conn = None
+                self._retry_delay = min(max(self._retry_delay * 2, settings.changes_poll_interval), LISTEN_RETRY_MAX)
+                self._retry_at = asyncio.get_running_loop().time() + self._retry_delay
+                logger.warning("LISTEN unavailable, polling for candidate changes",
+                               error=str(e), retry_in=self._retry_delay)
+
+    async def wait(self, timeout: float):
+        """Return when a change may be available, or after `timeout` seconds"""
+        if self._event is None:
+            self._event = asyncio.Event()
+        await self._ensure_listener()
+        if not self._listening:
+            timeout = min(timeout, settings.changes_poll_interval)
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def close(self):
+        if self._conn is not None:
+            try:
+                await self._conn.remove_listener(CHANNEL, self._wake)
+                await self._pool.release(self._conn)
+            except Exception as e:
+                logger.warning("Error releasing change listener", error=str(e))
+        self._conn = None
+        self._listening = False
+
+
+# Global instance
+change_notifier = ChangeNotifier()
+
+
+async def wait_for_changes(since: int, limit: int, timeout: float) -> List[Dict[str, Any]]:
+    """Changes after `since`, waiting up to `timeout` seconds for the first one"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        changes = await asyncio.to_thread(fetch_changes, since, limit)
+        remaining = deadline - loop.time()
+        if changes or remaining <= 0:
+            return changes
+        if change_horizon.behind:
+            # Changes are committed or about to be but not yet settled; their NOTIFY may already have fired
+            remaining = min(remaining, settings.changes_poll_interval)
+        await change_notifier.wait(remaining)
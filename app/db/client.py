@@ -1,15 +1,82 @@
 """Database client using Supabase REST API"""
-from supabase import create_client, Client
+import asyncio
+from typing import Any, Callable, Optional
 from app.config import settings
+from app.models.records import RecordBatch
+from app.utils.logging import get_logger
+from app.utils.metrics import DB_OPERATION_SECONDS, instrument_sync_httpx, timed
+
+logger = get_logger(__name__)
 
 
 class DatabaseClient:
+    """Supabase REST client and asyncpg pool, each created on first use"""
+
     def __init__(self):
-        self.supabase: Client = create_client(
-            settings.supabase_url,
-            settings.supabase_service_role_key
-        )
+        self._supabase: Optional[Any] = None
+        self._pool: Optional[Any] = None
+        self._pool_lock = asyncio.Lock()
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            from supabase import create_client
+
+            self._supabase = create_client(
+                settings.supabase_url,
+                settings.supabase_service_role_key
+            )
+            try:
+                instrument_sync_httpx(self._supabase.postgrest.session, "supabase")
+            except AttributeError as e:
+                logger.warning("Could not instrument Supabase client", error=str(e))
+        return self._supabase
+
+    @supabase.setter
+    def supabase(self, client):
+        self._supabase = client
+
+    async def get_pool(self):
+        """asyncpg pool for direct Postgres access (migrations, bulk loads)"""
+        async with self._pool_lock:
+            if self._pool is None:
+                import asyncpg
+
+                self._pool = await asyncpg.create_pool(settings.database_dsn, min_size=1, max_size=5)
+        return self._pool
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
     
+    @timed(DB_OPERATION_SECONDS.labels("scan"))
+    def scan(self, table: str, batch: RecordBatch, order: Optional[str] = None, page_size: int = 1000,
+             on_page: Optional[Callable[[int], None]] = None,
+             where: Optional[Callable[[Any], Any]] = None) -> RecordBatch:
+        """Page through `table` selecting only the batch's columns, appending into `batch`
+
+        `where` adds filters to each page's query, e.g. ``lambda q: q.in_('state', states)``.
+        """
+        offset = 0
+        while True:
+            query = self.supabase.table(table).select(", ".join(batch.columns))
+            if where:
+                query = where(query)
+            if order:
+                query = query.order(order)
+            result = query.range(offset, offset + page_size - 1).execute()
+
+            if not result.data:
+                break
+            batch.extend(result.data)
+            if on_page:
+                on_page(len(batch))
+            if len(result.data) < page_size:
+                break
+            offset += page_size
+        return batch
+
     async def execute_query(self, query: str, *args):
         """Execute a query using Supabase REST API"""
         try:
@@ -1,31 +1,205 @@
-"""Database migration runner"""
+"""Versioned database migrations
+
+schema.sql is the baseline (version 1); later changes are numbered files in
+app/db/migrations (``0002_candidate_source_columns.sql``), applied in version
+order and recorded in schema_migrations with a checksum, so running migrations
+again applies only what is pending. A database created from schema.sql
+before versioning existed is adopted: the baseline is recorded, not re-run.
+
+Each migration runs in one transaction together with its schema_migrations
+row, so a failed migration leaves nothing behind. A file whose first line is
+``-- migrate: no-transaction`` instead runs statement by statement outside a
+transaction, which CREATE INDEX CONCURRENTLY requires, so large tables stay
+writable while their indexes build. Those files must be safe to re-run (IF
+NOT EXISTS); indexes a failed concurrent build left INVALID are dropped before
+the retry. An advisory lock keeps two deploys from migrating at once.
+"""
 import asyncio
+import hashlib
 import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
 from app.db.client import db
 from app.utils.logging import get_logger
+from app.utils.metrics import DB_OPERATION_SECONDS, timed
 
 logger = get_logger(__name__)
 
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "../..", "schema.sql")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+BASELINE_VERSION = 1
+NO_TRANSACTION = "-- migrate: no-transaction"
+
+# pg_advisory_lock key shared by every migration runner
+LOCK_KEY = 4_710_047
+
+TRACKING_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    duration_ms INTEGER,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+)
+"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    __slots__ = ("version", "name", "sql", "checksum", "transactional")
+
+    def __init__(self, version: int, name: str, path: str):
+        with open(path, 'r') as f:
+            self.sql = f.read()
+        self.version = version
+        self.name = name
+        self.checksum = hashlib.sha256(self.sql.encode()).hexdigest()
+        self.transactional = not self.sql.lstrip().startswith(NO_TRANSACTION)
+
+
+def load_migrations() -> List[Migration]:
+    """The baseline and every numbered migration file, in version order"""
+    if not os.path.exists(SCHEMA_PATH):
+        raise MigrationError(f"Schema file not found: {SCHEMA_PATH}")
+    migrations = {BASELINE_VERSION: Migration(BASELINE_VERSION, "baseline", SCHEMA_PATH)}
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.fullmatch(r"(\d+)_(\w+)\.sql", filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version}: {filename}")
+        migrations[version] = Migration(version, match.group(2), os.path.join(MIGRATIONS_DIR, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split a script on semicolons outside quotes, comments and dollar-quoted bodies"""
+    statements, start, i = [], 0, 0
+    while i < len(sql):
+        if sql.startswith("--", i):
+            i = sql.find("\n", i)
+            i = len(sql) if i < 0 else i
+        elif sql.startswith("/*", i):
+            i = sql.find("*/", i)
+            i = len(sql) if i < 0 else i + 2
+        elif sql[i] in "'\"":
+            i = sql.find(sql[i], i + 1)
+            i = len(sql) if i < 0 else i + 1
+        elif sql[i] == "$" and (tag := re.match(r"\$\w*\$", sql[i:])):
+            i = sql.find(tag.group(), i + len(tag.group()))
+            i = len(sql) if i < 0 else i + len(tag.group())
+        elif sql[i] == ";":
+            statements.append(sql[start:i])
+            start = i = i + 1
+        else:
+            i += 1
+    statements.append(sql[start:])
+    # Drop pieces that are only whitespace and comments
+    return [s.strip() for s in statements if re.sub(r"--[^\n]*|/\*.*?\*/", "", s, flags=re.S).strip()]
 
-async def run_migrations():
-    """Run database migrations"""
-    schema_path = os.path.join(os.path.dirname(__file__), "../..", "schema.sql")
-    
-    if not os.path.exists(schema_path):
-        logger.error(f"Schema file not found: {schema_path}")
+
+async def _applied(conn) -> Dict[int, Any]:
+    rows = await conn.fetch("SELECT version, name, checksum, duration_ms, applied_at FROM schema_migrations")
+    return {row["version"]: row for row in rows}
+
+
+async def _record(conn, migration: Migration, duration_ms: Optional[int]):
+    await conn.execute(
+        "INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES ($1, $2, $3, $4)",
+        migration.version, migration.name, migration.checksum, duration_ms)
+
+
+async def _drop_invalid_indexes(conn, migration: Migration):
+    """Drop indexes this migration builds that an interrupted concurrent build left INVALID"""
+    names = re.findall(r"INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", migration.sql, re.I)
+    if not names:
         return
-    
-    with open(schema_path, 'r') as f:
-        schema_sql = f.read()
-    
-    try:
-        pool = await db.get_pool()
-        async with pool.acquire() as conn:
-            await conn.execute(schema_sql)
-        logger.info("Database migration completed successfully")
-    except Exception as e:
-        logger.error(f"Migration failed: {e}")
-        raise
+    invalid = await conn.fetch("""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY($1::text[])
+    """, names)
+    for row in invalid:
+        logger.warning("Dropping invalid index left by an interrupted build", index=row["relname"])
+        await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{row["relname"]}"')
+
+
+async def _apply(conn, migration: Migration):
+    start = time.perf_counter()
+    logger.info("Applying migration", version=migration.version, name=migration.name,
+                transactional=migration.transactional)
+    if migration.transactional:
+        async with conn.transaction():
+            await conn.execute(migration.sql)
+            await _record(conn, migration, round((time.perf_counter() - start) * 1000))
+    else:
+        await _drop_invalid_indexes(conn, migration)
+        for statement in split_statements(migration.sql):
+            await conn.execute(statement)
+        await _record(conn, migration, round((time.perf_counter() - start) * 1000))
+    logger.info("Applied migration", version=migration.version, name=migration.name,
+                seconds=round(time.perf_counter() - start, 2))
+
+
+@timed(DB_OPERATION_SECONDS.labels("migrate"))
+async def run_migrations(target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to `target` (all by default); returns the versions applied"""
+    migrations = load_migrations()
+    applied_now = []
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("SELECT pg_advisory_lock($1)", LOCK_KEY)
+        try:
+            # Index builds on large tables can outlast a role's default statement timeout
+            await conn.execute("SET statement_timeout = 0")
+            await conn.execute(TRACKING_TABLE)
+            applied = await _applied(conn)
+            if not applied and await conn.fetchval("SELECT to_regclass('candidates') IS NOT NULL"):
+                logger.info("Recording existing schema as the baseline migration")
+                await _record(conn, migrations[0], None)
+                applied = await _applied(conn)
+
+            for migration in migrations:
+                if target is not None and migration.version > target:
+                    break
+                row = applied.get(migration.version)
+                if row is not None:
+                    if row["checksum"].strip() != migration.checksum:
+                        logger.warning("Applied migration file has changed since it ran; add a new migration "
+                                       "instead of editing it", version=migration.version, name=migration.name)
+                    continue
+                try:
+                    await _apply(conn, migration)
+                except Exception as e:
+                    logger.error("Migration failed", version=migration.version, name=migration.name, error=str(e))
+                    raise
+                applied_now.append(migration.version)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", LOCK_KEY)
+
+    logger.info("Database migration completed successfully", applied=applied_now)
+    return applied_now
+
+
+async def migration_status() -> List[Dict[str, Any]]:
+    """Every known migration with when it was applied, or None if pending"""
+    migrations = load_migrations()
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        applied = await _applied(conn) if exists else {}
+    return [{
+        "version": m.version,
+        "name": m.name,
+        "applied_at": applied[m.version]["applied_at"].isoformat() if m.version in applied else None,
+        "duration_ms": applied[m.version]["duration_ms"] if m.version in applied else None,
+        "changed": m.version in applied and applied[m.version]["checksum"].strip() != m.checksum,
+    } for m in migrations]
 
 
 if __name__ == "__main__":
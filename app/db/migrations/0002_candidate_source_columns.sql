@@ -0,0 +1,7 @@
+-- Columns the FEC pipelines write and filter on that the baseline candidates table lacks.
+-- source_candidate_ID is the source system's candidate ID (mixed case, as PostgREST clients name it);
+-- committee_id is the principal campaign committee's FEC ID, filled in by enrichment.
+ALTER TABLE candidates
+    ADD COLUMN IF NOT EXISTS "source_candidate_ID" VARCHAR(9),
+    ADD COLUMN IF NOT EXISTS source_system VARCHAR(50),
+    ADD COLUMN IF NOT EXISTS committee_id VARCHAR(9);
@@ -0,0 +1,12 @@
+-- migrate: no-transaction
+-- Unique keys behind the upserts: FEC candidate IDs, and the ON CONFLICT targets of
+-- FECClient.store_candidate and store_committee, which fail without a matching unique index.
+-- Built concurrently so candidates and committees stay writable. If a build fails on
+-- duplicate rows, remove them (DELETE /remove-duplicates for FEC IDs; GET /verify-data lists the
+-- rest) and run migrate again.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_source_candidate_id
+    ON candidates("source_candidate_ID");
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_name_state_office_cycle
+    ON candidates(full_name, state, office, election_cycle);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_committees_name_state
+    ON committees(name, state);
@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- Enrichment pages through candidates with no committee_id, and the status routes count those with one
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_committee_id ON candidates(committee_id);
+-- GET /signals?candidate_id=...: one candidate's posts in a status, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_signals_candidate_status_posted_at
+    ON signals(candidate_id, status, posted_at DESC);
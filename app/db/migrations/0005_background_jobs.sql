@@ -0,0 +1,27 @@
+-- Background job records behind the POST enqueue routes (app.jobs). Statements are idempotent so a
+-- database created from an interim schema.sql that already has them migrates cleanly.
+DO $$ BEGIN
+    CREATE TYPE job_status AS ENUM ('queued', 'running', 'completed', 'failed', 'cancelled', 'interrupted');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind VARCHAR(100) NOT NULL,
+    dedup_key TEXT NOT NULL,
+    params JSONB,
+    status job_status NOT NULL DEFAULT 'queued',
+    progress JSONB,
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_dedup_key ON jobs(dedup_key) WHERE status IN ('queued', 'running');
+
+DROP TRIGGER IF EXISTS update_jobs_updated_at ON jobs;
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
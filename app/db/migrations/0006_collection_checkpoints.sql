@@ -0,0 +1,30 @@
+-- FEC collection planner checkpoints, one row per page range of a search (app.pipelines.fec_collection)
+DO $$ BEGIN
+    CREATE TYPE unit_status AS ENUM ('pending', 'running', 'completed', 'failed');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS collection_checkpoints (
+    run_id UUID NOT NULL,
+    unit_key VARCHAR(100) NOT NULL,
+    cycle INTEGER NOT NULL,
+    office VARCHAR(1) NOT NULL,
+    party VARCHAR(10) NOT NULL,
+    first_page INTEGER NOT NULL,
+    last_page INTEGER NOT NULL,
+    next_page INTEGER NOT NULL,
+    total_pages INTEGER,
+    status unit_status NOT NULL DEFAULT 'pending',
+    candidates_checked INTEGER NOT NULL DEFAULT 0,
+    candidates_added INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (run_id, unit_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_collection_checkpoints_unfinished
+    ON collection_checkpoints(updated_at) WHERE status <> 'completed';
+
+DROP TRIGGER IF EXISTS update_collection_checkpoints_updated_at ON collection_checkpoints;
+CREATE TRIGGER update_collection_checkpoints_updated_at BEFORE UPDATE ON collection_checkpoints FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,44 @@
+-- Candidate change log behind GET /changes and the push dispatcher, written by a trigger on candidates
+CREATE TABLE IF NOT EXISTS candidate_changes (
+    seq BIGSERIAL PRIMARY KEY,
+    candidate_id UUID NOT NULL,
+    op CHAR(1) NOT NULL CHECK (op IN ('I', 'U', 'D')),
+    changed JSONB,
+    changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Append candidate inserts, updates and deletes to candidate_changes and notify listeners.
+-- Updates record only the columns whose values changed; no-op updates are skipped.
+CREATE OR REPLACE FUNCTION record_candidate_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    change_seq BIGINT;
+    diff JSONB;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO candidate_changes (candidate_id, op, changed)
+        VALUES (NEW.candidate_id, 'I', to_jsonb(NEW) - 'created_at' - 'updated_at')
+        RETURNING seq INTO change_seq;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT jsonb_object_agg(n.key, n.value) INTO diff
+        FROM jsonb_each(to_jsonb(NEW)) n
+        JOIN jsonb_each(to_jsonb(OLD)) o USING (key)
+        WHERE n.value IS DISTINCT FROM o.value AND n.key <> 'updated_at';
+        IF diff IS NULL THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO candidate_changes (candidate_id, op, changed)
+        VALUES (NEW.candidate_id, 'U', diff)
+        RETURNING seq INTO change_seq;
+    ELSE
+        INSERT INTO candidate_changes (candidate_id, op)
+        VALUES (OLD.candidate_id, 'D')
+        RETURNING seq INTO change_seq;
+    END IF;
+    PERFORM pg_notify('candidate_changes', change_seq::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS record_candidate_changes ON candidates;
+CREATE TRIGGER record_candidate_changes AFTER INSERT OR UPDATE OR DELETE ON candidates FOR EACH ROW EXECUTE FUNCTION record_candidate_change();
@@ -0,0 +1,39 @@
+-- Outbound push to Zapier/CRM webhooks (app.integrations.push): one outbox row per coalesced change
+-- per destination, and how far into candidate_changes the dispatcher has enqueued
+DO $$ BEGIN
+    CREATE TYPE outbox_status AS ENUM ('pending', 'delivered', 'dead');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS push_outbox (
+    outbox_id BIGSERIAL PRIMARY KEY,
+    destination VARCHAR(50) NOT NULL,
+    candidate_id UUID NOT NULL,
+    event VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    first_seq BIGINT NOT NULL,
+    last_seq BIGINT NOT NULL,
+    first_changed_at TIMESTAMP WITH TIME ZONE,
+    status outbox_status NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    last_error TEXT,
+    delivered_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(destination, candidate_id, last_seq)
+);
+
+CREATE TABLE IF NOT EXISTS push_cursors (
+    name VARCHAR(50) PRIMARY KEY,
+    seq BIGINT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_push_outbox_due
+    ON push_outbox(destination, next_attempt_at, outbox_id) WHERE status = 'pending';
+
+DROP TRIGGER IF EXISTS update_push_outbox_updated_at ON push_outbox;
+CREATE TRIGGER update_push_outbox_updated_at BEFORE UPDATE ON push_outbox FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+DROP TRIGGER IF EXISTS update_push_cursors_updated_at ON push_cursors;
+CREATE TRIGGER update_push_cursors_updated_at BEFORE UPDATE ON push_cursors FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,13 @@
+-- Incremental jurisdiction spend (app.pipelines.spend): the newest filings.updated_at each aggregate
+-- has processed, and the indexes its reads of changed and per-jurisdiction filings use
+CREATE TABLE IF NOT EXISTS pipeline_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    value TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_filings_jurisdiction_period_end ON filings(jurisdiction, period_end);
+CREATE INDEX IF NOT EXISTS idx_filings_updated_at ON filings(updated_at);
+
+DROP TRIGGER IF EXISTS update_pipeline_watermarks_updated_at ON pipeline_watermarks;
+CREATE TRIGGER update_pipeline_watermarks_updated_at BEFORE UPDATE ON pipeline_watermarks FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
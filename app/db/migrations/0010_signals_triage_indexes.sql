@@ -0,0 +1,5 @@
+-- Signal triage queue: keyset pages of one status, newest first, and the key signal ingestion upserts
+-- on. Building the unique index fails if duplicate posts are already stored; delete them and re-run.
+DROP INDEX IF EXISTS idx_signals_status;
+CREATE INDEX IF NOT EXISTS idx_signals_status_posted_at ON signals(status, posted_at DESC, signal_id DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_signals_source_post ON signals(source, account_handle, posted_at);
@@ -0,0 +1,57 @@
+-- Search (GET /search). Indexes are on expressions rather than stored columns, so
+-- existing writes are unchanged; queries must use the same functions to hit them.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION candidate_search_document(full_name TEXT, preferred_name TEXT, office TEXT, state TEXT, bio_summary TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(full_name, '') || ' ' || coalesce(preferred_name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(office, '') || ' ' || coalesce(state, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(bio_summary, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION candidate_search_name(full_name TEXT, preferred_name TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(coalesce(full_name, '') || ' ' || coalesce(preferred_name, ''))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION mention_search_document(title TEXT, snippet TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(snippet, '')), 'B')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Candidates matching every term of prefix_query (e.g. 'jan & smi:*') or with a name
+-- trigram-similar to search_text, plus mentions whose title/snippet match, best first.
+CREATE OR REPLACE FUNCTION search_entities(search_text TEXT, prefix_query TEXT, max_results INTEGER DEFAULT 10,
+                                           include_mentions BOOLEAN DEFAULT TRUE)
+RETURNS TABLE (kind TEXT, id UUID, candidate_id UUID, title TEXT, detail TEXT, score REAL) AS $$
+    WITH matched_candidates AS (
+        SELECT 'candidate'::TEXT AS kind, c.candidate_id AS id, c.candidate_id, c.full_name::TEXT AS title,
+               concat_ws(', ', c.office, c.state)::TEXT AS detail,
+               GREATEST(
+                   ts_rank(candidate_search_document(c.full_name, c.preferred_name, c.office, c.state, c.bio_summary),
+                           to_tsquery('simple', prefix_query)),
+                   similarity(candidate_search_name(c.full_name, c.preferred_name), search_text)
+               ) AS score
+        FROM candidates c
+        WHERE candidate_search_document(c.full_name, c.preferred_name, c.office, c.state, c.bio_summary)
+                  @@ to_tsquery('simple', prefix_query)
+           OR candidate_search_name(c.full_name, c.preferred_name) % search_text
+        ORDER BY score DESC
+        LIMIT max_results
+    ), matched_mentions AS (
+        SELECT 'mention'::TEXT AS kind, m.mention_id AS id, m.candidate_id, m.title,
+               m.publisher::TEXT AS detail,
+               ts_rank(mention_search_document(m.title, m.snippet), to_tsquery('simple', prefix_query)) AS score
+        FROM media_mentions m
+        WHERE include_mentions
+          AND mention_search_document(m.title, m.snippet) @@ to_tsquery('simple', prefix_query)
+        ORDER BY score DESC
+        LIMIT max_results
+    )
+    SELECT * FROM matched_candidates
+    UNION ALL
+    SELECT * FROM matched_mentions
+    ORDER BY score DESC
+    LIMIT max_results
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- GIN indexes for the search functions of 0011, built concurrently so candidates and media_mentions
+-- stay writable while they build
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_search ON candidates
+    USING GIN (candidate_search_document(full_name, preferred_name, office, state, bio_summary));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_search_name_trgm ON candidates
+    USING GIN (candidate_search_name(full_name, preferred_name) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_media_mentions_search ON media_mentions
+    USING GIN (mention_search_document(title, snippet));
@@ -0,0 +1,44 @@
+-- Occupation extraction from FEC documents (app.pipelines.fec_documents) and Schedule A/B
+-- itemizations loaded from .fec files (app.pipelines.contributions)
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS occupation VARCHAR(255);
+CREATE INDEX IF NOT EXISTS idx_candidates_missing_occupation ON candidates(candidate_id) WHERE occupation IS NULL;
+
+-- FEC form documents already parsed for occupation extraction, keyed by URL
+CREATE TABLE IF NOT EXISTS fec_documents (
+    document_url TEXT PRIMARY KEY,
+    candidate_id UUID REFERENCES candidates(candidate_id) ON DELETE SET NULL,
+    form_type VARCHAR(10),
+    file_number BIGINT,
+    content_hash CHAR(64) NOT NULL,
+    fields JSONB NOT NULL DEFAULT '{}',
+    parsed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+DROP TRIGGER IF EXISTS update_fec_documents_updated_at ON fec_documents;
+CREATE TRIGGER update_fec_documents_updated_at BEFORE UPDATE ON fec_documents FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Loaded with COPY, replaced per file_number; no foreign keys so loads stay append-only.
+CREATE TABLE IF NOT EXISTS contributions (
+    contribution_id BIGSERIAL PRIMARY KEY,
+    file_number BIGINT NOT NULL,
+    committee_id VARCHAR(9),
+    schedule CHAR(1) NOT NULL,
+    line_number VARCHAR(8),
+    transaction_id VARCHAR(32),
+    entity_type VARCHAR(3),
+    name TEXT,
+    city VARCHAR(100),
+    state VARCHAR(2),
+    zip_code VARCHAR(9),
+    employer TEXT,
+    occupation TEXT,
+    transaction_date DATE,
+    amount NUMERIC(14,2),
+    aggregate_amount NUMERIC(14,2),
+    purpose TEXT,
+    memo_code VARCHAR(1),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_contributions_file_number ON contributions(file_number);
+CREATE INDEX IF NOT EXISTS idx_contributions_committee_date ON contributions(committee_id, transaction_date);
@@ -0,0 +1,18 @@
+-- Candidate-committee graph (app.graph.committees): FEC committee identity and roles, and the
+-- updated_at columns and indexes its incremental refresh reads changes through.
+-- role is the FEC designation (e.g. 'Leadership PAC').
+ALTER TABLE committees
+    ADD COLUMN IF NOT EXISTS fec_committee_id VARCHAR(9) UNIQUE,
+    ADD COLUMN IF NOT EXISTS designation VARCHAR(1),
+    ADD COLUMN IF NOT EXISTS treasurer_name VARCHAR(255);
+
+ALTER TABLE candidate_committees
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+DROP TRIGGER IF EXISTS update_candidate_committees_updated_at ON candidate_committees;
+CREATE TRIGGER update_candidate_committees_updated_at BEFORE UPDATE ON candidate_committees FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_candidates_updated_at ON candidates(updated_at);
+CREATE INDEX IF NOT EXISTS idx_committees_updated_at ON committees(updated_at);
+CREATE INDEX IF NOT EXISTS idx_candidate_committees_committee_id ON candidate_committees(committee_id);
+CREATE INDEX IF NOT EXISTS idx_candidate_committees_updated_at ON candidate_committees(updated_at);
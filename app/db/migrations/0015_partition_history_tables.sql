@@ -0,0 +1,162 @@
+-- Range-partition the tables that grow every cycle: filings by the two-year cycle their period
+-- ends in (the range spend aggregates read), media_mentions by year published, signals by month
+-- posted. Each table is rebuilt and its rows copied in this transaction, which locks it until
+-- commit: run in a maintenance window. Partitions for existing rows are created here; future ones
+-- by `python -m app maintain-partitions` (app/db/partitions.py, which names and bounds them the
+-- same way). Rows outside every partition land in <table>_default rather than failing.
+-- The partition key has to be part of the primary key, so it becomes NOT NULL; existing rows
+-- without one get it from their other dates.
+SET LOCAL timezone = 'UTC';
+
+-- Partition `name` of `parent` for [range_start, range_end). Rows for the range that arrived
+-- before it existed are moved out of the default partition first, or ATTACH would fail.
+CREATE OR REPLACE FUNCTION create_range_partition(parent TEXT, name TEXT, key TEXT, range_start TEXT, range_end TEXT)
+RETURNS BOOLEAN AS $$
+BEGIN
+    IF to_regclass(name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', name, parent);
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                   parent || '_default', key, range_start, key, range_end, name);
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', parent, name, range_start, range_end);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Filings
+ALTER TABLE filings RENAME TO filings_unpartitioned;
+ALTER TABLE filings_unpartitioned RENAME CONSTRAINT filings_pkey TO filings_unpartitioned_pkey;
+
+CREATE TABLE filings (
+    filing_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    candidate_id UUID REFERENCES candidates(candidate_id) ON DELETE CASCADE,
+    committee_id UUID REFERENCES committees(committee_id) ON DELETE SET NULL,
+    jurisdiction VARCHAR(255),
+    office VARCHAR(255),
+    receipt_date DATE,
+    period_start DATE,
+    period_end DATE NOT NULL,
+    filing_type VARCHAR(100),
+    total_receipts NUMERIC(15,2),
+    total_disbursements NUMERIC(15,2),
+    cash_on_hand NUMERIC(15,2),
+    debts_owed NUMERIC(15,2),
+    source_url TEXT,
+    raw_url TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (filing_id, period_end)
+) PARTITION BY RANGE (period_end);
+CREATE TABLE filings_default PARTITION OF filings DEFAULT;
+
+-- Cycle N runs from January 1 of N - 1 to January 1 of N + 1
+SELECT create_range_partition('filings', 'filings_' || (start_year + 1), 'period_end',
+                              make_date(start_year, 1, 1)::TEXT, make_date(start_year + 2, 1, 1)::TEXT)
+FROM (SELECT DISTINCT y - (y + 1) % 2 AS start_year
+      FROM (SELECT extract(year FROM COALESCE(period_end, receipt_date, created_at::DATE))::INTEGER AS y
+            FROM filings_unpartitioned) years) cycles;
+
+INSERT INTO filings (filing_id, candidate_id, committee_id, jurisdiction, office, receipt_date, period_start,
+                     period_end, filing_type, total_receipts, total_disbursements, cash_on_hand, debts_owed,
+                     source_url, raw_url, created_at, updated_at)
+SELECT filing_id, candidate_id, committee_id, jurisdiction, office, receipt_date, period_start,
+       COALESCE(period_end, receipt_date, created_at::DATE), filing_type, total_receipts, total_disbursements,
+       cash_on_hand, debts_owed, source_url, raw_url, created_at, updated_at
+FROM filings_unpartitioned;
+DROP TABLE filings_unpartitioned;
+
+CREATE INDEX idx_filings_candidate_id ON filings(candidate_id);
+CREATE INDEX idx_filings_receipt_date ON filings(receipt_date);
+CREATE INDEX idx_filings_jurisdiction ON filings(jurisdiction);
+CREATE INDEX idx_filings_jurisdiction_period_end ON filings(jurisdiction, period_end);
+CREATE INDEX idx_filings_updated_at ON filings(updated_at);
+CREATE TRIGGER update_filings_updated_at BEFORE UPDATE ON filings FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Media mentions
+ALTER TABLE media_mentions RENAME TO media_mentions_unpartitioned;
+ALTER TABLE media_mentions_unpartitioned RENAME CONSTRAINT media_mentions_pkey TO media_mentions_unpartitioned_pkey;
+
+CREATE TABLE media_mentions (
+    mention_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    candidate_id UUID REFERENCES candidates(candidate_id) ON DELETE CASCADE,
+    title TEXT,
+    url TEXT,
+    publisher VARCHAR(255),
+    published_at DATE NOT NULL DEFAULT CURRENT_DATE,
+    confidence FLOAT CHECK (confidence >= 0 AND confidence <= 1),
+    snippet TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (mention_id, published_at)
+) PARTITION BY RANGE (published_at);
+CREATE TABLE media_mentions_default PARTITION OF media_mentions DEFAULT;
+
+SELECT create_range_partition('media_mentions', 'media_mentions_' || y, 'published_at',
+                              make_date(y, 1, 1)::TEXT, make_date(y + 1, 1, 1)::TEXT)
+FROM (SELECT DISTINCT extract(year FROM COALESCE(published_at, created_at::DATE))::INTEGER AS y
+      FROM media_mentions_unpartitioned) years;
+
+INSERT INTO media_mentions (mention_id, candidate_id, title, url, publisher, published_at, confidence, snippet,
+                            created_at, updated_at)
+SELECT mention_id, candidate_id, title, url, publisher, COALESCE(published_at, created_at::DATE), confidence,
+       snippet, created_at, updated_at
+FROM media_mentions_unpartitioned;
+DROP TABLE media_mentions_unpartitioned;
+
+CREATE INDEX idx_media_mentions_candidate_id ON media_mentions(candidate_id);
+CREATE INDEX idx_media_mentions_published_at ON media_mentions(published_at);
+CREATE INDEX idx_media_mentions_publisher ON media_mentions(publisher);
+CREATE INDEX idx_media_mentions_search ON media_mentions
+    USING GIN (mention_search_document(title, snippet));
+CREATE TRIGGER update_media_mentions_updated_at BEFORE UPDATE ON media_mentions FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Signals
+ALTER TABLE signals RENAME TO signals_unpartitioned;
+ALTER TABLE signals_unpartitioned RENAME CONSTRAINT signals_pkey TO signals_unpartitioned_pkey;
+
+CREATE TABLE signals (
+    signal_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    candidate_id UUID REFERENCES candidates(candidate_id) ON DELETE SET NULL,
+    source TEXT,
+    account_handle VARCHAR(255),
+    posted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    text TEXT,
+    url TEXT,
+    status signal_status DEFAULT 'new',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (signal_id, posted_at)
+) PARTITION BY RANGE (posted_at);
+CREATE TABLE signals_default PARTITION OF signals DEFAULT;
+
+SELECT create_range_partition('signals', 'signals_' || to_char(m, 'YYYY_MM'), 'posted_at',
+                              m::TEXT, (m + INTERVAL '1 month')::TEXT)
+FROM (SELECT DISTINCT date_trunc('month', COALESCE(posted_at, created_at)) AS m
+      FROM signals_unpartitioned) months;
+
+INSERT INTO signals (signal_id, candidate_id, source, account_handle, posted_at, text, url, status,
+                     created_at, updated_at)
+SELECT signal_id, candidate_id, source, account_handle, COALESCE(posted_at, created_at), text, url, status,
+       created_at, updated_at
+FROM signals_unpartitioned;
+DROP TABLE signals_unpartitioned;
+
+CREATE INDEX idx_signals_status_posted_at ON signals(status, posted_at DESC, signal_id DESC);
+CREATE INDEX idx_signals_posted_at ON signals(posted_at);
+CREATE UNIQUE INDEX idx_signals_source_post ON signals(source, account_handle, posted_at);
+CREATE INDEX idx_signals_candidate_status_posted_at ON signals(candidate_id, status, posted_at DESC);
+CREATE TRIGGER update_signals_updated_at BEFORE UPDATE ON signals FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Partitions moved to Parquet by app/pipelines/archive.py, read back by partitions.read_range
+CREATE TABLE archived_partitions (
+    partition_name VARCHAR(100) PRIMARY KEY,
+    table_name VARCHAR(50) NOT NULL,
+    range_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    range_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    row_count BIGINT NOT NULL,
+    path TEXT NOT NULL,
+    bytes BIGINT,
+    archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX idx_archived_partitions_table_range ON archived_partitions(table_name, range_start);
@@ -0,0 +1,26 @@
+-- Change feed horizon. candidate_changes.seq is allocated when a change is written, not
+-- when its transaction commits, so seq N+1 can be visible while N is still in flight.
+-- Readers only hand out seqs up to a settled horizon (app.db.changes): the last seq
+-- allocated, once every transaction in flight when it was read has finished.
+--
+-- The sequence is read before the snapshot is taken: a transaction holding a seq up to
+-- last_seq got its xid before that read, so it has either finished or is listed in
+-- in_flight. pending_done tells whether the in_flight list of an earlier call has
+-- cleared. xids travel as text because JSON has no xid8.
+CREATE OR REPLACE FUNCTION candidate_changes_horizon(pending_xids TEXT[] DEFAULT '{}')
+RETURNS TABLE (last_seq BIGINT, in_flight TEXT[], pending_done BOOLEAN) AS $$
+DECLARE
+    allocated BIGINT;
+BEGIN
+    SELECT CASE WHEN s.is_called THEN s.last_value ELSE 0 END INTO allocated
+    FROM candidate_changes_seq_seq s;
+
+    RETURN QUERY SELECT
+        allocated,
+        ARRAY(SELECT x::text FROM pg_snapshot_xip(pg_current_snapshot()) x),
+        NOT EXISTS (
+            SELECT 1 FROM unnest(pending_xids) p
+            WHERE pg_xact_status(p::xid8) = 'in progress'
+        );
+END;
+$$ LANGUAGE plpgsql VOLATILE;
@@ -0,0 +1,196 @@
+"""Range-partitioned history tables: partition layout, upkeep and reads
+
+filings, media_mentions and signals are partitioned on a date (migration
+0015): filings by the two-year cycle their period ends in, media mentions by
+year published, signals by month posted. Each has a DEFAULT partition, so an
+insert never fails for want of a partition; `ensure_partitions` creates the
+current and the next `partition_premake` partitions ahead of time, moving any
+rows that already landed in the default partition into them.
+
+Closed partitions are exported to Parquet and detached by
+app.pipelines.archive. `read_range` reads a key range from the live table and
+from every archived file overlapping it, so callers asking for history see one
+table whichever side of the archive cutoff it is on.
+"""
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.db.client import db
+from app.models.records import RecordBatch
+from app.utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), "../..", "data", "archive")
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class PartitionScheme:
+    """How one table is partitioned: key column, key type and partition width"""
+
+    __slots__ = ("table", "key", "unit", "timestamped")
+
+    def __init__(self, table: str, key: str, unit: str, timestamped: bool = False):
+        self.table = table
+        self.key = key
+        self.unit = unit
+        self.timestamped = timestamped
+
+    def start_of(self, day: date) -> date:
+        """First day of the partition containing `day`"""
+        if self.unit == "cycle":
+            # Cycle N covers the calendar years N - 1 and N
+            return date(day.year - (day.year + 1) % 2, 1, 1)
+        if self.unit == "year":
+            return date(day.year, 1, 1)
+        return date(day.year, day.month, 1)
+
+    def next_start(self, start: date) -> date:
+        if self.unit == "cycle":
+            return date(start.year + 2, 1, 1)
+        if self.unit == "year":
+            return date(start.year + 1, 1, 1)
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+    def partition_name(self, start: date) -> str:
+        if self.unit == "cycle":
+            return f"{self.table}_{start.year + 1}"
+        if self.unit == "year":
+            return f"{self.table}_{start.year}"
+        return f"{self.table}_{start.year}_{start.month:02d}"
+
+    def bound(self, day: date) -> str:
+        return f"{day.isoformat()} 00:00:00+00" if self.timestamped else day.isoformat()
+
+    def key_value(self, value: str) -> Any:
+        """A range endpoint as the Parquet key column's type, for read filters"""
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if not self.timestamped:
+            return parsed.date()
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+# Must match the partitions migration 0015 created
+PARTITIONED_TABLES: Dict[str, PartitionScheme] = {
+    "filings": PartitionScheme("filings", "period_end", "cycle"),
+    "media_mentions": PartitionScheme("media_mentions", "published_at", "year"),
+    "signals": PartitionScheme("signals", "posted_at", "month", timestamped=True),
+}
+
+
+def archive_dir() -> str:
+    return settings.archive_dir or DEFAULT_ARCHIVE_DIR
+
+
+def _parse_bound(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def attached_partitions(conn, table: str) -> List[Tuple[str, datetime, datetime]]:
+    """(name, range start, range end) of each bounded partition of `table`, oldest first"""
+    rows = await conn.fetch("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = $1::regclass
+    """, table)
+    partitions = []
+    for row in rows:
+        match = _BOUND.search(row["bound"])
+        if match:
+            partitions.append((row["relname"], _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def ensure_partitions(ahead: Optional[int] = None) -> Dict[str, List[str]]:
+    """Create the current and next `ahead` partitions of every partitioned table; returns those created"""
+    ahead = settings.partition_premake if ahead is None else ahead
+    today = datetime.now(timezone.utc).date()
+    created: Dict[str, List[str]] = {}
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        for scheme in PARTITIONED_TABLES.values():
+            created[scheme.table] = []
+            start = scheme.start_of(today)
+            for _ in range(ahead + 1):
+                end = scheme.next_start(start)
+                name = scheme.partition_name(start)
+                if await conn.fetchval("SELECT create_range_partition($1, $2, $3, $4, $5)", scheme.table, name,
+                                       scheme.key, scheme.bound(start), scheme.bound(end)):
+                    created[scheme.table].append(name)
+                start = end
+    if any(created.values()):
+        logger.info("Created partitions", **created)
+    return created
+
+
+# Reads spanning live and archived partitions
+
+def archived_files(table: str, start: str, end: str) -> List[str]:
+    """Paths of archived partitions of `table` whose range overlaps [start, end]"""
+    result = db.supabase.table('archived_partitions')\
+        .select("path")\
+        .eq('table_name', table)\
+        .lte('range_start', end)\
+        .gt('range_end', start)\
+        .order('range_start')\
+        .execute()
+    return [row['path'] for row in result.data or []]
+
+
+def _read_archive(path: str, scheme: PartitionScheme, columns: Sequence[str], start: str, end: str,
+                  isin: Dict[str, Iterable[Any]]) -> "pd.DataFrame":
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Archived partition file is missing: {path}")
+    filters = [(scheme.key, ">=", scheme.key_value(start)), (scheme.key, "<=", scheme.key_value(end))]
+    filters += [(column, "in", list(values)) for column, values in isin.items()]
+    archived = pq.read_table(path, columns=list(columns), filters=filters)
+
+    # Same shapes as live rows from PostgREST: numerics as floats, dates and times as ISO strings
+    for i, field in enumerate(archived.schema):
+        if pa.types.is_decimal(field.type):
+            archived = archived.set_column(i, field.name, archived.column(i).cast(pa.float64()))
+    frame = archived.to_pandas()
+    for field in archived.schema:
+        if pa.types.is_date(field.type) or pa.types.is_timestamp(field.type):
+            frame[field.name] = [None if pd.isna(v) else v.isoformat() for v in frame[field.name]]
+    return frame
+
+
+def read_range(table: str, columns: Sequence[str], start: str, end: str,
+               isin: Optional[Dict[str, Iterable[Any]]] = None, uuid_columns: Iterable[str] = (),
+               pooled_columns: Iterable[str] = ()) -> "pd.DataFrame":
+    """Rows of a partitioned table with start <= key <= end, live and archived
+
+    `isin` restricts columns to sets of values (``{"jurisdiction": [...]}``) on
+    both sides. Archived files are only opened when the range reaches them.
+    """
+    import pandas as pd
+
+    scheme = PARTITIONED_TABLES[table]
+    isin = {column: list(values) for column, values in (isin or {}).items()}
+
+    def where(query):
+        query = query.gte(scheme.key, start).lte(scheme.key, end)
+        for column, values in isin.items():
+            query = query.in_(column, values)
+        return query
+
+    frame = db.scan(table, RecordBatch(columns, uuid_columns, pooled_columns), where=where).to_frame()
+    paths = archived_files(table, start, end)
+    if not paths:
+        return frame
+    archived = [_read_archive(path, scheme, columns, start, end, isin) for path in paths]
+    logger.debug("Read archived partitions", table=table, files=len(paths), rows=sum(len(a) for a in archived))
+    return pd.concat([frame, *archived], ignore_index=True)
@@ -0,0 +1,85 @@
+"""EXPLAIN check that the hot queries are served by an index
+
+Each entry mirrors a query a route or pipeline issues on every request or
+page (through PostgREST or asyncpg), written as the SQL it becomes. Plans are
+taken with sequential scans disabled for the session: on a small or empty
+table the planner would rightly pick a Seq Scan anyway, but with seqscans
+priced out it only falls back to one when no index can serve the query, so
+the check means the same on a dev database and on production.
+
+Run against a migrated database with ``python -m app check-query-plans``.
+"""
+import json
+from typing import Any, Dict, Iterator, List
+
+from app.db.client import db
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# name -> SQL; literal values only, the plan shape is what matters
+HOT_QUERIES: Dict[str, str] = {
+    "candidate_by_fec_id": """
+        SELECT candidate_id FROM candidates WHERE "source_candidate_ID" = 'H6WA01234'""",
+    "candidate_upsert_key": """
+        SELECT candidate_id FROM candidates
+        WHERE full_name = 'DOE, JANE' AND state = 'WA' AND office = 'House' AND election_cycle = 2026""",
+    "committee_upsert_key": """
+        SELECT committee_id FROM committees WHERE name = 'DOE FOR CONGRESS' AND state = 'WA'""",
+    "committee_by_fec_id": """
+        SELECT committee_id FROM committees WHERE fec_committee_id = 'C00123456'""",
+    "candidates_missing_committee": """
+        SELECT candidate_id, "source_candidate_ID", full_name FROM candidates
+        WHERE committee_id IS NULL LIMIT 200""",
+    "candidates_missing_occupation": """
+        SELECT candidate_id FROM candidates WHERE occupation IS NULL LIMIT 1000""",
+    "candidates_changed_since": """
+        SELECT candidate_id FROM candidates WHERE updated_at > '2026-01-01T00:00:00Z'""",
+    "committee_candidates": """
+        SELECT candidate_id FROM candidate_committees
+        WHERE committee_id = '00000000-0000-0000-0000-000000000000'""",
+    "candidate_filings": """
+        SELECT filing_id FROM filings WHERE candidate_id = '00000000-0000-0000-0000-000000000000'""",
+    "signals_triage_page": """
+        SELECT signal_id FROM signals WHERE status = 'new'
+        ORDER BY posted_at DESC, signal_id DESC LIMIT 50""",
+    "candidate_signals": """
+        SELECT signal_id FROM signals
+        WHERE candidate_id = '00000000-0000-0000-0000-000000000000' AND status = 'new'
+        ORDER BY posted_at DESC LIMIT 50""",
+    "candidate_changes_since": """
+        SELECT seq FROM candidate_changes WHERE seq > 1000 AND seq <= 5000 ORDER BY seq LIMIT 500""",
+    "push_outbox_due": """
+        SELECT outbox_id FROM push_outbox
+        WHERE destination = 'zapier' AND status = 'pending' AND next_attempt_at <= NOW() AND outbox_id > 0
+        ORDER BY outbox_id LIMIT 100""",
+    "active_job_by_dedup_key": """
+        SELECT job_id FROM jobs WHERE dedup_key = 'fec-sync' AND status IN ('queued', 'running')""",
+    "contributions_by_file": """
+        SELECT contribution_id FROM contributions WHERE file_number = 1234567""",
+}
+
+
+def _nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def check_query_plans() -> List[Dict[str, Any]]:
+    """EXPLAIN every hot query; `ok` is False where a table is read with a Seq Scan"""
+    results = []
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            for name, sql in HOT_QUERIES.items():
+                raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                nodes = list(_nodes(plan))
+                seq_scans = [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"]
+                indexes = sorted({n["Index Name"] for n in nodes if n.get("Index Name")})
+                results.append({"query": name, "ok": not seq_scans, "indexes": indexes, "seq_scans": seq_scans})
+                if seq_scans:
+                    logger.warning("Hot query does not use an index", query=name, seq_scans=seq_scans)
+    return results
@@ -0,0 +1,57 @@
+"""Candidate and media mention search
+
+Matching and ranking run in Postgres through the search_entities function of
+migration 0011: prefix full-text matching on GIN tsvector indexes for typeahead,
+plus pg_trgm similarity on names for misspellings. Results for repeated
+queries are served from an in-process LRU cache for settings.search_cache_ttl.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.db.client import db
+from app.utils.cache import LRUCache
+
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_TERMS = 8
+
+_cache: Optional[LRUCache] = None
+
+
+def get_search_cache() -> LRUCache:
+    global _cache
+    if _cache is None:
+        _cache = LRUCache("search", settings.search_cache_size, settings.search_cache_ttl)
+    return _cache
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+
+def prefix_tsquery(q: str) -> Optional[str]:
+    """to_tsquery text matching every term of `q` as a prefix (`jo & smi:*`)"""
+    terms = re.findall(r"\w+", q)[:MAX_QUERY_TERMS]
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+def search(q: str, limit: int = 10, include_mentions: bool = True) -> List[Dict[str, Any]]:
+    """Best matches for `q` across candidates (and media mentions), highest score first"""
+    text = normalize_query(q)
+    ts_query = prefix_tsquery(text)
+    if len(text) < MIN_QUERY_LENGTH or ts_query is None:
+        return []
+
+    cache = get_search_cache()
+    key = (text, limit, include_mentions)
+    results = cache.get(key)
+    if results is None:
+        response = db.supabase.rpc('search_entities', {
+            "search_text": text,
+            "prefix_query": ts_query,
+            "max_results": limit,
+            "include_mentions": include_mentions,
+        }).execute()
+        results = response.data or []
+        cache.set(key, results)
+    return results
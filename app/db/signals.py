@@ -0,0 +1,66 @@
+"""Signal triage queries
+
+Reviewers page through signals of one status, newest first. Pages are keyset
+paginated on (posted_at, signal_id) rather than offset, so every page is an
+index range scan on idx_signals_status_posted_at no matter how deep into a
+100k-item backlog the reviewer is, and triaging items between pages never
+shifts or repeats them.
+"""
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.db.client import db
+from app.models.common import SignalStatus
+
+SIGNAL_COLUMNS = "signal_id, candidate_id, source, account_handle, posted_at, text, url, status"
+
+
+def encode_cursor(posted_at: str, signal_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{posted_at}|{signal_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(posted_at, signal_id) of the last row on the previous page"""
+    try:
+        posted_at, signal_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        UUID(signal_id)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+    return posted_at, signal_id
+
+
+def list_signals(status: SignalStatus, limit: int = 50, cursor: Optional[str] = None,
+                 candidate_id: Optional[UUID] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of signals with `status`, newest first, and the cursor for the next page"""
+    query = db.supabase.table('signals').select(SIGNAL_COLUMNS).eq('status', status.value)
+    if candidate_id:
+        query = query.eq('candidate_id', str(candidate_id))
+    if cursor:
+        posted_at, signal_id = decode_cursor(cursor)
+        query = query.or_(f'posted_at.lt."{posted_at}",and(posted_at.eq."{posted_at}",signal_id.lt.{signal_id})')
+    result = query.order("posted_at", desc=True).order("signal_id", desc=True).limit(limit).execute()
+
+    rows = result.data or []
+    next_cursor = encode_cursor(rows[-1]["posted_at"], rows[-1]["signal_id"]) if len(rows) == limit else None
+    return rows, next_cursor
+
+
+def set_status(signal_ids: List[UUID], status: SignalStatus) -> int:
+    """Move signals to `status`; returns rows updated"""
+    if not signal_ids:
+        return 0
+    result = db.supabase.table('signals')\
+        .update({"status": status.value})\
+        .in_('signal_id', [str(s) for s in signal_ids])\
+        .execute()
+    return len(result.data or [])
+
+
+def status_counts() -> Dict[str, int]:
+    counts = {}
+    for status in SignalStatus:
+        result = db.supabase.table('signals').select("signal_id", count="exact").eq('status', status.value)\
+            .limit(1).execute()
+        counts[status.value] = result.count or 0
+    return counts
@@ -0,0 +1,18 @@
+"""Prefect flows"""
+import os
+
+from app.config import settings
+
+
+def configure_prefect():
+    """Copy our Prefect settings into the environment; call before importing prefect
+
+    Prefect reads its API location from the process environment when it is
+    first imported. With no PREFECT_API_URL set, flows run against a local
+    ephemeral Prefect server. Settings are read here rather than when this
+    package is imported, so importing it needs no credentials.
+    """
+    if settings.prefect_api_url:
+        os.environ.setdefault("PREFECT_API_URL", settings.prefect_api_url)
+    if settings.prefect_api_key:
+        os.environ.setdefault("PREFECT_API_KEY", settings.prefect_api_key)
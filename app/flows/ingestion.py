@@ -0,0 +1,121 @@
+"""Prefect flows for the full ingestion pipeline
+
+Upcoming partitions of the history tables are created first, so the run's
+writes land in them rather than in the default partitions. The pipeline then
+runs in two stages. Stages are sequential because each one reads what the
+previous one wrote, but everything inside a stage is independent and runs
+concurrently:
+
+1. Collection: FEC (backfill or incremental) and every enabled jurisdiction
+2. Enrichment: committee IDs
+
+Concurrency comes from asyncio, not from a Prefect task runner: tasks are
+awaited directly and gathered on the flow's event loop. They share
+loop-bound state (the pooled HTTP client, the asyncpg pool, rate limiters),
+so submitting them to a thread-pool runner, which gives each task its own
+event loop, would break that sharing rather than add parallelism.
+"""
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.db.partitions import ensure_partitions
+from app.flows import configure_prefect
+from app.integrations.fec_client import FECClient
+from app.integrations.states import get_jurisdiction_client, load_jurisdictions
+from app.pipelines import fec as fec_pipeline
+
+configure_prefect()
+
+from prefect import flow, task  # noqa: E402
+from prefect.tasks import task_input_hash  # noqa: E402
+
+# Re-running a flow inside this window reuses finished task results instead of
+# hitting the APIs again. Keyed on task inputs, so a different cycle or
+# jurisdiction is always a cache miss.
+CACHE_EXPIRATION = timedelta(hours=6)
+
+
+@task(retries=2, retry_delay_seconds=30)
+async def create_upcoming_partitions() -> Dict[str, List[str]]:
+    """Create the current and next partitions of filings, media_mentions and signals"""
+    return await ensure_partitions()
+
+
+@task(retries=3, retry_delay_seconds=[10, 30, 90], cache_key_fn=task_input_hash, cache_expiration=CACHE_EXPIRATION)
+async def fec_backfill_cycle(cycle: int) -> int:
+    """Backfill one FEC cycle"""
+    async with FECClient() as client:
+        return await client.backfill_cycle(cycle)
+
+
+@task(retries=3, retry_delay_seconds=[10, 30, 90])
+async def fec_incremental_sync() -> Dict[str, Any]:
+    """Collect FEC candidates we don't have yet"""
+    return await fec_pipeline.collect_new_filings()
+
+
+@task(retries=2, retry_delay_seconds=60, cache_key_fn=task_input_hash, cache_expiration=CACHE_EXPIRATION)
+async def ingest_jurisdiction(jurisdiction_id: str) -> Dict[str, Any]:
+    """Run the state/local client for one jurisdiction"""
+    jurisdiction = next(j for j in load_jurisdictions(enabled_only=False) if j["id"] == jurisdiction_id)
+    client = get_jurisdiction_client(jurisdiction)
+    if client is None:
+        return {"jurisdiction": jurisdiction_id, "status": "skipped"}
+
+    await client.ingest_all()
+    return {"jurisdiction": jurisdiction_id, "status": "completed"}
+
+
+@task(retries=3, retry_delay_seconds=[10, 30, 90])
+async def enrich_committees(max_batches: int = 20) -> Dict[str, Any]:
+    """Enrich committee IDs batch by batch until done or max_batches is hit"""
+    return await fec_pipeline.enrich_all_committee_ids(max_batches)
+
+
+@flow(name="fec-backfill")
+async def fec_backfill_flow(cycles: Optional[List[int]] = None) -> Dict[int, int]:
+    """Backfill all configured FEC cycles in parallel"""
+    cycles = cycles or settings.backfill_cycles
+    stored = await asyncio.gather(*(fec_backfill_cycle(cycle) for cycle in cycles))
+    return dict(zip(cycles, stored))
+
+
+@flow(name="fec-incremental")
+async def fec_incremental_flow() -> Dict[str, Any]:
+    """Pick up new FEC filings"""
+    return await fec_incremental_sync()
+
+
+@flow(name="jurisdictions")
+async def jurisdictions_flow(jurisdiction_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Ingest every enabled jurisdiction in parallel"""
+    if not settings.enable_states:
+        return []
+    if jurisdiction_ids is None:
+        jurisdiction_ids = [j["id"] for j in load_jurisdictions()]
+    return list(await asyncio.gather(*(ingest_jurisdiction(j) for j in jurisdiction_ids)))
+
+
+@flow(name="enrichment")
+async def enrichment_flow() -> Dict[str, Any]:
+    """Committee enrichment"""
+    return {"committees": await enrich_committees()}
+
+
+@flow(name="full-pipeline")
+async def full_pipeline_flow(backfill: bool = False) -> Dict[str, Any]:
+    """Partitions -> collection -> enrichment"""
+    partitions_result = await create_upcoming_partitions()
+    fec_stage = fec_backfill_flow() if backfill else fec_incremental_flow()
+    fec_result, jurisdiction_results = await asyncio.gather(fec_stage, jurisdictions_flow())
+
+    enrichment_result = await enrichment_flow()
+
+    return {
+        "partitions": partitions_result,
+        "fec": fec_result,
+        "jurisdictions": jurisdiction_results,
+        "enrichment": enrichment_result,
+    }
@@ -0,0 +1 @@
+"""In-memory candidate-committee relationship graph"""
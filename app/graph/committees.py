@@ -0,0 +1,291 @@
+"""Candidate-committee graph: who is linked to which committees, in what role
+
+Candidates, committees and every candidate_committees link (all roles, e.g.
+principal campaign committee, joint fundraiser, leadership PAC) are held as
+CSR adjacency in both directions, plus committee -> treasurer and treasurer
+-> committees, so neighborhood and shared-committee/treasurer queries are a
+few array slices instead of a crawl over the REST API.
+
+The first query loads everything. After that, refreshes (at most every
+graph_refresh_seconds, or on POST /graph/refresh) read only rows whose
+updated_at passed the last watermark and rebuild the arrays from the merged
+edges. Deleted rows are only noticed on a full reload, which happens every
+graph_full_reload_seconds. Each refresh builds a new snapshot and swaps it in,
+so queries never see a half-applied update.
+"""
+import asyncio
+import re
+import time
+from array import array
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db.client import db
+from app.graph.csr import CSR
+from app.models.common import SharedVia
+from app.models.records import RecordBatch
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CANDIDATE_COLUMNS = ["candidate_id", "full_name", "state", "office", "updated_at"]
+COMMITTEE_COLUMNS = ["committee_id", "name", "fec_committee_id", "treasurer_name", "designation", "updated_at"]
+LINK_COLUMNS = ["candidate_id", "committee_id", "role", "updated_at"]
+NO_TREASURER = -1
+
+
+def normalize_treasurer(name: Optional[str]) -> Optional[str]:
+    """Treasurer names as FEC filers type them vary in punctuation and spacing"""
+    if not name:
+        return None
+    return " ".join(re.sub(r"[.,]", " ", name).upper().split()) or None
+
+
+class _Nodes:
+    """Ids of one node type, their attributes, and id -> index"""
+
+    __slots__ = ("ids", "index", "attrs")
+
+    def __init__(self, ids: List[str], attrs: List[Optional[tuple]]):
+        self.ids = ids
+        self.attrs = attrs
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+
+    def copy(self) -> "_Nodes":
+        nodes = _Nodes.__new__(_Nodes)
+        nodes.ids, nodes.attrs, nodes.index = list(self.ids), list(self.attrs), dict(self.index)
+        return nodes
+
+    def upsert(self, node_id: str, attrs: Optional[tuple]) -> int:
+        i = self.index.get(node_id)
+        if i is None:
+            i = self.index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self.attrs.append(attrs)
+        elif attrs is not None:
+            self.attrs[i] = attrs
+        return i
+
+
+class _Snapshot:
+    __slots__ = ("candidates", "committees", "roles", "role_index", "treasurers", "treasurer_index",
+                 "committee_treasurer", "candidate_committees", "committee_candidates", "treasurer_committees")
+
+    def __init__(self, candidates: _Nodes, committees: _Nodes, roles: List[str],
+                 edges: Dict[Tuple[int, int], int]):
+        self.candidates = candidates
+        self.committees = committees
+        self.roles = roles
+        self.role_index = {role: i for i, role in enumerate(roles)}
+
+        # Treasurers are derived from committee attrs: (name, fec_committee_id, designation, treasurer)
+        self.treasurers: List[str] = []
+        self.treasurer_index: Dict[str, int] = {}
+        self.committee_treasurer = array("i", [NO_TREASURER]) * len(committees.ids)
+        for m, attrs in enumerate(committees.attrs):
+            treasurer = attrs[3] if attrs else None
+            if treasurer:
+                t = self.treasurer_index.get(treasurer)
+                if t is None:
+                    t = self.treasurer_index[treasurer] = len(self.treasurers)
+                    self.treasurers.append(treasurer)
+                self.committee_treasurer[m] = t
+
+        self.candidate_committees = CSR.build(len(candidates.ids), ((c, m, r) for (c, m), r in edges.items()))
+        self.committee_candidates = self.candidate_committees.transpose(len(committees.ids))
+        self.treasurer_committees = CSR.build(len(self.treasurers), (
+            (t, m, 0) for m, t in enumerate(self.committee_treasurer) if t != NO_TREASURER))
+
+    def edges(self) -> Dict[Tuple[int, int], int]:
+        return {(c, m): r for c, m, r in self.candidate_committees.edges()}
+
+    # Serialization for responses
+
+    def candidate(self, c: int) -> Dict[str, Any]:
+        full_name, state, office = self.candidates.attrs[c] or (None, None, None)
+        return {"candidate_id": self.candidates.ids[c], "full_name": full_name, "state": state, "office": office}
+
+    def committee(self, m: int, role: Optional[int] = None) -> Dict[str, Any]:
+        name, fec_committee_id, designation, treasurer = self.committees.attrs[m] or (None, None, None, None)
+        result = {"committee_id": self.committees.ids[m], "name": name, "fec_committee_id": fec_committee_id,
+                  "designation": designation, "treasurer": treasurer}
+        if role is not None:
+            result["role"] = self.roles[role]
+        return result
+
+
+def _scan(table: str, batch: RecordBatch, since: Optional[str]) -> RecordBatch:
+    return db.scan(table, batch, where=(lambda q: q.gt('updated_at', since)) if since else None)
+
+
+def _max_updated(batch: RecordBatch, current: Optional[str]) -> Optional[str]:
+    values = [v for v in batch.column("updated_at") if v]
+    return max(values + ([current] if current else []), default=None)
+
+
+class CommitteeGraph:
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._watermarks: Dict[str, Optional[str]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._checked_at = 0.0
+        self._full_loaded_at = 0.0
+        self._last_refresh: Dict[str, Any] = {}
+
+    # Loading
+
+    def _apply(self, full: bool) -> Dict[str, Any]:
+        """Read rows changed since the watermarks (everything when full) and build a new snapshot"""
+        start = time.perf_counter()
+        base = None if full else self._snapshot
+        watermarks = {} if full else dict(self._watermarks)
+
+        # Ids stay strings (they become the node ids as-is); repeated link endpoints share one object
+        candidates_batch = _scan('candidates', RecordBatch(CANDIDATE_COLUMNS, pooled_columns=["state", "office"]),
+                                 watermarks.get("candidates"))
+        committees_batch = _scan('committees', RecordBatch(COMMITTEE_COLUMNS, pooled_columns=["designation"]),
+                                 watermarks.get("committees"))
+        links_batch = _scan('candidate_committees', RecordBatch(LINK_COLUMNS, pooled_columns=[
+            "candidate_id", "committee_id", "role"]), watermarks.get("links"))
+
+        changed = len(candidates_batch) + len(committees_batch) + len(links_batch)
+        if base is not None and not changed:
+            return {"mode": "incremental", "changed_rows": 0}
+
+        candidates = base.candidates.copy() if base else _Nodes([], [])
+        committees = base.committees.copy() if base else _Nodes([], [])
+        roles = list(base.roles) if base else []
+        role_index = dict(base.role_index) if base else {}
+        edges = base.edges() if base else {}
+
+        for candidate_id, *attrs in zip(*(candidates_batch.column(c) for c in CANDIDATE_COLUMNS[:4])):
+            candidates.upsert(candidate_id, tuple(attrs))
+        for committee_id, name, fec_committee_id, treasurer, designation in zip(
+                *(committees_batch.column(c) for c in COMMITTEE_COLUMNS[:5])):
+            committees.upsert(committee_id, (name, fec_committee_id, designation, normalize_treasurer(treasurer)))
+        for candidate_id, committee_id, role in zip(links_batch.column("candidate_id"),
+                                                    links_batch.column("committee_id"), links_batch.column("role")):
+            if not candidate_id or not committee_id:
+                continue
+            role = role or "unspecified"
+            r = role_index.get(role)
+            if r is None:
+                r = role_index[role] = len(roles)
+                roles.append(role)
+            # A link can arrive before its endpoints' rows are visible; they get attributes once they are
+            edges[(candidates.upsert(candidate_id, None), committees.upsert(committee_id, None))] = r
+
+        snapshot = _Snapshot(candidates, committees, roles, edges)
+        self._watermarks = {
+            "candidates": _max_updated(candidates_batch, watermarks.get("candidates")),
+            "committees": _max_updated(committees_batch, watermarks.get("committees")),
+            "links": _max_updated(links_batch, watermarks.get("links")),
+        }
+        self._snapshot = snapshot
+        return {"mode": "full" if base is None else "incremental", "changed_rows": changed,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    async def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """Apply changed rows, or reload everything when full, stale or never loaded"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            full = full or self._snapshot is None or now - self._full_loaded_at > settings.graph_full_reload_seconds
+            result = await asyncio.to_thread(self._apply, full)
+            self._checked_at = now
+            if full:
+                self._full_loaded_at = now
+            self._last_refresh = result
+            if result.get("changed_rows"):
+                logger.info("Committee graph refreshed", **result)
+            return result
+
+    async def ensure_fresh(self) -> _Snapshot:
+        """The current snapshot, refreshed first if the last check is older than graph_refresh_seconds"""
+        if self._snapshot is None or time.monotonic() - self._checked_at > settings.graph_refresh_seconds:
+            await self.refresh()
+        return self._snapshot
+
+    # Queries
+
+    async def neighborhood(self, candidate_id: str, depth: int = 1, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """A candidate's committees with roles; with depth 2, the other candidates on those committees"""
+        graph = await self.ensure_fresh()
+        c = graph.candidates.index.get(candidate_id)
+        if c is None:
+            return None
+        committees = [graph.committee(m, r) for m, r in graph.candidate_committees.row_items(c)]
+        result = {"candidate": graph.candidate(c), "committees": committees}
+        if depth >= 2:
+            via: Dict[int, List[str]] = defaultdict(list)
+            for m in graph.candidate_committees.neighbors(c):
+                for other in graph.committee_candidates.neighbors(m):
+                    if other != c:
+                        via[other].append(graph.committees.ids[m])
+            result["candidates"] = [dict(graph.candidate(other), via_committees=committee_ids)
+                                    for other, committee_ids in sorted(via.items(), key=lambda kv: -len(kv[1]))[:limit]]
+        return result
+
+    async def shared(self, candidate_id: str, via: SharedVia = SharedVia.COMMITTEE, role: Optional[str] = None,
+                     limit: int = 50) -> Optional[Dict[str, Any]]:
+        """Other candidates sharing a committee (optionally only committees whose role matches) or a treasurer"""
+        graph = await self.ensure_fresh()
+        c = graph.candidates.index.get(candidate_id)
+        if c is None:
+            return None
+        role_filter = role.lower() if role else None
+        shared: Dict[int, List[str]] = defaultdict(list)
+
+        for m, r in graph.candidate_committees.row_items(c):
+            if via == SharedVia.TREASURER:
+                t = graph.committee_treasurer[m]
+                if t == NO_TREASURER:
+                    continue
+                linked = graph.treasurer_committees.neighbors(t)
+                label = graph.treasurers[t]
+            else:
+                if role_filter and role_filter not in graph.roles[r].lower():
+                    continue
+                linked = [m]
+                label = graph.committees.ids[m]
+            for other_committee in linked:
+                for other in graph.committee_candidates.neighbors(other_committee):
+                    if other != c and label not in shared[other]:
+                        shared[other].append(label)
+
+        def rank(item):
+            # Most shared first, then by name; any attribute may be NULL
+            full_name, state, office = graph.candidates.attrs[item[0]] or (None, None, None)
+            return -len(item[1]), full_name or "", state or "", office or ""
+
+        ranked = sorted(shared.items(), key=rank)
+        key = "shared_treasurers" if via == SharedVia.TREASURER else "shared_committees"
+        return {
+            "candidate": graph.candidate(c),
+            "via": via.value,
+            "count": len(ranked),
+            "candidates": [dict(graph.candidate(other), **{key: labels}) for other, labels in ranked[:limit]],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        graph = self._snapshot
+        if graph is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "candidates": len(graph.candidates.ids),
+            "committees": len(graph.committees.ids),
+            "treasurers": len(graph.treasurers),
+            "links": graph.candidate_committees.nnz,
+            "roles": graph.roles,
+            "adjacency_bytes": sum(csr.nbytes() for csr in (
+                graph.candidate_committees, graph.committee_candidates, graph.treasurer_committees)),
+            "watermarks": self._watermarks,
+            "last_refresh": self._last_refresh,
+        }
+
+
+# Global instance
+committee_graph = CommitteeGraph()
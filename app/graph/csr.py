@@ -0,0 +1,59 @@
+"""Compressed sparse row adjacency over integer node indexes
+
+Row r's neighbors are indices[indptr[r]:indptr[r + 1]], with a parallel
+`data` array for an edge attribute (e.g. a role code). Arrays are stdlib
+typed arrays: 4 bytes per edge endpoint and no per-edge Python objects, so a
+million-edge graph takes a few MB and slicing a row is a memcpy.
+"""
+from array import array
+from typing import Iterable, Iterator, Tuple
+
+
+class CSR:
+    __slots__ = ("indptr", "indices", "data")
+
+    def __init__(self, indptr: array, indices: array, data: array):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def build(cls, rows: int, edges: Iterable[Tuple[int, int, int]]) -> "CSR":
+        """CSR with `rows` rows from (row, column, value) edges, columns ascending within a row"""
+        edges = sorted(edges)
+        indptr = array("l", bytes(array("l").itemsize * (rows + 1)))
+        indices = array("i", (column for _, column, _ in edges))
+        data = array("i", (value for _, _, value in edges))
+        for row, _, _ in edges:
+            indptr[row + 1] += 1
+        for row in range(rows):
+            indptr[row + 1] += indptr[row]
+        return cls(indptr, indices, data)
+
+    def transpose(self, columns: int) -> "CSR":
+        """The reverse adjacency: column -> rows, with the same edge values"""
+        return CSR.build(columns, ((column, row, value) for row, column, value in self.edges()))
+
+    @property
+    def rows(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def neighbors(self, row: int) -> array:
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def row_items(self, row: int) -> Iterator[Tuple[int, int]]:
+        """(column, value) pairs of a row"""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return zip(self.indices[start:end], self.data[start:end])
+
+    def edges(self) -> Iterator[Tuple[int, int, int]]:
+        for row in range(self.rows):
+            for column, value in self.row_items(row):
+                yield row, column, value
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.indptr, self.indices, self.data))
@@ -1,26 +1,41 @@
 """FEC API client for federal data"""
+import asyncio
 import httpx
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date
 from app.config import settings
 from app.db.client import db
-from app.utils.logging import get_logger
+from app.landing import land
+from app.pipelines.fec import (
+    build_candidate_record,
+    candidate_ids_by_fec_id,
+    candidate_update,
+    fetch_our_fec_ids,
+    store_candidate_committees,
+    upsert_candidate_records,
+)
+from app.utils.http import get_http_client
+from app.utils.logging import LogSummary, get_logger
+from app.utils.ratelimit import get_rate_limiter
 from app.utils.retry import api_retry
 
 logger = get_logger(__name__)
+# Per-row events are counted and logged once per log_summary_seconds
+stored_candidates = LogSummary(logger, "Stored FEC candidates")
 
 
 class FECClient:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.fec_api_key
         self.base_url = "https://api.open.fec.gov/v1"
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Defaults to the shared application client, which outlives this object
+        self.client = client or get_http_client()
         
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        pass
     
     @api_retry()
     async def _request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -34,10 +49,14 @@ class FECClient:
             request_params.update(params)
         
         logger.info("Making FEC API request", endpoint=endpoint)
+        # The FEC request budget is shared with the pipelines; each retry takes a slot too
+        await get_rate_limiter("fec").acquire()
         response = await self.client.get(url, params=request_params)
         response.raise_for_status()
         
-        return response.json()
+        data = response.json()
+        land("fec", endpoint, params, data)
+        return data
     
     async def get_candidates(self, cycle: int, party: str = "DEM") -> List[Dict[str, Any]]:
         """Get candidates for election cycle"""
@@ -125,7 +144,8 @@ class FECClient:
             
             if result:
                 candidate_id = str(result[0]['candidate_id'])
-                logger.info("Stored FEC candidate", candidate_id=candidate_id, name=candidate_data.get("name"))
+                logger.debug("Stored FEC candidate", candidate_id=candidate_id, name=candidate_data.get("name"))
+                stored_candidates.inc()
                 return candidate_id
                 
         except Exception as e:
@@ -171,25 +191,56 @@ class FECClient:
         logger.info("Starting FEC backfill", cycles=cycles)
         
         for cycle in cycles:
-            logger.info("Processing FEC cycle", cycle=cycle)
-            
-            # Get candidates
-            candidates = await self.get_candidates(cycle)
-            for candidate_data in candidates:
-                candidate_id = await self.store_candidate(candidate_data, cycle)
-                
-                if candidate_id:
-                    # Get candidate committees
-                    committees = await self.get_committees(cycle)
-                    for committee_data in committees:
-                        committee_id = await self.store_committee(committee_data)
-                        
-                        if committee_id:
-                            # Link candidate and committee
-                            await self._link_candidate_committee(candidate_id, committee_id)
+            await self.backfill_cycle(cycle)
         
+        stored_candidates.flush()
         logger.info("FEC backfill completed")
     
+    async def backfill_cycle(self, cycle: int) -> int:
+        """Backfill candidates and committees for one cycle, returning candidates stored
+
+        Candidates are upserted on their FEC ID in chunks, the same write path
+        as the collection pipelines: new ones under this cycle, ones we already
+        have without their cycle. Each committee is linked to the candidates
+        FEC lists for it.
+        """
+        logger.info("Processing FEC cycle", cycle=cycle)
+
+        candidates = await self.get_candidates(cycle)
+        known_ids = await asyncio.to_thread(fetch_our_fec_ids)
+        new_rows: Dict[str, Dict[str, Any]] = {}
+        updates: Dict[str, Dict[str, Any]] = {}
+        for candidate_data in candidates:
+            fec_id = candidate_data.get("candidate_id")
+            if not fec_id:
+                continue
+            record = build_candidate_record(candidate_data, cycle)
+            if fec_id in known_ids:
+                updates[fec_id] = candidate_update(record)
+            else:
+                new_rows[fec_id] = record
+
+        stored = 0
+        for rows in (new_rows, updates):
+            if rows:
+                upserted, _ = await asyncio.to_thread(upsert_candidate_records, list(rows.values()))
+                stored += upserted
+        stored_candidates.inc(stored)
+
+        committees_by_fec_id: Dict[str, List[Dict[str, Any]]] = {}
+        for committee_data in await self.get_committees(cycle):
+            for fec_id in committee_data.get("candidate_ids") or []:
+                if fec_id in new_rows or fec_id in updates:
+                    committees_by_fec_id.setdefault(fec_id, []).append(committee_data)
+        if committees_by_fec_id:
+            candidate_ids = await asyncio.to_thread(candidate_ids_by_fec_id, list(committees_by_fec_id))
+            await asyncio.to_thread(store_candidate_committees, {
+                candidate_ids[fec_id]: committees
+                for fec_id, committees in committees_by_fec_id.items() if fec_id in candidate_ids
+            })
+
+        return stored
+
     async def _link_candidate_committee(self, candidate_id: str, committee_id: str):
         """Link candidate and committee"""
         try:
@@ -0,0 +1,231 @@
+"""Streaming parser for FEC electronic filing (.fec) files
+
+A .fec file is one record per line: an HDR header, the report's cover form,
+then schedules. Since format version 6 fields are separated by ASCII 28
+(FS); older comma-separated versions are not supported. Only Schedule A
+(receipts) and Schedule B (disbursements) itemizations are extracted, each
+through a field map chosen by the header's format version.
+
+Rows are accumulated into column batches (one list per output column) of at
+most `batch_rows`, so memory is bounded by the batch size, not the file.
+Large files can be split into newline-aligned byte ranges with plan_chunks()
+and each range parsed independently (e.g. in worker processes) with
+parse_chunk().
+"""
+import operator
+import os
+import re
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+FIELD_SEPARATOR = "\x1c"
+ENCODING = "latin-1"
+
+# Output columns, in contributions table order
+COLUMNS = (
+    "file_number", "committee_id", "schedule", "line_number", "transaction_id", "entity_type", "name",
+    "city", "state", "zip_code", "employer", "occupation", "transaction_date", "amount", "aggregate_amount",
+    "purpose", "memo_code",
+)
+
+# Field positions per schedule, by format version
+FieldMap = Dict[str, Dict[str, int]]
+FIELD_MAPS: List[Tuple["re.Pattern[str]", FieldMap]] = [
+    (re.compile(r"^[678]\."), {
+        "SA": {
+            "transaction_id": 2, "entity_type": 5, "organization_name": 6, "last_name": 7, "first_name": 8,
+            "city": 14, "state": 15, "zip_code": 16, "transaction_date": 19, "amount": 20,
+            "aggregate_amount": 21, "purpose": 22, "employer": 23, "occupation": 24, "memo_code": 42,
+        },
+        "SB": {
+            "transaction_id": 2, "entity_type": 5, "organization_name": 6, "last_name": 7, "first_name": 8,
+            "city": 14, "state": 15, "zip_code": 16, "transaction_date": 19, "amount": 20,
+            "purpose": 22, "memo_code": 41,
+        },
+    }),
+]
+
+
+class EFileError(ValueError):
+    """A .fec file this parser can't read"""
+
+
+class EFileHeader:
+    __slots__ = ("file_number", "version", "committee_id", "form_type", "data_offset")
+
+    def __init__(self, file_number: int, version: str, committee_id: Optional[str], form_type: Optional[str],
+                 data_offset: int):
+        self.file_number = file_number
+        self.version = version
+        self.committee_id = committee_id
+        self.form_type = form_type
+        # Byte offset of the first record after the cover form
+        self.data_offset = data_offset
+
+
+def field_map(version: str) -> FieldMap:
+    for pattern, fields in FIELD_MAPS:
+        if pattern.match(version):
+            return fields
+    raise EFileError(f"Unsupported .fec format version {version}")
+
+
+def _strip(value: str) -> str:
+    return value.strip().strip('"').strip()
+
+
+def read_header(path: str) -> EFileHeader:
+    """HDR and cover records of a .fec file named <file_number>.fec"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if not stem.isdigit():
+        raise EFileError(f"{path}: expected a file named <file_number>.fec")
+    with open(path, "rb") as f:
+        hdr = f.readline().decode(ENCODING)
+        cover = f.readline().decode(ENCODING)
+        data_offset = f.tell()
+    if FIELD_SEPARATOR not in hdr:
+        raise EFileError(f"{path}: comma-separated .fec files (format versions before 6) are not supported")
+    hdr_fields = [_strip(v) for v in hdr.split(FIELD_SEPARATOR)]
+    if len(hdr_fields) < 3 or hdr_fields[0].upper() != "HDR":
+        raise EFileError(f"{path}: missing HDR record")
+    cover_fields = [_strip(v) for v in cover.split(FIELD_SEPARATOR)]
+    return EFileHeader(
+        file_number=int(stem),
+        version=hdr_fields[2],
+        committee_id=cover_fields[1] if len(cover_fields) > 1 else None,
+        form_type=cover_fields[0] or None,
+        data_offset=data_offset,
+    )
+
+
+def _parse_date(value: str) -> Optional[date]:
+    if len(value) != 8 or not value.isdigit():
+        return None
+    try:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+    except ValueError:
+        return None
+
+
+def _parse_amount(value: str) -> Optional[Decimal]:
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def empty_batch() -> Dict[str, list]:
+    return {column: [] for column in COLUMNS}
+
+
+# Source fields read for every record, in this order; absent ones read as ""
+_SOURCE_FIELDS = ("transaction_id", "entity_type", "organization_name", "last_name", "first_name", "city", "state",
+                  "zip_code", "employer", "occupation", "transaction_date", "amount", "aggregate_amount", "purpose",
+                  "memo_code")
+
+
+def _getters(maps: FieldMap) -> Dict[str, Tuple[Callable[[List[str]], tuple], int]]:
+    """Per schedule, an itemgetter over _SOURCE_FIELDS and the number of fields it reads"""
+    getters = {}
+    for schedule, positions in maps.items():
+        # Fields a schedule doesn't have read the "" appended to every record
+        indices = [positions.get(name, -1) for name in _SOURCE_FIELDS]
+        getters[schedule] = (operator.itemgetter(*indices), max(positions.values()) + 1)
+    return getters
+
+
+def parse_lines(lines: Iterable[bytes], header: EFileHeader, batch_rows: int) -> Iterator[Dict[str, list]]:
+    """Column batches of the Schedule A/B records in `lines`; other records are skipped"""
+    getters = _getters(field_map(header.version))
+    file_number, committee_id = header.file_number, header.committee_id
+    batch = empty_batch()
+    count = 0
+    for raw in lines:
+        if raw[:2] not in (b"SA", b"SB") and raw[1:3] not in (b"SA", b"SB"):
+            continue
+        line = raw.decode(ENCODING).rstrip("\r\n")
+        fields = line.split(FIELD_SEPARATOR)
+        if '"' in line:
+            fields = [_strip(v) for v in fields]
+        line_number = fields[0]
+        getter, width = getters[line_number[:2]]
+        # Records may end early when trailing fields are empty
+        if len(fields) < width:
+            fields.extend([""] * (width - len(fields)))
+        fields.append("")
+        (transaction_id, entity_type, organization, last_name, first_name, city, state, zip_code, employer,
+         occupation, transaction_date, amount, aggregate_amount, purpose, memo_code) = getter(fields)
+
+        name = organization
+        if not name and last_name:
+            name = f"{last_name}, {first_name}" if first_name else last_name
+
+        batch["file_number"].append(file_number)
+        batch["committee_id"].append(committee_id)
+        batch["schedule"].append(line_number[1])
+        batch["line_number"].append(line_number)
+        batch["transaction_id"].append(transaction_id or None)
+        batch["entity_type"].append(entity_type or None)
+        batch["name"].append(name or None)
+        batch["city"].append(city or None)
+        batch["state"].append(state or None)
+        batch["zip_code"].append(zip_code or None)
+        batch["employer"].append(employer or None)
+        batch["occupation"].append(occupation or None)
+        batch["transaction_date"].append(_parse_date(transaction_date))
+        batch["amount"].append(_parse_amount(amount))
+        batch["aggregate_amount"].append(_parse_amount(aggregate_amount))
+        batch["purpose"].append(purpose or None)
+        batch["memo_code"].append(memo_code or None)
+        count += 1
+
+        if count >= batch_rows:
+            yield batch
+            batch = empty_batch()
+            count = 0
+    if count:
+        yield batch
+
+
+def iter_batches(path: str, header: EFileHeader, batch_rows: int) -> Iterator[Dict[str, list]]:
+    """Column batches for a whole file, read line by line"""
+    with open(path, "rb") as f:
+        f.seek(header.data_offset)
+        yield from parse_lines(f, header, batch_rows)
+
+
+def plan_chunks(path: str, header: EFileHeader, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Newline-aligned [start, end) byte ranges of about `chunk_bytes` covering the records"""
+    size = os.path.getsize(path)
+    chunks = []
+    start = header.data_offset
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + chunk_bytes
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            chunks.append((start, min(end, size)))
+            start = end
+    return chunks
+
+
+def _read_range(f, start: int, end: int) -> Iterator[bytes]:
+    f.seek(start)
+    position = start
+    while position < end:
+        line = f.readline()
+        if not line:
+            return
+        position += len(line)
+        yield line
+
+
+def parse_chunk(path: str, header: EFileHeader, start: int, end: int, batch_rows: int) -> List[Dict[str, list]]:
+    """Column batches for one byte range of a file; runs in worker processes"""
+    with open(path, "rb") as f:
+        return list(parse_lines(_read_range(f, start, end), header, batch_rows))
@@ -0,0 +1,381 @@
+"""Outbound push of candidate changes to Zapier and CRM webhooks
+
+Changes come from the candidate change feed (app.db.changes). The enqueue loop
+waits for a burst of changes, lets it settle for push_coalesce_window seconds,
+then folds every change to the same candidate into one event and writes one
+push_outbox row per event per destination before advancing its cursor. The
+cursor only moves over seqs below the feed's settled horizon, so a change
+committed late by a long batch upsert is never stepped over. Rows only leave
+the outbox once a destination acknowledges them, so delivery is at-least-once;
+receivers should use `seq` to drop stale or repeated events.
+
+Each destination has its own delivery loop and rate limit ("push:<name>"),
+sending up to push_concurrency batches of push_batch_size events at a time.
+Failed batches are retried with exponential backoff and given up on after
+push_max_attempts.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+from app.db.changes import change_horizon, change_notifier, fetch_changes
+from app.db.client import db
+from app.models.common import OutboxStatus
+from app.models.push import OutboxEvent
+from app.utils.http import get_http_client
+from app.utils.logging import get_logger
+from app.utils.metrics import PUSH_DELIVERY_LAG_SECONDS, PUSH_EVENTS
+from app.utils.ratelimit import get_rate_limiter
+
+logger = get_logger(__name__)
+
+CURSOR_NAME = "candidate_changes"
+CHANGES_PAGE_SIZE = 1000
+DUE_PAGE_SIZE = 1000
+INSERT_CHUNK_SIZE = 500
+MAX_RETRY_DELAY = 3600.0
+
+OP_EVENTS = {"I": "candidate.created", "U": "candidate.updated", "D": "candidate.deleted"}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def coalesce(changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fold ordered changes into one event per candidate
+
+    Updates merge into the pending insert or update; a delete replaces
+    whatever came before it.
+    """
+    events: Dict[str, Dict[str, Any]] = {}
+    for change in changes:
+        candidate_id = change["candidate_id"]
+        op = change["op"]
+        event = events.get(candidate_id)
+        if event is None:
+            events[candidate_id] = {
+                "candidate_id": candidate_id,
+                "op": op,
+                "changed": dict(change.get("changed") or {}),
+                "first_seq": change["seq"],
+                "last_seq": change["seq"],
+                "first_changed_at": change.get("changed_at"),
+            }
+            continue
+        if op == "U" and event["op"] != "D":
+            event["changed"].update(change.get("changed") or {})
+        else:
+            event["op"] = op
+            event["changed"] = dict(change.get("changed") or {})
+        event["last_seq"] = change["seq"]
+    return list(events.values())
+
+
+def build_outbox_events(destination: str, events: List[Dict[str, Any]]) -> List[OutboxEvent]:
+    """Outbox rows for one destination"""
+    now = _now()
+    rows = []
+    for event in events:
+        name = OP_EVENTS[event["op"]]
+        rows.append(OutboxEvent(
+            destination=destination,
+            candidate_id=event["candidate_id"],
+            event=name,
+            payload={
+                "event": name,
+                "candidate_id": event["candidate_id"],
+                "changes": event["changed"] if event["op"] != "D" else None,
+                "seq": event["last_seq"],
+                "changed_at": event["first_changed_at"],
+            },
+            first_seq=event["first_seq"],
+            last_seq=event["last_seq"],
+            first_changed_at=event["first_changed_at"],
+            next_attempt_at=now,
+        ))
+    return rows
+
+
+# Cursor
+
+def load_cursor() -> Optional[int]:
+    """Last change seq already written to the outbox"""
+    result = db.supabase.table('push_cursors').select("seq").eq('name', CURSOR_NAME).limit(1).execute()
+    return result.data[0]['seq'] if result.data else None
+
+
+def save_cursor(seq: int):
+    db.supabase.table('push_cursors').upsert({"name": CURSOR_NAME, "seq": seq}, on_conflict="name").execute()
+
+
+# Outbox
+
+def enqueue_changes(destinations: List[str]) -> int:
+    """Move new candidate changes into the outbox; returns events written per destination"""
+    cursor = load_cursor()
+    if cursor is None:
+        # First run: push changes from now on rather than the whole history. The settled
+        # horizon rather than the highest visible seq, so changes still in flight are pushed
+        save_cursor(change_horizon.advance())
+        return 0
+
+    written = 0
+    while True:
+        # Gap-free: every seq up to the last one returned has committed or rolled back
+        changes = fetch_changes(cursor, CHANGES_PAGE_SIZE)
+        if not changes:
+            break
+        events = coalesce(changes)
+        for destination in destinations:
+            rows = [e.model_dump(mode="json", exclude={"outbox_id", "created_at", "updated_at", "delivered_at"})
+                    for e in build_outbox_events(destination, events)]
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                # Replaying a page after a crash hits the unique key instead of duplicating events
+                db.supabase.table('push_outbox')\
+                    .upsert(rows[start:start + INSERT_CHUNK_SIZE],
+                            on_conflict="destination,candidate_id,last_seq", ignore_duplicates=True)\
+                    .execute()
+            PUSH_EVENTS.labels(destination, "enqueued").inc(len(events))
+            PUSH_EVENTS.labels(destination, "coalesced").inc(len(changes) - len(events))
+        written += len(events)
+        cursor = changes[-1]["seq"]
+        save_cursor(cursor)
+        if len(changes) < CHANGES_PAGE_SIZE:
+            break
+    return written
+
+
+def due_events(destination: str, limit: int, after: int = 0) -> List[OutboxEvent]:
+    """Pending events whose next attempt is due, oldest first, with outbox_id > after"""
+    result = db.supabase.table('push_outbox')\
+        .select("outbox_id, destination, candidate_id, event, payload, first_seq, last_seq, "
+                "first_changed_at, attempts")\
+        .eq('destination', destination)\
+        .eq('status', OutboxStatus.PENDING.value)\
+        .lte('next_attempt_at', _now().isoformat())\
+        .gt('outbox_id', after)\
+        .order("outbox_id")\
+        .limit(limit)\
+        .execute()
+    return [OutboxEvent(**row) for row in result.data or []]
+
+
+def pending_count(destination: str) -> int:
+    result = db.supabase.table('push_outbox')\
+        .select("outbox_id", count="exact")\
+        .eq('destination', destination)\
+        .eq('status', OutboxStatus.PENDING.value)\
+        .limit(1)\
+        .execute()
+    return result.count or 0
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return str(error) or type(error).__name__
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        value = error.response.headers.get("retry-after", "")
+        if value.isdigit():
+            return float(value)
+    return None
+
+
+class DestinationStats:
+    __slots__ = ("delivered", "batches", "failed_batches", "dead", "started", "last_delivery_at", "last_error")
+
+    def __init__(self):
+        self.delivered = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.dead = 0
+        self.started = _now()
+        self.last_delivery_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = (_now() - self.started).total_seconds()
+        return {
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "dead": self.dead,
+            "events_per_second": round(self.delivered / elapsed, 3) if elapsed > 0 else None,
+            "last_delivery_at": self.last_delivery_at.isoformat() if self.last_delivery_at else None,
+            "last_error": self.last_error,
+        }
+
+
+class PushDispatcher:
+    """Background enqueue and delivery loops for the enabled push destinations"""
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self.stats: Dict[str, DestinationStats] = {}
+
+    def _headers(self, destination: str) -> Dict[str, str]:
+        if destination == "crm" and settings.crm_webhook_token:
+            return {"Authorization": f"Bearer {settings.crm_webhook_token}"}
+        return {}
+
+    async def _send(self, destination: str, url: str, batch: List[OutboxEvent]):
+        stats = self.stats.setdefault(destination, DestinationStats())
+        await get_rate_limiter(f"push:{destination}").acquire()
+        try:
+            response = await get_http_client().post(
+                url,
+                json={"events": [e.payload for e in batch], "sent_at": _now().isoformat()},
+                headers=self._headers(destination),
+            )
+            response.raise_for_status()
+        except Exception as e:
+            stats.failed_batches += 1
+            stats.last_error = _describe(e)
+            logger.warning("Push batch failed", destination=destination, events=len(batch), error=stats.last_error)
+            await asyncio.to_thread(self._mark_failed, destination, batch, e)
+            return
+
+        now = _now()
+        await asyncio.to_thread(
+            lambda: db.supabase.table('push_outbox')
+            .update({"status": OutboxStatus.DELIVERED.value, "delivered_at": now.isoformat(), "last_error": None})
+            .in_('outbox_id', [e.outbox_id for e in batch])
+            .execute()
+        )
+        lag = PUSH_DELIVERY_LAG_SECONDS.labels(destination)
+        for event in batch:
+            changed_at = _parse_time(event.first_changed_at)
+            if changed_at is not None:
+                lag.observe(max((now - changed_at).total_seconds(), 0.0))
+        PUSH_EVENTS.labels(destination, "delivered").inc(len(batch))
+        stats.delivered += len(batch)
+        stats.batches += 1
+        stats.last_delivery_at = now
+
+    def _mark_failed(self, destination: str, batch: List[OutboxEvent], error: Exception):
+        """Schedule the batch's retry, or mark events dead after push_max_attempts"""
+        by_attempts: Dict[int, List[int]] = {}
+        for event in batch:
+            by_attempts.setdefault(event.attempts + 1, []).append(event.outbox_id)
+        retry_after = _retry_after(error)
+        for attempts, ids in by_attempts.items():
+            update = {"attempts": attempts, "last_error": _describe(error)}
+            if attempts >= settings.push_max_attempts:
+                update["status"] = OutboxStatus.DEAD.value
+                PUSH_EVENTS.labels(destination, "dead").inc(len(ids))
+                self.stats[destination].dead += len(ids)
+            else:
+                delay = retry_after or min(settings.push_retry_seconds * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                update["next_attempt_at"] = (_now() + timedelta(seconds=delay)).isoformat()
+                PUSH_EVENTS.labels(destination, "retried").inc(len(ids))
+            try:
+                db.supabase.table('push_outbox').update(update).in_('outbox_id', ids).execute()
+            except Exception as e:
+                # The events stay due and are simply sent again
+                logger.error("Error recording push failure", destination=destination, error=str(e))
+
+    async def deliver(self, destination: str, url: str) -> int:
+        """Send every due event for a destination; returns events attempted"""
+        attempted = 0
+        after = 0
+        size = max(settings.push_batch_size, 1)
+        window = size * max(settings.push_concurrency, 1)
+        while True:
+            # Keyset paging: events that fail in this pass are rescheduled, so never revisited here
+            events = await asyncio.to_thread(due_events, destination, DUE_PAGE_SIZE, after)
+            if not events:
+                return attempted
+            for start in range(0, len(events), window):
+                chunk = events[start:start + window]
+                batches = [chunk[i:i + size] for i in range(0, len(chunk), size)]
+                await asyncio.gather(*(self._send(destination, url, batch) for batch in batches))
+            attempted += len(events)
+            after = events[-1].outbox_id
+
+    async def flush(self, destinations: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Enqueue new changes and deliver everything due once (CLI and benchmarks)"""
+        destinations = settings.push_destinations if destinations is None else destinations
+        if not destinations:
+            return {"error": "No push destinations enabled"}
+        enqueued = await asyncio.to_thread(enqueue_changes, list(destinations))
+        attempted = await asyncio.gather(*(self.deliver(name, url) for name, url in destinations.items()))
+        return {
+            "events_enqueued": enqueued,
+            "events_attempted": dict(zip(destinations, attempted)),
+            "destinations": {name: self.stats[name].as_dict() for name in destinations if name in self.stats},
+        }
+
+    async def _enqueue_loop(self, destinations: Dict[str, str]):
+        while True:
+            try:
+                if await asyncio.to_thread(enqueue_changes, list(destinations)):
+                    for wakeup in self._wakeups.values():
+                        wakeup.set()
+            except Exception as e:
+                logger.error("Error enqueueing push events", error=str(e))
+            # Changes past the horizon have already notified; come back for them once it settles
+            await change_notifier.wait(settings.changes_poll_interval if change_horizon.behind
+                                       else settings.changes_max_wait)
+            # Let the rest of a burst arrive so it is coalesced into the same events
+            await asyncio.sleep(settings.push_coalesce_window)
+
+    async def _deliver_loop(self, destination: str, url: str):
+        wakeup = self._wakeups[destination]
+        while True:
+            wakeup.clear()
+            try:
+                await self.deliver(destination, url)
+            except Exception as e:
+                logger.error("Error delivering push events", destination=destination, error=str(e))
+            # Woken by new events; the timeout picks up retries coming due
+            try:
+                await asyncio.wait_for(wakeup.wait(), settings.push_retry_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        destinations = settings.push_destinations
+        if settings.enable_zapier_sync and "zapier" not in destinations:
+            logger.warning("ENABLE_ZAPIER_SYNC is set without ZAPIER_WEBHOOK_URL")
+        if settings.enable_push_to_crm and "crm" not in destinations:
+            logger.warning("ENABLE_PUSH_TO_CRM is set without CRM_WEBHOOK_URL")
+        if not destinations or self._tasks:
+            return
+        for name, url in destinations.items():
+            self._wakeups[name] = asyncio.Event()
+            self.stats.setdefault(name, DestinationStats())
+            self._tasks.append(asyncio.create_task(self._deliver_loop(name, url)))
+        self._tasks.append(asyncio.create_task(self._enqueue_loop(destinations)))
+        logger.info("Push dispatcher started", destinations=list(destinations))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> Dict[str, Any]:
+        """Delivery counters, throughput and outbox backlog per destination"""
+        destinations = {}
+        for name in dict.fromkeys([*settings.push_destinations, *self.stats]):
+            stats = self.stats.get(name) or DestinationStats()
+            destinations[name] = {**stats.as_dict(), "pending": pending_count(name)}
+        return {"running": bool(self._tasks), "destinations": destinations}
+
+
+# Global instance
+push_dispatcher = PushDispatcher()
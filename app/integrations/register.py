@@ -1,19 +1,6 @@
 """Register Prefect deployments"""
-import asyncio
-from app.utils.logging import setup_logging, get_logger
-
-setup_logging()
-logger = get_logger(__name__)
-
-
-async def register_deployments():
-    """Register all Prefect deployments"""
-    logger.info("Registering Prefect deployments")
-    
-    # For now, just log that we're ready for Prefect
-    # We'll add actual Prefect flows later
-    logger.info("Ready for Prefect deployment registration")
+from app.register import register_deployments
 
 
 if __name__ == "__main__":
-    asyncio.run(register_deployments())
+    register_deployments()
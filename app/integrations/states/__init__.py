@@ -0,0 +1,45 @@
+"""State and local jurisdiction integrations"""
+import importlib
+import os
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+JURISDICTIONS_PATH = os.path.join(os.path.dirname(__file__), "../../..", "config", "jurisdictions.yml")
+
+
+def load_jurisdictions(enabled_only: bool = True) -> List[Dict[str, Any]]:
+    """Load jurisdiction definitions from config/jurisdictions.yml"""
+    with open(JURISDICTIONS_PATH, 'r') as f:
+        jurisdictions = yaml.safe_load(f).get("jurisdictions", [])
+
+    if enabled_only:
+        jurisdictions = [j for j in jurisdictions if j.get("enabled")]
+    return jurisdictions
+
+
+def get_jurisdiction_client(jurisdiction: Dict[str, Any]) -> Optional[Any]:
+    """Instantiate the client for a jurisdiction, or None if not implemented
+
+    Clients live at app.integrations.states.<method>.<client> and expose a
+    class with an async ingest_all() method. They pass every raw response to
+    app.landing.land(jurisdiction id, endpoint, params, payload) before
+    transforming it, so it can be replayed.
+    """
+    module_path = f"app.integrations.states.{jurisdiction['method']}.{jurisdiction['client']}"
+    try:
+        module = importlib.import_module(module_path)
+    except ImportError:
+        logger.warning("Jurisdiction client not implemented", jurisdiction=jurisdiction["id"], module=module_path)
+        return None
+
+    for attr in vars(module).values():
+        if isinstance(attr, type) and attr.__module__ == module.__name__ and hasattr(attr, "ingest_all"):
+            return attr()
+
+    logger.warning("Jurisdiction client has no ingest_all", jurisdiction=jurisdiction["id"], module=module_path)
+    return None
@@ -0,0 +1,49 @@
+"""Per-job context for progress reporting and cooperative cancellation"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from app.models.jobs import Job
+
+# How often a running job's progress is written back to the jobs table
+PROGRESS_SAVE_INTERVAL = 2.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation has been requested"""
+
+
+class JobHandle:
+    """A running job plus its cancellation flag"""
+
+    def __init__(self, job: Job, on_progress: Callable[[Job], None]):
+        self.job = job
+        self.cancel_event = asyncio.Event()
+        self._on_progress = on_progress
+        self._last_saved = 0.0
+
+    def update(self, progress: dict):
+        self.job.progress.update(progress)
+        now = time.monotonic()
+        if now - self._last_saved >= PROGRESS_SAVE_INTERVAL:
+            self._last_saved = now
+            self._on_progress(self.job)
+
+
+current_job: ContextVar[Optional[JobHandle]] = ContextVar("current_job", default=None)
+
+
+def report_progress(**progress: Any):
+    """Record progress for the current job and stop if it was cancelled
+
+    Workloads call this at safe points (between pages, between rows). Outside
+    a job it does nothing, so the same code runs from routes and flows. Call
+    it outside of broad ``except Exception`` blocks so JobCancelled propagates.
+    """
+    handle = current_job.get()
+    if handle is None:
+        return
+    if handle.cancel_event.is_set():
+        raise JobCancelled()
+    handle.update(progress)
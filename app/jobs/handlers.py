@@ -0,0 +1,40 @@
+"""Job kinds backed by the ingestion pipelines"""
+from app.jobs.manager import JobManager
+from app.landing import replay
+from app.pipelines import archive
+from app.pipelines import contributions
+from app.pipelines import fec as fec_pipeline
+from app.pipelines import fec_collection
+from app.pipelines import fec_documents
+from app.pipelines import reconcile
+from app.pipelines import signals as signals_pipeline
+
+
+async def build_seat_profiles(**params):
+    # pandas stays off the startup path until a build runs
+    from app.pipelines import seats
+    return await seats.build_seat_profiles(**params)
+
+
+async def update_jurisdiction_spend(**params):
+    from app.pipelines import spend
+    return await spend.update_jurisdiction_spend(**params)
+
+
+def register_pipeline_jobs(manager: JobManager):
+    """Register every pipeline that can run as a background job"""
+    manager.register("collect-all-pages-fill-gaps", fec_collection.collect_candidates, invalidates=("candidates",))
+    manager.register("collect-new-filings", fec_pipeline.collect_new_filings, invalidates=("candidates",))
+    manager.register("enrich-committee-ids", fec_pipeline.enrich_all_committee_ids,
+                     invalidates=("candidates", "committees", "candidate_committees"))
+    manager.register("extract-candidate-documents", fec_documents.extract_candidate_documents,
+                     invalidates=("candidates",))
+    manager.register("remove-duplicates", fec_pipeline.remove_duplicates, invalidates=("candidates",))
+    manager.register("build-seat-profiles", build_seat_profiles)
+    manager.register("update-jurisdiction-spend", update_jurisdiction_spend)
+    manager.register("ingest-signals", signals_pipeline.ingest_signals)
+    manager.register("load-contributions", contributions.load_contributions)
+    manager.register("maintain-partitions", archive.maintain_partitions, invalidates=("filings",))
+    manager.register("reconcile-candidates", reconcile.reconcile_candidates, invalidates=("candidates",))
+    manager.register("replay-landing", replay.replay_landing,
+                     invalidates=("candidates", "committees", "candidate_committees"))
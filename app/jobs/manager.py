@@ -0,0 +1,277 @@
+"""In-process job manager with a bounded queue and worker tasks"""
+import asyncio
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.jobs import store
+from app.jobs.context import JobCancelled, JobHandle, current_job
+from app.models.common import JobStatus
+from app.models.jobs import Job
+from app.utils.cache import invalidate
+from app.utils.logging import get_logger
+from app.utils.metrics import Gauge, registry
+
+logger = get_logger(__name__)
+
+JobHandler = Callable[..., Awaitable[Dict[str, Any]]]
+
+# Finished jobs kept in memory for fast status lookups; older ones are read
+# back from the jobs table.
+FINISHED_HISTORY = 200
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+def dedup_key(kind: str, params: Dict[str, Any]) -> str:
+    return f"{kind}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class JobManager:
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        # None means "from settings", resolved in start() so importing needs no config
+        self.workers = workers
+        self.queue_size = queue_size
+        self._handlers: Dict[str, JobHandler] = {}
+        self._invalidates: Dict[str, Tuple[str, ...]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._active: Dict[UUID, Job] = {}
+        self._active_keys: Dict[str, UUID] = {}
+        self._running: Dict[UUID, JobHandle] = {}
+        self._finished: "OrderedDict[UUID, Job]" = OrderedDict()
+        # Job rows waiting to be written, newest snapshot per job; a writer task
+        # saves them from a worker thread so the Supabase call never blocks the loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unsaved: Dict[UUID, Job] = {}
+        self._save_wanted: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def register(self, kind: str, handler: JobHandler, invalidates: Sequence[str] = ()):
+        """Register the coroutine function that runs jobs of this kind, and the tables it writes"""
+        self._handlers[kind] = handler
+        self._invalidates[kind] = tuple(invalidates)
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    async def start(self):
+        """Start worker tasks; call from the application lifespan"""
+        if self._worker_tasks:
+            return
+        self.workers = self.workers or settings.job_workers
+        self.queue_size = self.queue_size or settings.job_queue_size
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        await asyncio.to_thread(store.mark_interrupted)
+        self._loop = asyncio.get_running_loop()
+        self._save_wanted = asyncio.Event()
+        self._closing = False
+        self._writer_task = asyncio.create_task(self._writer(), name="job-writer")
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info("Job workers started", workers=self.workers, queue_size=self.queue_size)
+
+    async def stop(self):
+        """Cancel running jobs and stop the workers"""
+        for handle in self._running.values():
+            handle.cancel_event.set()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        # Let the writer save what is left, interrupted jobs included
+        self._closing = True
+        self._save_wanted.set()
+        await asyncio.gather(self._writer_task, return_exceptions=True)
+        self._writer_task = None
+        logger.info("Job workers stopped")
+
+    def enqueue(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Job, bool]:
+        """Queue a job, returning (job, created)
+
+        If an identical job (same kind and params) is already queued or
+        running, that job is returned instead and created is False.
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"Unknown job kind: {kind}")
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+
+        params = params or {}
+        key = dedup_key(kind, params)
+        existing = self._active_keys.get(key)
+        if existing is not None:
+            return self._active[existing], False
+
+        job = Job(kind=kind, dedup_key=key, params=params, created_at=datetime.utcnow())
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.queue_size} jobs waiting)")
+
+        self._active[job.job_id] = job
+        self._active_keys[key] = job.job_id
+        self._save(job)
+        logger.info("Job queued", job_id=str(job.job_id), kind=kind)
+        return job, True
+
+    def get(self, job_id: UUID) -> Optional[Job]:
+        """Look up a job, falling back to the jobs table"""
+        job = self._active.get(job_id) or self._finished.get(job_id)
+        if job is not None:
+            return job
+        return store.load_job(job_id)
+
+    def recent(self, limit: int = 50) -> List[Job]:
+        """Active jobs first, then recent history"""
+        jobs = list(self._active.values())
+        jobs.extend(reversed(self._finished.values()))
+        if len(jobs) < limit:
+            seen = {j.job_id for j in jobs}
+            jobs.extend(j for j in store.list_jobs(limit) if j.job_id not in seen)
+        return jobs[:limit]
+
+    def cancel(self, job_id: UUID) -> Optional[Job]:
+        """Request cancellation; running jobs stop at their next progress report"""
+        job = self._active.get(job_id)
+        if job is None:
+            return self.get(job_id)
+
+        if job.status == JobStatus.QUEUED:
+            # The worker skips it when it comes off the queue
+            self._finish(job, JobStatus.CANCELLED)
+        elif job_id in self._running:
+            self._running[job_id].cancel_event.set()
+            logger.info("Job cancellation requested", job_id=str(job_id))
+        return job
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._active.get(job_id)
+                if job is not None and job.status == JobStatus.QUEUED:
+                    await self._run(job)
+            except Exception as e:
+                logger.error("Job worker error", worker=worker_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        handler = self._handlers[job.kind]
+        handle = JobHandle(job, on_progress=self._save)
+        self._running[job.job_id] = handle
+
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        self._save(job)
+        logger.info("Job started", job_id=str(job.job_id), kind=job.kind)
+
+        token = current_job.set(handle)
+        try:
+            job.result = await handler(**job.params)
+            # Pipelines report expected failures (e.g. missing API key) as {"error": ...}
+            if isinstance(job.result, dict) and job.result.get("error"):
+                job.error = str(job.result["error"])
+                status = JobStatus.FAILED
+            else:
+                status = JobStatus.COMPLETED
+        except JobCancelled:
+            status = JobStatus.CANCELLED
+        except asyncio.CancelledError:
+            self._finish(job, JobStatus.INTERRUPTED)
+            raise
+        except Exception as e:
+            job.error = str(e)
+            status = JobStatus.FAILED
+            logger.error("Job failed", job_id=str(job.job_id), kind=job.kind, error=str(e))
+        finally:
+            current_job.reset(token)
+            self._running.pop(job.job_id, None)
+
+        self._finish(job, status)
+
+    def _finish(self, job: Job, status: JobStatus):
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        self._active.pop(job.job_id, None)
+        if self._active_keys.get(job.dedup_key) == job.job_id:
+            del self._active_keys[job.dedup_key]
+
+        self._finished[job.job_id] = job
+        while len(self._finished) > FINISHED_HISTORY:
+            self._finished.popitem(last=False)
+
+        # Failed and cancelled jobs may have written some rows too
+        if self._invalidates.get(job.kind):
+            invalidate(*self._invalidates[job.kind])
+
+        self._save(job)
+        logger.info("Job finished", job_id=str(job.job_id), kind=job.kind, status=status.value)
+
+    def _save(self, job: Job):
+        """Hand a snapshot of the job to the writer; safe to call from worker threads
+
+        Progress reports come from pipelines' to_thread stages as well as the loop.
+        """
+        snapshot = job.model_copy(deep=True)
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._mark_unsaved(snapshot)
+        else:
+            self._loop.call_soon_threadsafe(self._mark_unsaved, snapshot)
+
+    def _mark_unsaved(self, job: Job):
+        self._unsaved[job.job_id] = job
+        self._save_wanted.set()
+
+    async def _writer(self):
+        while True:
+            await self._save_wanted.wait()
+            self._save_wanted.clear()
+            while self._unsaved:
+                jobs = list(self._unsaved.values())
+                self._unsaved.clear()
+                await asyncio.to_thread(_save_jobs, jobs)
+            if self._closing:
+                return
+
+
+def _save_jobs(jobs: List[Job]):
+    for job in jobs:
+        store.save_job(job)
+
+
+# Global instance
+job_manager = JobManager()
+
+
+def _job_metrics():
+    backlog = Gauge("job_queue_backlog", "Jobs waiting in the queue")
+    backlog.set(job_manager.backlog)
+    running = Gauge("jobs_running", "Jobs currently running")
+    running.set(job_manager.running)
+    return [backlog, running]
+
+
+registry.register_collector(_job_metrics)
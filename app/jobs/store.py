@@ -0,0 +1,42 @@
+"""Persistence for background jobs"""
+from typing import List, Optional
+from uuid import UUID
+
+from app.db.client import db
+from app.models.common import JobStatus
+from app.models.jobs import Job
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def save_job(job: Job):
+    """Upsert a job row; failures are logged so they never break the job itself"""
+    try:
+        row = job.model_dump(mode="json", exclude={"created_at", "updated_at"})
+        db.supabase.table('jobs').upsert(row).execute()
+    except Exception as e:
+        logger.error("Error saving job", job_id=str(job.job_id), error=str(e))
+
+
+def load_job(job_id: UUID) -> Optional[Job]:
+    """Load a job by ID"""
+    result = db.supabase.table('jobs').select("*").eq('job_id', str(job_id)).limit(1).execute()
+    return Job(**result.data[0]) if result.data else None
+
+
+def list_jobs(limit: int = 50) -> List[Job]:
+    """Most recent jobs first"""
+    result = db.supabase.table('jobs').select("*").order("created_at", desc=True).limit(limit).execute()
+    return [Job(**row) for row in result.data or []]
+
+
+def mark_interrupted():
+    """Flag jobs a previous process left queued or running"""
+    try:
+        db.supabase.table('jobs')\
+            .update({'status': JobStatus.INTERRUPTED.value})\
+            .in_('status', [JobStatus.QUEUED.value, JobStatus.RUNNING.value])\
+            .execute()
+    except Exception as e:
+        logger.error("Error marking interrupted jobs", error=str(e))
@@ -0,0 +1,4 @@
+"""Raw API payload landing zone and replay"""
+from app.landing.zone import land, landing_zone
+
+__all__ = ["land", "landing_zone"]
@@ -0,0 +1,188 @@
+"""Landing zone: every raw API payload, kept for replay
+
+Pipelines hand each decoded response to `land()` before transforming it. The
+payload is appended, with its source, endpoint, request params (minus the API
+key) and fetch time, to <landing_dir>/<source>/<YYYY-MM-DD>/part-<pid>.jsonl.zst
+as one JSON line in its own zstd frame, so a crash loses at most the record
+being written and `zstd -dc` on any file gives plain JSONL. Records are
+content-addressed by the sha256 of the canonical payload JSON: a payload
+already landed for the same source and day is not written again, so re-running
+a collection that sees unchanged pages costs no disk.
+
+Day directories older than `landing_retention_days` are removed when the
+process first lands on a new day, or with `python -m app prune-landing`.
+app.landing.replay reruns the transform and load stages from these files.
+
+Landing must never break collection: every failure here is logged and
+swallowed.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_LANDING_DIR = os.path.join(os.path.dirname(__file__), "../..", "data", "landing")
+
+# Request params never written to disk
+SECRET_PARAMS = {"api_key", "app_token", "token"}
+
+
+def landing_dir() -> str:
+    return settings.landing_dir or DEFAULT_LANDING_DIR
+
+
+def _canonical(payload: Any) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def _day_dirs(source: Optional[str] = None) -> Iterator[Tuple[str, str, str]]:
+    """(source, day, path) of every day directory, oldest day first within a source"""
+    root = landing_dir()
+    if not os.path.isdir(root):
+        return
+    sources = [source] if source else sorted(os.listdir(root))
+    for name in sources:
+        source_dir = os.path.join(root, name)
+        if not os.path.isdir(source_dir):
+            continue
+        for day in sorted(os.listdir(source_dir)):
+            path = os.path.join(source_dir, day)
+            if os.path.isdir(path):
+                yield name, day, path
+
+
+def _read_file(path: str) -> Iterator[Dict[str, Any]]:
+    import zstandard
+
+    with open(path, "rb") as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        try:
+            for line in io.TextIOWrapper(reader, encoding="utf-8"):
+                if line.strip():
+                    yield json.loads(line)
+        except (zstandard.ZstdError, json.JSONDecodeError) as e:
+            # A frame cut short by a crash ends the file; the records before it are intact
+            logger.warning("Truncated landing file", path=path, error=str(e))
+
+
+class LandingZone:
+    """Append-only writer and reader of landed payloads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compressor = None
+        self._seen: Dict[str, Set[str]] = {}
+        self._day: Optional[str] = None
+
+    def _hashes(self, directory: str) -> Set[str]:
+        """Hashes already landed in a day directory, loaded from disk the first time"""
+        if directory not in self._seen:
+            seen = set()
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if name.endswith(".jsonl.zst"):
+                        seen.update(record["sha256"] for record in _read_file(os.path.join(directory, name)))
+            self._seen[directory] = seen
+        return self._seen[directory]
+
+    def _roll_day(self, day: str):
+        if day == self._day:
+            return
+        self._day = day
+        self._seen.clear()
+        self.prune()
+
+    def land(self, source: str, endpoint: str, params: Optional[Dict[str, Any]], payload: Any) -> Optional[str]:
+        """Append a raw payload unless already landed today; returns its sha256, or None if not written"""
+        if not settings.enable_landing:
+            return None
+        try:
+            import zstandard
+
+            body = _canonical(payload)
+            digest = hashlib.sha256(body).hexdigest()
+            now = datetime.now(timezone.utc)
+            day = now.date().isoformat()
+            directory = os.path.join(landing_dir(), source, day)
+            with self._lock:
+                self._roll_day(day)
+                hashes = self._hashes(directory)
+                if digest in hashes:
+                    return None
+                record = {
+                    "sha256": digest,
+                    "source": source,
+                    "endpoint": endpoint,
+                    "params": {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+                    "fetched_at": now.isoformat(),
+                }
+                # The payload is spliced in already serialized rather than encoded twice
+                line = _canonical(record)[:-1] + b',"payload":' + body + b"}\n"
+                if self._compressor is None:
+                    self._compressor = zstandard.ZstdCompressor(level=settings.landing_compression_level)
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, f"part-{os.getpid()}.jsonl.zst"), "ab") as f:
+                    f.write(self._compressor.compress(line))
+                hashes.add(digest)
+            return digest
+        except Exception as e:
+            logger.warning("Could not land raw payload", source=source, endpoint=endpoint, error=str(e))
+            return None
+
+    def records(self, source: Optional[str] = None, endpoint: Optional[str] = None,
+                since: Optional[date] = None, until: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        """Landed records, optionally of one source/endpoint and days since..until inclusive"""
+        for _, day, directory in _day_dirs(source):
+            if (since and day < since.isoformat()) or (until and day > until.isoformat()):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".jsonl.zst"):
+                    continue
+                for record in _read_file(os.path.join(directory, name)):
+                    if endpoint is None or record["endpoint"] == endpoint:
+                        yield record
+
+    def prune(self, retention_days: Optional[int] = None) -> List[str]:
+        """Remove day directories older than the retention; 0 keeps everything. Returns those removed"""
+        retention_days = settings.landing_retention_days if retention_days is None else retention_days
+        if retention_days <= 0:
+            return []
+        cutoff = (datetime.now(timezone.utc).date() - timedelta(days=retention_days)).isoformat()
+        removed = []
+        for source, day, directory in list(_day_dirs()):
+            if day < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed.append(f"{source}/{day}")
+        if removed:
+            logger.info("Pruned landing zone", removed=len(removed), cutoff=cutoff)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Files, bytes and day range per source"""
+        sources: Dict[str, Any] = {}
+        for source, day, directory in _day_dirs():
+            entry = sources.setdefault(source, {"days": 0, "files": 0, "bytes": 0, "first_day": day})
+            files = [os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".jsonl.zst")]
+            entry["days"] += 1
+            entry["files"] += len(files)
+            entry["bytes"] += sum(os.path.getsize(p) for p in files)
+            entry["last_day"] = day
+        return {"landing_dir": os.path.abspath(landing_dir()), "sources": sources}
+
+
+# Global instance
+landing_zone = LandingZone()
+
+
+def land(source: str, endpoint: str, params: Optional[Dict[str, Any]], payload: Any) -> Optional[str]:
+    """Append a raw API payload to the landing zone; never raises"""
+    return landing_zone.land(source, endpoint, params, payload)
@@ -1,16 +1,45 @@
 """FastAPI application"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.routes import router
-from app.utils.logging import setup_logging
+from app.db.changes import change_notifier
+from app.db.client import db
+from app.integrations.push import push_dispatcher
+from app.jobs.handlers import register_pipeline_jobs
+from app.jobs.manager import job_manager
+from app.utils.health import health_monitor
+from app.utils.http import http_clients
+from app.utils.logging import flush_summaries, setup_logging
+from app.utils.metrics import MetricsMiddleware
 
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_clients.start()
+    register_pipeline_jobs(job_manager)
+    await job_manager.start()
+    await push_dispatcher.start()
+    await health_monitor.start()
+    yield
+    await health_monitor.stop()
+    await push_dispatcher.stop()
+    await job_manager.stop()
+    await http_clients.aclose()
+    await change_notifier.close()
+    await db.close()
+    flush_summaries()
+
+
 app = FastAPI(
     title="Ampersand Candidate Tracker",
     description="Production candidate tracking system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(router)
 
 @app.get("/")
@@ -18,6 +18,7 @@ class Candidate(BaseEntity):
     election_cycle: Optional[int] = None
     status: Optional[str] = None
     incumbent: bool = False
+    occupation: Optional[str] = None
     current_position: Optional[str] = None
     bio_summary: Optional[str] = None
     source_url: Optional[str] = None
@@ -29,6 +30,9 @@ class Committee(BaseEntity):
     jurisdiction: Optional[str] = None
     state: Optional[str] = None
     type: Optional[str] = None
+    fec_committee_id: Optional[str] = None
+    designation: Optional[str] = None
+    treasurer_name: Optional[str] = None
 
 
 class CandidateCommittee(BaseModel):
@@ -0,0 +1,30 @@
+"""FEC collection planner models"""
+from typing import Optional
+from uuid import UUID
+from app.models.common import BaseEntity, UnitStatus
+
+
+class CollectionUnit(BaseEntity):
+    """A page range of one FEC candidate search, checkpointed after every page"""
+    run_id: UUID
+    unit_key: str
+    cycle: int
+    office: str
+    party: str
+    first_page: int
+    last_page: int
+    next_page: int
+    total_pages: Optional[int] = None
+    status: UnitStatus = UnitStatus.PENDING
+    candidates_checked: int = 0
+    candidates_added: int = 0
+    error: Optional[str] = None
+
+    @property
+    def planned(self) -> bool:
+        """False until page 1 of the search has told us how many pages there are"""
+        return self.total_pages is not None
+
+    @property
+    def finished(self) -> bool:
+        return self.planned and self.next_page > self.last_page
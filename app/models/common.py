@@ -39,6 +39,33 @@ class LimitType(str, Enum):
     AGGREGATE = "aggregate"
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    INTERRUPTED = "interrupted"
+
+
+class UnitStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    DEAD = "dead"
+
+
+class SharedVia(str, Enum):
+    COMMITTEE = "committee"
+    TREASURER = "treasurer"
+
+
 class BaseEntity(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -0,0 +1,23 @@
+"""Background job models"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
+from pydantic import Field
+from app.models.common import BaseEntity, JobStatus
+
+
+class Job(BaseEntity):
+    job_id: UUID = Field(default_factory=uuid4)
+    kind: str
+    dedup_key: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+    status: JobStatus = JobStatus.QUEUED
+    progress: Dict[str, Any] = Field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (JobStatus.QUEUED, JobStatus.RUNNING)
@@ -0,0 +1,22 @@
+"""Outbound push models"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+from app.models.common import BaseEntity, OutboxStatus
+
+
+class OutboxEvent(BaseEntity):
+    """One coalesced candidate change waiting to be delivered to a destination"""
+    outbox_id: Optional[int] = None
+    destination: str
+    candidate_id: UUID
+    event: str
+    payload: Dict[str, Any]
+    first_seq: int
+    last_seq: int
+    first_changed_at: Optional[datetime] = None
+    status: OutboxStatus = OutboxStatus.PENDING
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    delivered_at: Optional[datetime] = None
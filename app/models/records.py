@@ -0,0 +1,153 @@
+"""Compact columnar records for large table scans
+
+A page of REST results is a list of dicts, and a dict per row costs a few
+hundred bytes before its values are counted. Scans over the whole candidates
+table keep one list per column instead:
+
+- UUID columns are packed 16 bytes per row into a bytearray
+- low-cardinality columns (state, party, office, cycle, ...) share one object
+  per distinct value, with strings interned
+- everything else is a plain list of the values as received
+
+Conversion works column by column over a page of rows, so it accepts the dicts
+from supabase-py and asyncpg Records alike.
+"""
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+from uuid import UUID
+
+_NIL = bytes(16)
+
+
+class UUIDColumn:
+    """UUID strings stored as 16 raw bytes each; None is stored as the nil UUID"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self):
+        self._data = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._data) // 16
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index < 0:
+            index += len(self)
+        raw = bytes(self._data[index * 16:index * 16 + 16])
+        if len(raw) != 16:
+            raise IndexError("UUIDColumn index out of range")
+        return None if raw == _NIL else str(UUID(bytes=raw))
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        data = self._data
+        for offset in range(0, len(data), 16):
+            raw = bytes(data[offset:offset + 16])
+            yield None if raw == _NIL else str(UUID(bytes=raw))
+
+    def extend(self, values: Iterable[Any]):
+        data = self._data
+        for value in values:
+            if value is None:
+                data += _NIL
+            elif isinstance(value, UUID):
+                data += value.bytes
+            else:
+                data += UUID(value).bytes
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._data)
+
+
+class PooledColumn(list):
+    """List column that stores one shared object per distinct value"""
+
+    __slots__ = ("_pool",)
+
+    def __init__(self):
+        super().__init__()
+        self._pool: Dict[Any, Any] = {}
+
+    def extend(self, values: Iterable[Any]):
+        pool = self._pool
+        setdefault = pool.setdefault
+        out = []
+        for value in values:
+            if value is None:
+                out.append(None)
+                continue
+            shared = pool.get(value)
+            if shared is None:
+                shared = setdefault(value, sys.intern(value) if isinstance(value, str) else value)
+            out.append(shared)
+        super().extend(out)
+
+    @property
+    def distinct(self) -> List[Any]:
+        return list(self._pool)
+
+
+class RecordBatch:
+    """Column-oriented rows of one table, built page by page from query results"""
+
+    __slots__ = ("columns", "_data", "_length")
+
+    def __init__(self, columns: Sequence[str], uuid_columns: Iterable[str] = (),
+                 pooled_columns: Iterable[str] = ()):
+        self.columns = tuple(columns)
+        uuid_columns, pooled_columns = set(uuid_columns), set(pooled_columns)
+        self._data: Dict[str, Any] = {}
+        for name in self.columns:
+            if name in uuid_columns:
+                self._data[name] = UUIDColumn()
+            elif name in pooled_columns:
+                self._data[name] = PooledColumn()
+            else:
+                self._data[name] = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def extend(self, rows: Sequence[Mapping[str, Any]]):
+        """Append a page of rows (dicts or asyncpg Records)"""
+        for name, column in self._data.items():
+            column.extend([row.get(name) for row in rows])
+        self._length += len(rows)
+
+    def column(self, name: str) -> Sequence[Any]:
+        return self._data[name]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {name: column[index] for name, column in self._data.items()}
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Rows as dicts, materialised one at a time"""
+        for values in zip(*self._data.values()):
+            yield dict(zip(self.columns, values))
+
+    def to_frame(self):
+        """pandas DataFrame of the batch; pooled columns become categoricals"""
+        import pandas as pd
+
+        frame = {}
+        for name, column in self._data.items():
+            if isinstance(column, PooledColumn):
+                frame[name] = pd.Categorical(column)
+            else:
+                # dtype=object keeps empty columns usable with .str like populated ones
+                frame[name] = pd.Series(list(column), dtype=object if not len(column) else None)
+        return pd.DataFrame(frame)
+
+
+# Candidate columns worth pooling: a few dozen distinct values across 100k+ rows
+CANDIDATE_UUID_COLUMNS = ("candidate_id",)
+CANDIDATE_POOLED_COLUMNS = (
+    "party", "jurisdiction_type", "jurisdiction_name", "state", "office", "district",
+    "election_cycle", "status", "source_system",
+)
+
+
+def candidate_batch(columns: Sequence[str]) -> RecordBatch:
+    """Empty RecordBatch for these candidates columns"""
+    return RecordBatch(columns, CANDIDATE_UUID_COLUMNS, CANDIDATE_POOLED_COLUMNS)
@@ -0,0 +1,22 @@
+"""Social signal models"""
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+from app.models.common import BaseEntity, SignalStatus
+
+
+class Signal(BaseEntity):
+    signal_id: Optional[UUID] = None
+    candidate_id: Optional[UUID] = None
+    source: Optional[str] = None
+    account_handle: Optional[str] = None
+    posted_at: Optional[datetime] = None
+    text: Optional[str] = None
+    url: Optional[str] = None
+    status: SignalStatus = SignalStatus.NEW
+
+
+class SignalTriage(BaseModel):
+    signal_ids: List[UUID]
+    status: SignalStatus
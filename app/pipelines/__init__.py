@@ -0,0 +1 @@
+"""Ingestion and enrichment pipelines"""
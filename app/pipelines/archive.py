@@ -0,0 +1,185 @@
+"""Archive closed partitions of the history tables to Parquet
+
+A partition is closed once its range ended more than the table's
+`partition_archive_after` days ago. Each closed partition is exported to
+<archive_dir>/<table>/<partition>.parquet (compressed with
+`archive_compression`) from one consistent snapshot and the file is read back
+to check its row count. Then, with the table locked for a moment, the
+partition is recorded in archived_partitions, detached and dropped, but only
+if nothing was written to it since the snapshot; otherwise it is left for the
+next run. Rows that arrive later for an archived range land in the default
+partition and stay live; partitions.read_range reads both.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.db.client import db
+from app.db.partitions import PARTITIONED_TABLES, archive_dir, attached_partitions, ensure_partitions
+from app.jobs.context import report_progress
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+
+logger = get_logger(__name__)
+
+EXPORT_BATCH_ROWS = 50_000
+
+
+def _arrow_type(pa, column: Dict[str, Any]):
+    data_type = column["data_type"]
+    if data_type == "integer":
+        return pa.int32()
+    if data_type == "bigint":
+        return pa.int64()
+    if data_type == "smallint":
+        return pa.int16()
+    if data_type == "numeric" and column["numeric_precision"]:
+        return pa.decimal128(column["numeric_precision"], column["numeric_scale"] or 0)
+    if data_type in ("double precision", "numeric"):
+        return pa.float64()
+    if data_type == "real":
+        return pa.float32()
+    if data_type == "boolean":
+        return pa.bool_()
+    if data_type == "date":
+        return pa.date32()
+    if data_type == "timestamp with time zone":
+        return pa.timestamp("us", tz="UTC")
+    if data_type == "timestamp without time zone":
+        return pa.timestamp("us")
+    # uuid, text, varchar, json(b) and enums are kept as strings
+    return pa.string()
+
+
+async def _arrow_schema(conn, table: str):
+    import pyarrow as pa
+
+    columns = await conn.fetch("""
+        SELECT column_name, data_type, numeric_precision, numeric_scale
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = $1
+        ORDER BY ordinal_position
+    """, table)
+    return pa.schema([(c["column_name"], _arrow_type(pa, dict(c))) for c in columns])
+
+
+def _write_batch(writer, schema, rows: List[Any]):
+    import pyarrow as pa
+
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in rows]
+        if pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+async def export_partition(conn, table: str, partition: str, path: str) -> Dict[str, Any]:
+    """Write a partition to Parquet from one snapshot; returns its row count and newest updated_at"""
+    import pyarrow.parquet as pq
+
+    schema = await _arrow_schema(conn, table)
+    columns = ", ".join(f'"{name}"' for name in schema.names)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        fingerprint = await conn.fetchrow(f'SELECT count(*) AS rows, max(updated_at) AS updated FROM "{partition}"')
+        with pq.ParquetWriter(tmp_path, schema, compression=settings.archive_compression) as writer:
+            batch = []
+            async for record in conn.cursor(f'SELECT {columns} FROM "{partition}"', prefetch=EXPORT_BATCH_ROWS):
+                batch.append(record)
+                if len(batch) >= EXPORT_BATCH_ROWS:
+                    # Conversion and compression run off the event loop
+                    await asyncio.to_thread(_write_batch, writer, schema, batch)
+                    rows += len(batch)
+                    batch = []
+                    report_progress(partition=partition, rows=rows)
+            if batch:
+                await asyncio.to_thread(_write_batch, writer, schema, batch)
+                rows += len(batch)
+
+    written = pq.read_metadata(tmp_path).num_rows
+    if written != rows or rows != fingerprint["rows"]:
+        os.remove(tmp_path)
+        raise RuntimeError(f"{partition}: exported {rows} rows, file has {written}, snapshot had {fingerprint['rows']}")
+    # The partition is dropped next, so the file must be durable first
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return {"rows": rows, "updated": fingerprint["updated"]}
+
+
+async def _detach(conn, table: str, partition: str, start: datetime, end: datetime, path: str,
+                  exported: Dict[str, Any]) -> bool:
+    """Record, detach and drop the partition; False if it was written to since the export"""
+    async with conn.transaction():
+        await conn.execute("SET LOCAL lock_timeout = '5s'")
+        await conn.execute(f'LOCK TABLE "{table}", "{partition}" IN ACCESS EXCLUSIVE MODE')
+        current = await conn.fetchrow(f'SELECT count(*) AS rows, max(updated_at) AS updated FROM "{partition}"')
+        if current["rows"] != exported["rows"] or current["updated"] != exported["updated"]:
+            return False
+        await conn.execute("""
+            INSERT INTO archived_partitions (partition_name, table_name, range_start, range_end, row_count, path, bytes)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+        """, partition, table, start, end, exported["rows"], path, os.path.getsize(path))
+        await conn.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"')
+        await conn.execute(f'DROP TABLE "{partition}"')
+    return True
+
+
+async def archive_partitions(tables: Optional[List[str]] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Export closed partitions to Parquet and detach them; dry_run only lists what would be archived"""
+    now = datetime.now(timezone.utc)
+    after_days = settings.partition_archive_after_map
+    archived_rows = PIPELINE_ROWS.labels("archive", "archived")
+    archived, closed, skipped = [], [], []
+
+    unknown = [table for table in tables or [] if table not in PARTITIONED_TABLES]
+    if unknown:
+        return {"error": f"Not partitioned: {', '.join(unknown)}"}
+
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        for table in tables or list(PARTITIONED_TABLES):
+            if table not in after_days:
+                continue
+            cutoff = now - timedelta(days=after_days[table])
+            directory = os.path.join(archive_dir(), table)
+            for partition, start, end in await attached_partitions(conn, table):
+                if end > cutoff:
+                    continue
+                closed.append(partition)
+                if dry_run:
+                    continue
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.abspath(os.path.join(directory, f"{partition}.parquet"))
+                exported = await export_partition(conn, table, partition, path)
+                try:
+                    detached = await _detach(conn, table, partition, start, end, path, exported)
+                except Exception as e:
+                    # Typically lock_timeout behind a long writer; the file is rewritten next run
+                    logger.warning("Could not detach partition; will retry next run", partition=partition,
+                                   error=str(e))
+                    detached = False
+                if not detached:
+                    skipped.append(partition)
+                    continue
+                archived_rows.inc(exported["rows"])
+                archived.append({"partition": partition, "rows": exported["rows"], "path": path,
+                                 "bytes": os.path.getsize(path)})
+                logger.info("Archived partition", table=table, partition=partition, rows=exported["rows"],
+                            path=path)
+
+    return {"closed": closed, "archived": archived, "skipped": skipped, "dry_run": dry_run}
+
+
+@timed(PIPELINE_SECONDS.labels("archive"))
+async def maintain_partitions(archive: bool = True) -> Dict[str, Any]:
+    """Create upcoming partitions, then archive closed ones"""
+    result: Dict[str, Any] = {"created": await ensure_partitions()}
+    if archive:
+        result.update(await archive_partitions())
+    return result
@@ -0,0 +1,373 @@
+"""FEC candidate collection, enrichment and dedup pipelines
+
+These are the workloads behind the collection routes; the planned multi-cycle
+collection lives in app.pipelines.fec_collection. They are plain async
+functions so the API, the CLI and the Prefect flows can all run them.
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.db.client import db
+from app.jobs.context import report_progress
+from app.landing import land
+from app.models.records import candidate_batch
+from app.utils.http import get_http_client
+from app.utils.logging import get_logger
+from app.utils.metrics import DB_OPERATION_SECONDS, PIPELINE_ROWS, PIPELINE_SECONDS, timed
+from app.utils.ratelimit import get_rate_limiter
+
+logger = get_logger(__name__)
+
+FEC_BASE_URL = "https://api.open.fec.gov/v1"
+
+OFFICE_NAMES = {"H": "House", "S": "Senate", "P": "President"}
+PARTY_NAMES = {"DEM": "Democratic", "REP": "Republican", "LIB": "Libertarian", "GRE": "Green", "IND": "Independent"}
+# USPS codes FEC uses: states, DC, territories, and US for presidential candidates
+FEC_STATES = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA",
+    "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
+    "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT",
+    "VA", "WA", "WV", "WI", "WY", "DC", "AS", "GU", "MP", "PR", "VI", "US",
+)
+UPSERT_CHUNK = 500
+# FEC IDs per `in` filter; keeps the request URL well under PostgREST's limits
+LOOKUP_CHUNK = 200
+
+
+async def _rate_limit():
+    """Wait for a slot in the FEC request budget shared by every pipeline"""
+    await get_rate_limiter("fec").acquire()
+
+
+def _count_candidates() -> int:
+    count_result = db.supabase.table('candidates').select("count", count='exact').execute()
+    return count_result.count if hasattr(count_result, 'count') else 0
+
+
+def build_candidate_record(candidate: Dict[str, Any], cycle: int = 2026) -> Dict[str, Any]:
+    """Map an FEC /candidates/ result for `cycle` onto a candidates row"""
+    fec_id = candidate.get('candidate_id')
+    party = candidate.get('party') or 'DEM'
+    return {
+        'full_name': candidate.get('name'),
+        'party': PARTY_NAMES.get(party, (candidate.get('party_full') or party).title()),
+        'jurisdiction_type': 'federal',
+        'jurisdiction_name': 'United States',
+        'state': candidate.get('state'),
+        'office': OFFICE_NAMES.get(candidate.get('office') or 'H', candidate.get('office_full')),
+        'district': candidate.get('district'),
+        'election_cycle': cycle,
+        'status': candidate.get('candidate_status'),
+        'incumbent': candidate.get('incumbent_challenge') == 'I',
+        'source_url': f"https://www.fec.gov/data/candidate/{fec_id}/",
+        'source_candidate_ID': fec_id,
+        'source_system': 'fec'
+    }
+
+
+def candidate_update(record: Dict[str, Any]) -> Dict[str, Any]:
+    """A build_candidate_record row for updating a candidate we already have
+
+    FEC lists a candidate under every cycle they run in, but candidates holds
+    one row per FEC ID that keeps the cycle it was first stored under, so an
+    update from another cycle's page leaves election_cycle alone.
+    """
+    return {k: v for k, v in record.items() if k != 'election_cycle'}
+
+
+@timed(DB_OPERATION_SECONDS.labels("upsert_candidates"))
+def upsert_candidate_records(rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Upsert build_candidate_record rows on the FEC ID in chunks; returns (upserted, failed)"""
+    upserted = failed = 0
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        try:
+            db.supabase.table('candidates').upsert(chunk, on_conflict="source_candidate_ID").execute()
+            upserted += len(chunk)
+        except Exception:
+            # A row colliding on the name/state/office/cycle key fails the chunk; retry row by row
+            for row in chunk:
+                try:
+                    db.supabase.table('candidates').upsert(row, on_conflict="source_candidate_ID").execute()
+                    upserted += 1
+                except Exception as e:
+                    failed += 1
+                    logger.warning("Could not upsert candidate", fec_id=row['source_candidate_ID'], error=str(e))
+        report_progress(upserted=upserted, failed=failed)
+    return upserted, failed
+
+
+def fetch_our_fec_ids() -> Set[str]:
+    """Page through candidates and return the FEC IDs we already have"""
+    batch = db.scan('candidates', candidate_batch(["source_candidate_ID"]))
+    return set(fec_id for fec_id in batch.column('source_candidate_ID') if fec_id)
+
+
+def candidate_ids_by_fec_id(fec_ids: List[str]) -> Dict[str, str]:
+    """Our candidate_id for each of these FEC IDs that we have"""
+    ids: Dict[str, str] = {}
+    for start in range(0, len(fec_ids), LOOKUP_CHUNK):
+        result = db.supabase.table('candidates')\
+            .select("candidate_id, source_candidate_ID")\
+            .in_('source_candidate_ID', fec_ids[start:start + LOOKUP_CHUNK])\
+            .execute()
+        ids.update({row['source_candidate_ID']: row['candidate_id'] for row in result.data or []})
+    return ids
+
+
+def _insert_new_candidates(candidates: List[Dict[str, Any]], our_fec_ids: Set[str]) -> int:
+    """Insert the candidates whose FEC IDs are not in our_fec_ids; returns how many were stored"""
+    inserted_rows = PIPELINE_ROWS.labels("new_filings", "inserted")
+    skipped_rows = PIPELINE_ROWS.labels("new_filings", "skipped")
+    stored = 0
+    for candidate in candidates:
+        fec_id = candidate.get('candidate_id')
+        if not fec_id or fec_id in our_fec_ids:
+            skipped_rows.inc()
+            continue
+
+        try:
+            result = db.supabase.table('candidates').insert(build_candidate_record(candidate)).execute()
+
+            if result.data:
+                stored += 1
+                inserted_rows.inc()
+                our_fec_ids.add(fec_id)  # Track to avoid duplicates in same run
+
+        except Exception:
+            skipped_rows.inc()
+            continue
+    return stored
+
+
+@timed(PIPELINE_SECONDS.labels("new_filings"))
+async def collect_new_filings() -> Dict[str, Any]:
+    """Insert only FEC candidates whose IDs we don't have yet"""
+    fec_api_key = os.environ.get('FEC_API_KEY')
+    if not fec_api_key:
+        return {"error": "FEC_API_KEY not configured"}
+
+    our_fec_ids = await asyncio.to_thread(fetch_our_fec_ids)
+    base_url = f"{FEC_BASE_URL}/candidates/"
+    new_stored = 0
+
+    client = get_http_client()
+    for page in range(1, 15):
+        report_progress(page=page, stored=new_stored)
+        params = {
+            "api_key": fec_api_key,
+            "election_year": 2026,
+            "office": "H",
+            "party": "DEM",
+            "per_page": 100,
+            "page": page
+        }
+
+        await _rate_limit()
+        response = await client.get(base_url, params=params)
+        data = response.json()
+        land("fec", "candidates", params, data)
+        candidates = data.get('results', [])
+
+        if not candidates:
+            break
+
+        new_stored += await asyncio.to_thread(_insert_new_candidates, candidates, our_fec_ids)
+
+    final_count = await asyncio.to_thread(_count_candidates)
+
+    return {
+        "status": "completed",
+        "new_candidates_added": new_stored,
+        "total_candidates_now": final_count,
+        "message": f"Added {new_stored} new filings. Database now has {final_count} candidates."
+    }
+
+
+@timed(DB_OPERATION_SECONDS.labels("store_committees"))
+def store_candidate_committees(committees_by_candidate: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Upsert FEC /candidate/{id}/committees/ results and link each with its designation as role"""
+    rows: Dict[str, Dict[str, Any]] = {}
+    roles: Dict[tuple, Optional[str]] = {}
+    for candidate_id, committees in committees_by_candidate.items():
+        for committee in committees:
+            fec_committee_id = committee.get('committee_id')
+            if not fec_committee_id:
+                continue
+            rows[fec_committee_id] = {
+                "fec_committee_id": fec_committee_id,
+                "name": committee.get('name') or fec_committee_id,
+                "state": committee.get('state'),
+                "type": committee.get('committee_type_full'),
+                "designation": committee.get('designation'),
+                "treasurer_name": committee.get('treasurer_name'),
+            }
+            roles[(candidate_id, fec_committee_id)] = committee.get('designation_full') or committee.get('designation')
+    if not rows:
+        return 0
+
+    stored = db.supabase.table('committees').upsert(list(rows.values()), on_conflict="fec_committee_id").execute()
+    committee_ids = {row['fec_committee_id']: row['committee_id'] for row in stored.data or []}
+    links = [{"candidate_id": candidate_id, "committee_id": committee_ids[fec_committee_id], "role": role}
+             for (candidate_id, fec_committee_id), role in roles.items() if fec_committee_id in committee_ids]
+    if links:
+        db.supabase.table('candidate_committees').upsert(links, on_conflict="candidate_id,committee_id").execute()
+    return len(links)
+
+
+def _candidates_without_committee() -> List[Dict[str, Any]]:
+    result = db.supabase.table('candidates')\
+        .select("candidate_id, source_candidate_ID, full_name")\
+        .is_('committee_id', 'null')\
+        .limit(200)\
+        .execute()
+    return result.data if result.data else []
+
+
+def _set_committee_id(candidate_id: str, committee_id: str):
+    db.supabase.table('candidates')\
+        .update({'committee_id': committee_id})\
+        .eq('candidate_id', candidate_id)\
+        .execute()
+
+
+def _count_without_committee() -> int:
+    result = db.supabase.table('candidates')\
+        .select("count", count='exact')\
+        .is_('committee_id', 'null')\
+        .execute()
+    return result.count if hasattr(result, 'count') else 0
+
+
+async def enrich_committee_ids(limit: int = 100) -> Dict[str, Any]:
+    """Fill candidates.committee_id and candidate_committees from FEC, up to `limit` candidates per run"""
+    fec_api_key = os.environ.get('FEC_API_KEY')
+    if not fec_api_key:
+        return {"error": "FEC_API_KEY not configured"}
+
+    candidates_to_enrich = await asyncio.to_thread(_candidates_without_committee)
+
+    if not candidates_to_enrich:
+        return {
+            "status": "complete",
+            "message": "All candidates already have committee IDs"
+        }
+
+    enriched = 0
+    base_url = FEC_BASE_URL + "/candidate/{candidate_id}/committees/"
+    updated_rows = PIPELINE_ROWS.labels("enrich_committees", "updated")
+    skipped_rows = PIPELINE_ROWS.labels("enrich_committees", "skipped")
+
+    client = get_http_client()
+    committees_by_candidate: Dict[str, List[Dict[str, Any]]] = {}
+    for i, candidate in enumerate(candidates_to_enrich[:limit]):
+        report_progress(processed=i, batch_size=min(limit, len(candidates_to_enrich)), enriched=enriched)
+        fec_id = candidate.get('source_candidate_ID')
+        if not fec_id:
+            continue
+
+        try:
+            await _rate_limit()
+
+            response = await client.get(base_url.format(candidate_id=fec_id), params={"api_key": fec_api_key})
+            if response.status_code != 200:
+                continue
+
+            data = response.json()
+            land("fec", "candidate/committees", {"candidate_id": fec_id}, data)
+            committees = data.get('results', [])
+
+            # Get the most recent committee
+            committee_id = committees[0].get('committee_id') if committees else None
+            if not committee_id:
+                skipped_rows.inc()
+                continue
+
+            # Every committee and role goes to the graph tables (written once per run), not only the first
+            committees_by_candidate[candidate.get('candidate_id')] = committees
+            await asyncio.to_thread(_set_committee_id, candidate.get('candidate_id'), committee_id)
+            enriched += 1
+            updated_rows.inc()
+
+        except Exception:
+            skipped_rows.inc()
+            continue
+
+    await asyncio.to_thread(store_candidate_committees, committees_by_candidate)
+    remaining = await asyncio.to_thread(_count_without_committee)
+
+    return {
+        "status": "partial" if remaining > 0 else "complete",
+        "enriched_this_run": enriched,
+        "remaining_without_committees": remaining,
+        "message": f"Enriched {enriched} candidates. Run again to continue." if remaining > 0 else "All candidates enriched!"
+    }
+
+
+@timed(PIPELINE_SECONDS.labels("enrich_committees"))
+async def enrich_all_committee_ids(max_batches: int = 20) -> Dict[str, Any]:
+    """Run committee enrichment batch by batch until done or max_batches is hit"""
+    enriched = 0
+    result: Dict[str, Any] = {}
+    for batch in range(max_batches):
+        report_progress(batch=batch, enriched_total=enriched)
+        result = await enrich_committee_ids()
+        if result.get("error"):
+            return result
+        enriched += result.get("enriched_this_run", 0)
+        if result.get("status") != "partial" or not result.get("enriched_this_run"):
+            break
+    return {"enriched": enriched, "last_batch": result}
+
+
+def _find_duplicates() -> List[str]:
+    """IDs of every candidate whose FEC ID an older candidate already has"""
+    # Only the two columns dedup needs, oldest first so the first ID seen is kept
+    candidates = db.scan(
+        'candidates',
+        candidate_batch(["candidate_id", "source_candidate_ID"]),
+        order="created_at",
+        on_page=lambda scanned: report_progress(phase="scan", scanned=scanned),
+    )
+
+    seen_fec_ids = set()
+    to_delete = []
+
+    for candidate_id, fec_id in zip(candidates.column('candidate_id'), candidates.column('source_candidate_ID')):
+        if fec_id:
+            if fec_id in seen_fec_ids:
+                to_delete.append(candidate_id)
+            else:
+                seen_fec_ids.add(fec_id)
+    return to_delete
+
+
+def _delete_candidates(to_delete: List[str]) -> int:
+    deleted_count = 0
+    deleted_rows = PIPELINE_ROWS.labels("remove_duplicates", "deleted")
+    for candidate_id in to_delete:
+        report_progress(phase="delete", deleted=deleted_count, to_delete=len(to_delete))
+        try:
+            db.supabase.table('candidates').delete().eq('candidate_id', candidate_id).execute()
+            deleted_count += 1
+            deleted_rows.inc()
+        except Exception:
+            continue
+    return deleted_count
+
+
+@timed(PIPELINE_SECONDS.labels("remove_duplicates"))
+async def remove_duplicates() -> Dict[str, Any]:
+    """Delete duplicate candidates, keeping the oldest record for each FEC ID"""
+    # Scan and deletes run in a worker thread; report_progress still reaches the job
+    to_delete = await asyncio.to_thread(_find_duplicates)
+    deleted_count = await asyncio.to_thread(_delete_candidates, to_delete)
+    final_count = await asyncio.to_thread(_count_candidates)
+
+    return {
+        "status": "completed",
+        "duplicates_removed": deleted_count,
+        "final_candidate_count": final_count,
+        "message": f"Removed {deleted_count} duplicate records"
+    }
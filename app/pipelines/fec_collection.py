@@ -0,0 +1,303 @@
+"""Planned FEC candidate collection across cycles, offices and parties
+
+The planner expands settings.backfill_cycles x collection offices x parties
+into FEC candidate searches. Page 1 of each search is fetched (and stored) to
+learn its page count, and the remaining pages are split into units of
+collection_pages_per_unit. Units run concurrently under the shared FEC rate
+budget and checkpoint after every page in collection_checkpoints, so rerunning
+after a partial failure resumes each unit at its next page.
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Set, Tuple
+from uuid import UUID, uuid4
+
+import httpx
+from tenacity import RetryError
+
+from app.config import settings
+from app.db.client import db
+from app.jobs.context import report_progress
+from app.landing import land
+from app.models.collection import CollectionUnit
+from app.models.common import UnitStatus
+from app.pipelines.fec import FEC_BASE_URL, _count_candidates, build_candidate_record, fetch_our_fec_ids
+from app.utils.http import get_http_client
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+from app.utils.ratelimit import get_rate_limiter
+from app.utils.retry import api_retry
+
+logger = get_logger(__name__)
+
+CANDIDATES_URL = f"{FEC_BASE_URL}/candidates/"
+PER_PAGE = 100
+# SQLSTATE PostgREST reports for a row that collides with a unique constraint
+UNIQUE_VIOLATION = "23505"
+
+Search = Tuple[int, str, str]
+
+
+def plan_searches(cycles: List[int], offices: List[str], parties: List[str]) -> List[Search]:
+    """Every (cycle, office, party) combination to collect"""
+    return [(cycle, office, party) for cycle in cycles for office in offices for party in parties]
+
+
+def split_pages(total_pages: int, pages_per_unit: int) -> List[Tuple[int, int]]:
+    """Inclusive page ranges covering 1..total_pages"""
+    return [(first, min(first + pages_per_unit - 1, total_pages))
+            for first in range(1, max(total_pages, 1) + 1, pages_per_unit)]
+
+
+def _unit_key(search: Search, first_page: int) -> str:
+    cycle, office, party = search
+    return f"{cycle}:{office}:{party}:{first_page}"
+
+
+# Checkpoints
+
+def save_unit(unit: CollectionUnit):
+    """Upsert a unit's checkpoint; failures are logged so they never stop collection"""
+    try:
+        row = unit.model_dump(mode="json", exclude={"created_at", "updated_at"})
+        db.supabase.table('collection_checkpoints').upsert(row, on_conflict="run_id,unit_key").execute()
+    except Exception as e:
+        logger.error("Error saving collection checkpoint", unit=unit.unit_key, error=str(e))
+
+
+def load_resumable_units() -> List[CollectionUnit]:
+    """All units of the most recent run that still has unfinished units"""
+    try:
+        latest = db.supabase.table('collection_checkpoints')\
+            .select("run_id")\
+            .neq('status', UnitStatus.COMPLETED.value)\
+            .order("updated_at", desc=True)\
+            .limit(1)\
+            .execute()
+        if not latest.data:
+            return []
+        result = db.supabase.table('collection_checkpoints')\
+            .select("*")\
+            .eq('run_id', latest.data[0]['run_id'])\
+            .execute()
+        return [CollectionUnit(**row) for row in result.data or []]
+    except Exception as e:
+        logger.error("Error loading collection checkpoints", error=str(e))
+        return []
+
+
+# Collection
+
+def _describe(error: Exception) -> str:
+    """Error text for checkpoints; never includes the request URL, which carries the API key"""
+    if isinstance(error, RetryError) and error.last_attempt.exception() is not None:
+        error = error.last_attempt.exception()
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code} from {error.request.url.path}"
+    return str(error)
+
+
+def _is_unique_violation(error: Exception) -> bool:
+    return getattr(error, "code", None) == UNIQUE_VIOLATION
+
+
+class _Collector:
+    """State shared by the units of one run"""
+
+    def __init__(self, run_id: UUID, api_key: str, known_ids: Set[str]):
+        self.run_id = run_id
+        self.api_key = api_key
+        self.known_ids = known_ids
+        self.client = get_http_client()
+        self.semaphore = asyncio.Semaphore(settings.collection_concurrency)
+        self.rate_limiter = get_rate_limiter("fec")
+        self.pages_fetched = 0
+        self.inserted_rows = PIPELINE_ROWS.labels("fec_collection", "inserted")
+        self.skipped_rows = PIPELINE_ROWS.labels("fec_collection", "skipped")
+
+    @api_retry()
+    async def fetch_page(self, search: Search, page: int) -> Dict[str, Any]:
+        cycle, office, party = search
+        await self.rate_limiter.acquire()
+        params = {
+            "api_key": self.api_key,
+            "election_year": cycle,
+            "office": office,
+            "party": party,
+            "per_page": PER_PAGE,
+            "page": page,
+            "sort": "name",
+        }
+        response = await self.client.get(CANDIDATES_URL, params=params)
+        response.raise_for_status()
+        self.pages_fetched += 1
+        data = response.json()
+        land("fec", "candidates", params, data)
+        return data
+
+    def store(self, candidates: List[Dict[str, Any]], cycle: int) -> int:
+        """Insert candidates we don't have yet in one request; returns rows added
+
+        Blocking; runs in a worker thread. Rows another unit stored first are
+        skipped, any other insert error is raised so the page is retried.
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        for candidate in candidates:
+            fec_id = candidate.get('candidate_id')
+            # One row per FEC ID: a candidate listed under several cycles keeps the first one stored
+            if not fec_id or fec_id in self.known_ids or fec_id in rows:
+                self.skipped_rows.inc()
+                continue
+            rows[fec_id] = build_candidate_record(candidate, cycle)
+        if not rows:
+            return 0
+
+        try:
+            db.supabase.table('candidates').insert(list(rows.values())).execute()
+            added = len(rows)
+            self.known_ids.update(rows)
+        except Exception as e:
+            if not _is_unique_violation(e):
+                raise
+            # One conflicting row fails the whole batch; retry row by row, skipping duplicates
+            added = 0
+            for fec_id, row in rows.items():
+                try:
+                    db.supabase.table('candidates').insert(row).execute()
+                except Exception as row_error:
+                    if not _is_unique_violation(row_error):
+                        raise
+                    self.skipped_rows.inc()
+                    continue
+                added += 1
+                self.known_ids.add(fec_id)
+        self.inserted_rows.inc(added)
+        return added
+
+    def _record_page(self, unit: CollectionUnit, data: Dict[str, Any]):
+        """Store a fetched page, then advance and save the unit's checkpoint; blocking"""
+        candidates = data.get('results', [])
+        added = self.store(candidates, unit.cycle)
+        unit.candidates_checked += len(candidates)
+        unit.candidates_added += added
+        unit.next_page += 1
+        save_unit(unit)
+
+    def new_search(self, search: Search) -> CollectionUnit:
+        """The unplanned first unit of a search"""
+        cycle, office, party = search
+        return CollectionUnit(
+            run_id=self.run_id, unit_key=_unit_key(search, 1), cycle=cycle, office=office, party=party,
+            first_page=1, last_page=1, next_page=1,
+        )
+
+    async def plan(self, first: CollectionUnit) -> List[CollectionUnit]:
+        """Fetch page 1 of a search and split it into units; page 1 is stored as part of the first"""
+        search = (first.cycle, first.office, first.party)
+        cycle, office, party = search
+        async with self.semaphore:
+            try:
+                data = await self.fetch_page(search, 1)
+            except Exception as e:
+                # total_pages stays unset, so a resumed run plans this search again
+                first.status, first.error = UnitStatus.FAILED, _describe(e)
+                await asyncio.to_thread(save_unit, first)
+                logger.warning("FEC search planning failed", unit=first.unit_key, error=first.error)
+                return [first]
+
+        total_pages = data.get('pagination', {}).get('pages') or 1
+        ranges = split_pages(total_pages, settings.collection_pages_per_unit)
+        units = [first] + [
+            CollectionUnit(
+                run_id=self.run_id, unit_key=_unit_key(search, first_page), cycle=cycle, office=office,
+                party=party, first_page=first_page, last_page=last_page, next_page=first_page,
+                total_pages=total_pages,
+            )
+            for first_page, last_page in ranges[1:]
+        ]
+        first.last_page, first.total_pages, first.status, first.error = ranges[0][1], total_pages, UnitStatus.RUNNING, None
+        for unit in units[1:]:
+            await asyncio.to_thread(save_unit, unit)
+        try:
+            await asyncio.to_thread(self._record_page, first, data)
+        except Exception as e:
+            # Planned, but page 1 is not stored: the unit resumes at page 1
+            first.status, first.error = UnitStatus.FAILED, _describe(e)
+            await asyncio.to_thread(save_unit, first)
+            logger.warning("FEC collection unit failed", unit=first.unit_key, page=first.next_page, error=first.error)
+        return units
+
+    async def run_unit(self, unit: CollectionUnit):
+        """Fetch and store a unit's remaining pages, checkpointing after each"""
+        async with self.semaphore:
+            unit.status, unit.error = UnitStatus.RUNNING, None
+            try:
+                while unit.next_page <= unit.last_page:
+                    data = await self.fetch_page((unit.cycle, unit.office, unit.party), unit.next_page)
+                    await asyncio.to_thread(self._record_page, unit, data)
+                unit.status = UnitStatus.COMPLETED
+            except Exception as e:
+                unit.status, unit.error = UnitStatus.FAILED, _describe(e)
+                logger.warning("FEC collection unit failed", unit=unit.unit_key, page=unit.next_page, error=unit.error)
+            await asyncio.to_thread(save_unit, unit)
+
+
+@timed(PIPELINE_SECONDS.labels("fec_collection"))
+async def collect_candidates(resume: bool = True) -> Dict[str, Any]:
+    """Collect every configured cycle/office/party search, resuming the last unfinished run"""
+    fec_api_key = os.environ.get('FEC_API_KEY')
+    if not fec_api_key:
+        return {"error": "FEC_API_KEY not configured"}
+
+    units = await asyncio.to_thread(load_resumable_units) if resume else []
+    resumed = bool(units)
+    run_id = units[0].run_id if units else uuid4()
+    collector = _Collector(run_id, fec_api_key, await asyncio.to_thread(fetch_our_fec_ids))
+
+    if not units:
+        # Checkpoint every search up front so an interrupted run still knows about all of them
+        searches = plan_searches(settings.backfill_cycles, settings.collection_office_list,
+                                 settings.collection_party_list)
+        units = [collector.new_search(search) for search in searches]
+        for unit in units:
+            await asyncio.to_thread(save_unit, unit)
+
+    unplanned = [u for u in units if not u.planned]
+    units = [u for u in units if u.planned]
+    report_progress(phase="plan", searches=len(unplanned), run_id=str(run_id))
+    for planned in await asyncio.gather(*(collector.plan(unit) for unit in unplanned)):
+        units.extend(planned)
+
+    todo = [u for u in units if u.planned and not u.finished]
+    done = 0
+
+    async def run(unit: CollectionUnit):
+        nonlocal done
+        await collector.run_unit(unit)
+        done += 1
+        report_progress(phase="collect", units_done=done, units=len(todo), pages_fetched=collector.pages_fetched)
+
+    report_progress(phase="collect", units_done=0, units=len(todo), pages_fetched=collector.pages_fetched)
+    await asyncio.gather(*(run(unit) for unit in todo))
+
+    # A unit whose last page landed during planning never ran; close it out
+    for unit in units:
+        if unit.finished and unit.status != UnitStatus.COMPLETED:
+            unit.status = UnitStatus.COMPLETED
+            await asyncio.to_thread(save_unit, unit)
+
+    failed = [u for u in units if u.status == UnitStatus.FAILED]
+    final_count = await asyncio.to_thread(_count_candidates)
+    return {
+        "status": "partial" if failed else "completed",
+        "run_id": str(run_id),
+        "resumed": resumed,
+        "searches": len({(u.cycle, u.office, u.party) for u in units}),
+        "units": len(units),
+        "units_failed": [{"unit": u.unit_key, "next_page": u.next_page, "error": u.error} for u in failed],
+        "pages_fetched": collector.pages_fetched,
+        "fec_candidates_checked": sum(u.candidates_checked for u in units),
+        "new_candidates_added": sum(u.candidates_added for u in units),
+        "database_count_after": final_count,
+        "message": "Run again to resume failed units" if failed else "All planned pages collected",
+    }
@@ -0,0 +1,245 @@
+"""Occupation and biography extraction from FEC Form 2 and Form 1 documents
+
+For each candidate still missing an occupation, the latest Form 2 (statement
+of candidacy, by candidate) and Form 1 (statement of organization, by
+committee) are looked up on the FEC API and their html_url pages downloaded
+with bounded concurrency. Parsing the HTML with lxml is CPU-bound, so it runs
+in a process pool and the event loop keeps downloading meanwhile.
+
+Every document's sha256 and extracted fields are kept in fec_documents. A
+document URL seen before is not downloaded again (FEC amendments get new
+URLs); with refresh=True it is downloaded but only re-parsed if its hash
+changed. Candidate updates and cache rows are written in bulk per chunk.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db.client import db
+from app.jobs.context import report_progress
+from app.landing import land
+from app.models.records import RecordBatch, candidate_batch
+from app.utils.http import get_http_client
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+from app.utils.ratelimit import get_rate_limiter
+from app.utils.retry import api_retry
+
+logger = get_logger(__name__)
+
+FEC_BASE_URL = "https://api.open.fec.gov/v1"
+CHUNK_SIZE = 500
+CANDIDATE_COLUMNS = ["candidate_id", "full_name", "source_candidate_ID", "committee_id", "current_position",
+                     "bio_summary"]
+
+# "OCCUPATION: Attorney", "Candidate's Employer", ... at the start of a text node
+FIELD_LABELS = {
+    "occupation": re.compile(r"^(?:candidate'?s?\s+)?occupation\b[\s:.\-]*", re.I),
+    "employer": re.compile(r"^(?:candidate'?s?\s+)?employer\b[\s:.\-]*", re.I),
+}
+
+
+# Parsing (runs in worker processes)
+
+def _clean(value: str) -> Optional[str]:
+    value = " ".join(value.split()).strip(" :.-")
+    if not value or value.upper() in ("N/A", "NONE", "NA"):
+        return None
+    return value.title() if value.isupper() else value
+
+
+def parse_document(content: bytes) -> Dict[str, Optional[str]]:
+    """Labelled fields from an FEC form HTML page; the value is the label's remainder or the next text node"""
+    import lxml.html
+
+    try:
+        chunks = [" ".join(t.split()) for t in lxml.html.fromstring(content).xpath("//body//text()") if t.strip()]
+    except Exception:
+        return {}
+
+    fields: Dict[str, Optional[str]] = {}
+    for i, chunk in enumerate(chunks):
+        for field, label in FIELD_LABELS.items():
+            match = label.match(chunk)
+            if field in fields or not match:
+                continue
+            value = chunk[match.end():]
+            if not value and i + 1 < len(chunks) and not any(p.match(chunks[i + 1]) for p in FIELD_LABELS.values()):
+                value = chunks[i + 1]
+            fields[field] = _clean(value)
+    return fields
+
+
+def candidate_update(candidate: Dict[str, Any], fields: Dict[str, Optional[str]],
+                     filed: Optional[str]) -> Optional[Dict[str, Any]]:
+    """candidates columns to write for extracted fields; curated position and bio are kept"""
+    occupation, employer = fields.get("occupation"), fields.get("employer")
+    if not occupation:
+        return None
+    position = f"{occupation}, {employer}" if employer and employer.lower() != "self" else occupation
+    update = {
+        "candidate_id": candidate["candidate_id"],
+        "full_name": candidate["full_name"],
+        "occupation": occupation,
+        "current_position": candidate.get("current_position") or position,
+        "bio_summary": candidate.get("bio_summary"),
+    }
+    if not update["bio_summary"]:
+        source = f"FEC statement of candidacy filed {filed}" if filed else "FEC filings"
+        update["bio_summary"] = f"Occupation listed on {source}: {position}."
+    return update
+
+
+# Cache
+
+def load_document_cache() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """document_url -> (content_hash, fields)"""
+    batch = db.scan('fec_documents', RecordBatch(["document_url", "content_hash", "fields"]))
+    return {url: (content_hash, fields or {}) for url, content_hash, fields in
+            zip(batch.column("document_url"), batch.column("content_hash"), batch.column("fields"))}
+
+
+def load_candidates(refresh: bool) -> List[Dict[str, Any]]:
+    where = None if refresh else (lambda q: q.is_('occupation', 'null'))
+    batch = db.scan('candidates', candidate_batch(CANDIDATE_COLUMNS), where=where)
+    return [row for row in batch.rows() if row["source_candidate_ID"]]
+
+
+class _Extractor:
+    def __init__(self, api_key: str, pool: ProcessPoolExecutor, cache: Dict[str, Tuple[str, Dict[str, Any]]],
+                 refresh: bool):
+        self.api_key = api_key
+        self.pool = pool
+        self.cache = cache
+        self.refresh = refresh
+        self.client = get_http_client()
+        self.rate_limiter = get_rate_limiter("fec")
+        self.semaphore = asyncio.Semaphore(settings.document_concurrency)
+        self.counts = {"documents_downloaded": 0, "documents_parsed": 0, "documents_cached": 0,
+                       "candidates_without_documents": 0, "failed": 0}
+        self.cache_rows: List[Dict[str, Any]] = []
+
+    @api_retry()
+    async def latest_filing(self, form_type: str, **params) -> Optional[Dict[str, Any]]:
+        await self.rate_limiter.acquire()
+        params = {"api_key": self.api_key, "form_type": form_type, "sort": "-receipt_date", "per_page": 1, **params}
+        response = await self.client.get(f"{FEC_BASE_URL}/filings/", params=params)
+        response.raise_for_status()
+        data = response.json()
+        land("fec", "filings", params, data)
+        results = data.get('results', [])
+        return results[0] if results and results[0].get('html_url') else None
+
+    @api_retry()
+    async def download(self, url: str) -> bytes:
+        response = await self.client.get(url)
+        response.raise_for_status()
+        return response.content
+
+    async def document_fields(self, filing: Dict[str, Any], candidate_id: str, form_type: str) -> Dict[str, Any]:
+        """Fields of a filing's document, from the cache when the URL or content was seen before"""
+        url = filing['html_url']
+        cached = self.cache.get(url)
+        if cached and not self.refresh:
+            self.counts["documents_cached"] += 1
+            return cached[1]
+
+        content = await self.download(url)
+        self.counts["documents_downloaded"] += 1
+        content_hash = hashlib.sha256(content).hexdigest()
+        if cached and cached[0] == content_hash:
+            self.counts["documents_cached"] += 1
+            return cached[1]
+
+        fields = await asyncio.get_running_loop().run_in_executor(self.pool, parse_document, content)
+        self.counts["documents_parsed"] += 1
+        self.cache[url] = (content_hash, fields)
+        self.cache_rows.append({
+            "document_url": url,
+            "candidate_id": candidate_id,
+            "form_type": form_type,
+            "file_number": filing.get('file_number'),
+            "content_hash": content_hash,
+            "fields": fields,
+            "parsed_at": datetime.now(timezone.utc).isoformat(),
+        })
+        return fields
+
+    async def extract(self, candidate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The candidates update for one candidate; Form 2 fields win over Form 1"""
+        async with self.semaphore:
+            try:
+                fields: Dict[str, Any] = {}
+                filed = None
+                forms = [("F2", {"candidate_id": candidate["source_candidate_ID"]})]
+                if candidate.get("committee_id"):
+                    forms.append(("F1", {"committee_id": candidate["committee_id"]}))
+                for form_type, params in forms:
+                    filing = await self.latest_filing(form_type, **params)
+                    if filing is None:
+                        continue
+                    for key, value in (await self.document_fields(filing, candidate["candidate_id"],
+                                                                  form_type)).items():
+                        if value and not fields.get(key):
+                            fields[key] = value
+                    if form_type == "F2":
+                        filed = filing.get('receipt_date')
+                    if fields.get("occupation") and fields.get("employer"):
+                        break
+                if not fields:
+                    self.counts["candidates_without_documents"] += 1
+                return candidate_update(candidate, fields, filed)
+            except Exception as e:
+                self.counts["failed"] += 1
+                logger.warning("Document extraction failed", candidate=candidate["source_candidate_ID"],
+                               error=str(e))
+                return None
+
+    def flush(self, updates: List[Dict[str, Any]]):
+        if self.cache_rows:
+            db.supabase.table('fec_documents').upsert(self.cache_rows, on_conflict="document_url").execute()
+            self.cache_rows = []
+        if updates:
+            db.supabase.table('candidates').upsert(updates, on_conflict="candidate_id").execute()
+
+
+def _parser_pool() -> ProcessPoolExecutor:
+    # spawn: forking a process that is running an event loop and HTTP client threads is unsafe
+    workers = settings.document_parse_workers or os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+@timed(PIPELINE_SECONDS.labels("documents"))
+async def extract_candidate_documents(refresh: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Fill occupation, current_position and bio_summary from the candidates' F2/F1 documents"""
+    fec_api_key = os.environ.get('FEC_API_KEY')
+    if not fec_api_key:
+        return {"error": "FEC_API_KEY not configured"}
+
+    candidates, cache = await asyncio.gather(asyncio.to_thread(load_candidates, refresh),
+                                             asyncio.to_thread(load_document_cache))
+    candidates = candidates[:limit] if limit else candidates
+    updated_rows = PIPELINE_ROWS.labels("documents", "updated")
+    updated = 0
+
+    with _parser_pool() as pool:
+        extractor = _Extractor(fec_api_key, pool, cache, refresh)
+        for start in range(0, len(candidates), CHUNK_SIZE):
+            report_progress(processed=start, total=len(candidates), updated=updated, **extractor.counts)
+            results = await asyncio.gather(*(extractor.extract(c) for c in candidates[start:start + CHUNK_SIZE]))
+            updates = [u for u in results if u]
+            await asyncio.to_thread(extractor.flush, updates)
+            updated += len(updates)
+            updated_rows.inc(len(updates))
+
+    return {
+        "candidates_checked": len(candidates),
+        "candidates_updated": updated,
+        **extractor.counts,
+    }
@@ -0,0 +1,335 @@
+"""Bucketed reconciliation of our FEC candidates against FEC
+
+Instead of walking every FEC page, both sides are partitioned into buckets,
+cycle x party x office and below that x state, and summarized per bucket by a
+row count and an order-independent content hash: the sum, mod 2**64, of a
+hash of each record's compared fields, so two buckets holding the same records
+hash the same whatever order they were read in.
+
+Our side is one scan of candidates. FEC is asked only for counts
+(``per_page=1``, reading pagination.count), and its content hashes come from
+the /candidates/ pages already in the landing zone (app.landing), the last
+payloads FEC returned. An office bucket whose counts and hashes all agree is
+done after one request; one that disagrees is counted state by state, and only
+the states that still disagree are fetched in full and diffed record by
+record into missing (at FEC, not here), extra (here, not at FEC), changed
+(compared fields differ, or the record moved bucket) and duplicates. A
+consistent dataset verifies in one request per cycle x party x office.
+
+A candidates row is unique on the FEC ID and keeps the cycle it was first
+stored under, while FEC lists a candidate under every cycle they run in. So
+cycle is a matter of membership, not of content: our row belongs to the
+bucket of its own cycle and of every cycle the landed pages list it under,
+election_cycle is neither hashed nor compared, and an FEC ID we hold in any
+bucket is present, never missing. Applying a diff leaves the election_cycle
+of existing rows alone; a missing candidate is inserted under the earliest
+cycle FEC lists it in.
+
+Content FEC changed since its pages were last landed shows up only in buckets
+that are fetched; ``deep=True`` fetches every non-empty state bucket. Fetched
+pages are landed, so each run refreshes the hashes the next one compares.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.db.client import db
+from app.jobs.context import report_progress
+from app.landing import land, landing_zone
+from app.models.records import candidate_batch
+from app.pipelines.fec import (FEC_BASE_URL, FEC_STATES, OFFICE_NAMES, PARTY_NAMES, build_candidate_record,
+                               candidate_update, upsert_candidate_records)
+from app.utils.http import get_http_client
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+from app.utils.ratelimit import get_rate_limiter
+from app.utils.retry import api_retry
+
+logger = get_logger(__name__)
+
+CANDIDATES_URL = f"{FEC_BASE_URL}/candidates/"
+PER_PAGE = 100
+
+# candidates columns a reconciliation compares; the FEC ID is the record's identity and
+# election_cycle decides bucket membership
+COMPARED = ("full_name", "party", "state", "office", "district", "status", "incumbent")
+OUR_COLUMNS = ("candidate_id", "source_candidate_ID", "election_cycle") + COMPARED
+
+Bucket = Tuple[Any, ...]
+
+
+def record_hash(row: Dict[str, Any]) -> int:
+    """64-bit hash of a record's FEC ID and compared fields"""
+    fields = [row.get('source_candidate_ID')] + [row.get(column) for column in COMPARED]
+    return int.from_bytes(hashlib.sha256(json.dumps(fields, default=str).encode()).digest()[:8], "big")
+
+
+class BucketSummary:
+    """Count and order-independent hash of the records in one bucket"""
+
+    __slots__ = ("count", "hash")
+
+    def __init__(self):
+        self.count = 0
+        self.hash = 0
+
+    def add(self, row_hash: int):
+        self.count += 1
+        self.hash = (self.hash + row_hash) & 0xFFFFFFFFFFFFFFFF
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BucketSummary) and (self.count, self.hash) == (other.count, other.hash)
+
+
+def _buckets(row: Dict[str, Any], cycle: int, party: str) -> Tuple[Bucket, Bucket]:
+    """Office bucket and state bucket of a candidates row in one cycle"""
+    office = (cycle, party, row['office'])
+    return office, office + (row['state'],)
+
+
+def _summarize(rows: Dict[Bucket, List[Dict[str, Any]]]) -> Dict[Bucket, BucketSummary]:
+    """Summaries of every state bucket and of the office buckets above them"""
+    summaries: Dict[Bucket, BucketSummary] = {}
+    hashes: Dict[int, int] = {}
+    for bucket, bucket_rows in rows.items():
+        state_summary = summaries.setdefault(bucket, BucketSummary())
+        office_summary = summaries.setdefault(bucket[:3], BucketSummary())
+        for row in bucket_rows:
+            # A row in several cycles is one object; hash it once
+            row_hash = hashes.get(id(row))
+            if row_hash is None:
+                row_hash = hashes[id(row)] = record_hash(row)
+            state_summary.add(row_hash)
+            office_summary.add(row_hash)
+    return summaries
+
+
+def load_landed_candidates(cycles: List[int],
+                           parties: List[str]) -> Tuple[Dict[Bucket, List[Dict[str, Any]]], Dict[str, Set[int]]]:
+    """The last landed FEC record of each candidate per cycle, as candidates rows by state bucket,
+    and the cycles each FEC ID was landed under"""
+    latest: Dict[Tuple[int, str, str], Tuple[str, Dict[str, Any]]] = {}
+    for record in landing_zone.records("fec", "candidates"):
+        params = record["params"]
+        cycle = int(params.get("election_year") or params.get("cycle") or 0)
+        party = params.get("party")
+        if cycle not in cycles or party not in parties:
+            continue
+        for candidate in record["payload"].get("results", []):
+            key = (cycle, party, candidate.get('candidate_id'))
+            if key[2] and (key not in latest or latest[key][0] <= record["fetched_at"]):
+                # Mapped right away: a raw FEC record is several times the size of the row
+                latest[key] = (record["fetched_at"], build_candidate_record(candidate, cycle))
+    rows: Dict[Bucket, List[Dict[str, Any]]] = {}
+    landed_cycles: Dict[str, Set[int]] = {}
+    for (cycle, party, fec_id), (_, row) in latest.items():
+        rows.setdefault(_buckets(row, cycle, party)[1], []).append(row)
+        landed_cycles.setdefault(fec_id, set()).add(cycle)
+    return rows, landed_cycles
+
+
+def load_our_candidates(cycles: List[int], parties: List[str], landed_cycles: Dict[str, Set[int]]
+                        ) -> Tuple[Dict[Bucket, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+    """Our FEC candidates of these parties by state bucket of every cycle they belong to,
+    and every one of our FEC candidates by FEC ID
+
+    A row belongs to the cycle it was stored under and to every cycle FEC's
+    landed pages list its FEC ID under.
+    """
+    party_codes = {PARTY_NAMES.get(party, party.title()): party for party in parties}
+    wanted = set(cycles)
+    batch = db.scan('candidates', candidate_batch(OUR_COLUMNS))
+    rows: Dict[Bucket, List[Dict[str, Any]]] = {}
+    by_fec_id: Dict[str, Dict[str, Any]] = {}
+    for row in batch.rows():
+        fec_id = row['source_candidate_ID']
+        if not fec_id:
+            continue
+        by_fec_id.setdefault(fec_id, row)
+        party = party_codes.get(row['party'])
+        if not party:
+            continue
+        for cycle in ({row['election_cycle']} | landed_cycles.get(fec_id, set())) & wanted:
+            rows.setdefault(_buckets(row, cycle, party)[1], []).append(row)
+    return rows, by_fec_id
+
+
+class _Reconciler:
+    """FEC requests of one reconciliation, and the diff they add up to"""
+
+    def __init__(self, api_key: str, our_ids: Dict[str, Dict[str, Any]]):
+        self.api_key = api_key
+        self.our_ids = our_ids
+        self.client = get_http_client()
+        self.rate_limiter = get_rate_limiter("fec")
+        self.semaphore = asyncio.Semaphore(settings.collection_concurrency)
+        self.requests = 0
+        self.missing: Dict[str, Dict[str, Any]] = {}
+        self.extra: Dict[str, Dict[str, Any]] = {}
+        self.changed: List[Dict[str, Any]] = []
+        self.duplicates: Dict[str, Dict[str, Any]] = {}
+        self.at_fec: Set[str] = set()
+        self._absent: Dict[str, Dict[str, Any]] = {}
+        self._compared: Set[str] = set()
+
+    @api_retry()
+    async def _get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        await self.rate_limiter.acquire()
+        response = await self.client.get(CANDIDATES_URL, params={"api_key": self.api_key, **params})
+        response.raise_for_status()
+        self.requests += 1
+        return response.json()
+
+    async def count(self, cycle: int, party: str, office: str, state: Optional[str] = None) -> Optional[int]:
+        """FEC's count for a bucket; None if FEC only estimated it"""
+        params = {"election_year": cycle, "party": party, "office": office, "per_page": 1}
+        if state:
+            params["state"] = state
+        async with self.semaphore:
+            pagination = (await self._get(params)).get('pagination', {})
+        return pagination.get('count', 0) if pagination.get('is_count_exact', True) else None
+
+    async def fetch(self, cycle: int, party: str, office: str, state: str) -> List[Dict[str, Any]]:
+        """Every FEC candidate in a state bucket, as candidates rows; the pages are landed"""
+        rows, page = [], 1
+        async with self.semaphore:
+            while True:
+                params = {"election_year": cycle, "party": party, "office": office, "state": state,
+                          "per_page": PER_PAGE, "page": page, "sort": "name"}
+                data = await self._get(params)
+                land("fec", "candidates", params, data)
+                rows += [build_candidate_record(c, cycle) for c in data.get('results', []) if c.get('candidate_id')]
+                if page >= (data.get('pagination', {}).get('pages') or 1):
+                    return rows
+                page += 1
+
+    def diff(self, theirs: List[Dict[str, Any]], ours: List[Dict[str, Any]]):
+        """Add the record-level differences of one state bucket
+
+        An FEC record we hold under another bucket (another cycle, or a party
+        or state it moved from) is compared with that row rather than missing.
+        """
+        fec_rows = {row['source_candidate_ID']: row for row in theirs}
+        our_rows: Dict[str, Dict[str, Any]] = {}
+        for row in ours:
+            fec_id = row['source_candidate_ID']
+            if fec_id in our_rows:
+                self.duplicates[row['candidate_id']] = {"fec_id": fec_id, "candidate_id": row['candidate_id'],
+                                                        "kept": our_rows[fec_id]['candidate_id']}
+            else:
+                our_rows[fec_id] = row
+        for fec_id, row in fec_rows.items():
+            self.at_fec.add(fec_id)
+            ours_row = our_rows.get(fec_id) or self.our_ids.get(fec_id)
+            if ours_row is not None:
+                self._compare(ours_row, row)
+            elif fec_id not in self.missing or row['election_cycle'] < self.missing[fec_id]['election_cycle']:
+                self.missing[fec_id] = row
+        for fec_id, row in our_rows.items():
+            if fec_id not in fec_rows:
+                self._absent[fec_id] = row
+
+    def _compare(self, ours: Dict[str, Any], theirs: Dict[str, Any]):
+        # A candidate listed in several fetched cycles is compared once
+        if ours['source_candidate_ID'] in self._compared:
+            return
+        self._compared.add(ours['source_candidate_ID'])
+        fields = {column: {"ours": ours.get(column), "fec": theirs.get(column)}
+                  for column in COMPARED if ours.get(column) != theirs.get(column)}
+        if fields:
+            self.changed.append({"fec_id": ours['source_candidate_ID'], "candidate_id": ours['candidate_id'],
+                                 "fields": fields, "record": theirs})
+
+    def settle_extra(self, present: Set[str]):
+        """Rows absent from a fetched bucket are extra unless FEC lists them anywhere else"""
+        for fec_id, row in self._absent.items():
+            if fec_id not in self.at_fec and fec_id not in present:
+                self.extra[fec_id] = row
+
+
+@timed(PIPELINE_SECONDS.labels("reconcile"))
+async def reconcile_candidates(cycles: Optional[List[int]] = None, deep: bool = False,
+                               apply: bool = False) -> Dict[str, Any]:
+    """Diff our FEC candidates against FEC bucket by bucket; apply=True upserts missing and changed records"""
+    fec_api_key = os.environ.get('FEC_API_KEY')
+    if not fec_api_key:
+        return {"error": "FEC_API_KEY not configured"}
+
+    cycles = cycles or settings.backfill_cycles
+    parties = settings.collection_party_list
+    offices = settings.collection_office_list
+    report_progress(phase="scan")
+    landed, landed_cycles = load_landed_candidates(cycles, parties)
+    ours, our_ids = load_our_candidates(cycles, parties, landed_cycles)
+    our_summaries = _summarize(ours)
+    landed_summaries = _summarize(landed)
+    empty = BucketSummary()
+    reconciler = _Reconciler(fec_api_key, our_ids)
+
+    async def check_state(office_bucket: Bucket, code: str, state: str) -> Optional[Bucket]:
+        """The state bucket if it has to be fetched"""
+        bucket = office_bucket + (state,)
+        cycle, party = office_bucket[:2]
+        count = await reconciler.count(cycle, party, code, state)
+        summary = our_summaries.get(bucket, empty)
+        if count == 0 and summary.count == 0:
+            return None
+        if not deep and count == summary.count and landed_summaries.get(bucket, empty) == summary:
+            return None
+        return bucket
+
+    async def check_office(cycle: int, party: str, code: str) -> List[Bucket]:
+        """State buckets of an office bucket that have to be fetched"""
+        office_bucket = (cycle, party, OFFICE_NAMES.get(code, code))
+        summary = our_summaries.get(office_bucket, empty)
+        if not deep:
+            count = await reconciler.count(cycle, party, code)
+            if count == summary.count and landed_summaries.get(office_bucket, empty) == summary:
+                return []
+        # FEC's states plus any odd state codes our rows or its landed pages have
+        states = set(FEC_STATES) | {bucket[3] for bucket in list(ours) + list(landed)
+                                    if bucket[:3] == office_bucket and bucket[3]}
+        checked = await asyncio.gather(*(check_state(office_bucket, code, state) for state in sorted(states)))
+        return [bucket for bucket in checked if bucket]
+
+    office_checks = [(cycle, party, code) for cycle in cycles for party in parties for code in offices]
+    mismatched: List[Bucket] = []
+    for i, (cycle, party, code) in enumerate(office_checks):
+        report_progress(phase="count", offices_checked=i, offices=len(office_checks), requests=reconciler.requests)
+        mismatched += await check_office(cycle, party, code)
+
+    codes = {name: code for code, name in OFFICE_NAMES.items()}
+    report_progress(phase="diff", buckets=len(mismatched), requests=reconciler.requests)
+    fetched = await asyncio.gather(*(reconciler.fetch(cycle, party, codes.get(office, office), state)
+                                     for cycle, party, office, state in mismatched))
+    for bucket, theirs in zip(mismatched, fetched):
+        reconciler.diff(theirs, ours.get(bucket, []))
+    # Buckets left unfetched agreed with FEC, so whatever we hold there FEC lists too
+    fetched_buckets = set(mismatched)
+    reconciler.settle_extra({row['source_candidate_ID'] for bucket, rows in ours.items()
+                             if bucket not in fetched_buckets for row in rows})
+
+    for outcome, rows in (("missing", reconciler.missing), ("extra", reconciler.extra),
+                          ("changed", reconciler.changed), ("duplicate", reconciler.duplicates)):
+        PIPELINE_ROWS.labels("reconcile", outcome).inc(len(rows))
+    result: Dict[str, Any] = {
+        "consistent": not (reconciler.missing or reconciler.extra or reconciler.changed or reconciler.duplicates),
+        "requests": reconciler.requests,
+        "office_buckets": len(office_checks),
+        "mismatched_buckets": ["/".join(str(part) for part in bucket) for bucket in mismatched],
+        "missing": list(reconciler.missing.values()),
+        "extra": list(reconciler.extra.values()),
+        "changed": [{k: v for k, v in change.items() if k != "record"} for change in reconciler.changed],
+        "duplicates": list(reconciler.duplicates.values()),
+    }
+    if apply:
+        inserted = upsert_candidate_records(list(reconciler.missing.values()))
+        updated = upsert_candidate_records([candidate_update(change["record"]) for change in reconciler.changed])
+        result.update(upserted=inserted[0] + updated[0], failed=inserted[1] + updated[1])
+    logger.info("Reconciled FEC candidates", consistent=result["consistent"], requests=reconciler.requests,
+                mismatched_buckets=len(mismatched), missing=len(reconciler.missing), extra=len(reconciler.extra),
+                changed=len(reconciler.changed), duplicates=len(reconciler.duplicates))
+    return result
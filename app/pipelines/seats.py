@@ -0,0 +1,330 @@
+"""Seat profiles: partisan lean, last margin and election calendar per seat
+
+A seat is (state, office, district); Senate and presidential seats have no
+district. Profiles are built from local source files in settings.seat_data_dir
+(data/seats by default):
+
+- results.csv: year,state,office,district,party,candidate,votes, one row per
+  candidate per general election
+- presidential.csv: year,state,district,dem_votes,rep_votes, presidential
+  vote by congressional district; an empty district is the statewide total
+- calendars.json: a list of {cycle, state, office, primary_date, runoff_date,
+  general_date, source}; office null applies to every seat in the state, and
+  usvote/ap rows are used only when their feature flag is enabled
+
+Everything is computed with grouped pandas operations over whole frames, so a
+national rebuild is a few joins rather than a loop per seat. Passing `states`
+rebuilds only those states. pandas is imported here and nowhere on the API
+startup path.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import NAMESPACE_URL, uuid5
+
+import pandas as pd
+
+from app.config import settings
+from app.db.client import db
+from app.jobs.context import report_progress
+from app.models.common import CalendarSource
+from app.models.records import candidate_batch
+from app.pipelines.fec import OFFICE_NAMES, PARTY_NAMES
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+
+logger = get_logger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), "../..", "data", "seats")
+SEAT_KEY = ["state", "office", "district"]
+UPSERT_CHUNK_SIZE = 1000
+
+# Preferred calendar source first
+CALENDAR_PRIORITY = [CalendarSource.AP.value, CalendarSource.USVOTE.value, CalendarSource.MANUAL.value]
+
+
+def seat_id(state: str, office: str, district: str) -> str:
+    """Stable seat_id, so rebuilding a seat updates its row in place"""
+    return str(uuid5(NAMESPACE_URL, f"seat:{state}:{office}:{district}"))
+
+
+def _data_dir() -> str:
+    return settings.seat_data_dir or DEFAULT_DATA_DIR
+
+
+def normalize_seats(frame: pd.DataFrame) -> pd.DataFrame:
+    """Canonical seat key columns: USPS state, office name, two-digit House district or ''"""
+    frame = frame.copy()
+    frame["state"] = frame["state"].astype(object).fillna("").astype(str).str.strip().str.upper()
+    office = frame["office"].astype(object).fillna("").astype(str).str.strip()
+    frame["office"] = office.str.upper().map(OFFICE_NAMES).fillna(office.str.title())
+    district = frame["district"].astype(object).where(frame["district"].notna(), "")
+    district = district.astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    is_house = frame["office"].eq("House")
+    frame["district"] = district.str.zfill(2).where(is_house, "")
+    frame.loc[is_house & district.isin(["", "AL", "al"]), "district"] = "00"
+    return frame
+
+
+def _party_names(party: pd.Series) -> pd.Series:
+    codes = party.astype(str).str.strip().str.upper()
+    return codes.map(PARTY_NAMES).fillna(party)
+
+
+# Sources
+
+def load_results(states: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    path = os.path.join(_data_dir(), "results.csv")
+    if not os.path.exists(path):
+        logger.warning("No election results file", path=path)
+        return pd.DataFrame(columns=SEAT_KEY + ["year", "party", "votes"])
+    frame = normalize_seats(pd.read_csv(path, dtype={"district": str, "state": str, "party": str}))
+    if states:
+        frame = frame[frame["state"].isin(states)]
+    frame["party"] = _party_names(frame["party"])
+    frame["votes"] = pd.to_numeric(frame["votes"], errors="coerce").fillna(0)
+    return frame[SEAT_KEY + ["year", "party", "votes"]]
+
+
+def load_presidential(states: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    path = os.path.join(_data_dir(), "presidential.csv")
+    if not os.path.exists(path):
+        logger.warning("No presidential results file", path=path)
+        return pd.DataFrame(columns=["year", "state", "district", "dem_votes", "rep_votes"])
+    frame = pd.read_csv(path, dtype={"district": str, "state": str})
+    frame["state"] = frame["state"].str.strip().str.upper()
+    frame["district"] = frame["district"].fillna("").str.strip()
+    frame.loc[frame["district"].ne(""), "district"] = frame["district"].str.zfill(2)
+    # National share needs every state, so filtering happens after it is computed
+    frame.attrs["states"] = list(states) if states else None
+    return frame
+
+
+def load_calendars(cycle: int, states: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    path = os.path.join(_data_dir(), "calendars.json")
+    columns = ["state", "office", "primary_date", "runoff_date", "general_date", "calendar_source"]
+    if not os.path.exists(path):
+        logger.warning("No election calendar file", path=path)
+        return pd.DataFrame(columns=columns)
+    with open(path) as f:
+        frame = pd.DataFrame(json.load(f))
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+
+    enabled = {CalendarSource.MANUAL.value}
+    if settings.enable_usvote_calendars:
+        enabled.add(CalendarSource.USVOTE.value)
+    if settings.enable_ap_elections:
+        enabled.add(CalendarSource.AP.value)
+    frame = frame.rename(columns={"source": "calendar_source"})
+    for column in columns:
+        if column not in frame:
+            frame[column] = None
+    frame["state"] = frame["state"].str.upper()
+    frame["calendar_source"] = frame["calendar_source"].fillna(CalendarSource.MANUAL.value)
+    frame = frame[frame["calendar_source"].isin(enabled)]
+    if "cycle" in frame:
+        frame = frame[frame["cycle"].isna() | frame["cycle"].eq(cycle)]
+    if states:
+        frame = frame[frame["state"].isin(states)]
+    office = frame["office"].astype(object)
+    frame["office"] = office.str.upper().map(OFFICE_NAMES).fillna(office.str.title()).fillna("")
+
+    # One calendar per (state, office): most preferred enabled source wins
+    frame["priority"] = frame["calendar_source"].map({s: i for i, s in enumerate(CALENDAR_PRIORITY)})
+    frame = frame.sort_values("priority").drop_duplicates(["state", "office"])
+    return frame[columns]
+
+
+def load_candidates(cycle: int, states: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    def where(query):
+        query = query.eq('election_cycle', cycle)
+        return query.in_('state', list(states)) if states else query
+
+    batch = db.scan('candidates', candidate_batch(["state", "office", "district", "party", "incumbent"]),
+                    where=where)
+    frame = batch.to_frame()
+    if frame.empty:
+        return pd.DataFrame(columns=SEAT_KEY + ["party", "incumbent"])
+    frame = normalize_seats(frame.astype({c: object for c in SEAT_KEY}))
+    frame["incumbent"] = frame["incumbent"].fillna(False).astype(bool)
+    return frame
+
+
+# Computation
+
+def compute_margins(results: pd.DataFrame) -> pd.DataFrame:
+    """Winning party, year and winner-minus-runner-up margin (percentage points) of each seat's latest race"""
+    columns = SEAT_KEY + ["last_result_year", "result_holder_party", "last_margin"]
+    if results.empty:
+        return pd.DataFrame(columns=columns)
+    latest = results[results["year"].eq(results.groupby(SEAT_KEY)["year"].transform("max"))]
+    by_party = latest.groupby(SEAT_KEY + ["year", "party"], as_index=False)["votes"].sum()
+    by_party = by_party.sort_values(SEAT_KEY + ["votes"], ascending=[True, True, True, False])
+    grouped = by_party.groupby(SEAT_KEY)
+    by_party["rank"] = grouped.cumcount()
+    by_party["total"] = grouped["votes"].transform("sum")
+
+    winners = by_party[by_party["rank"].eq(0)].set_index(SEAT_KEY)
+    runners_up = by_party[by_party["rank"].eq(1)].set_index(SEAT_KEY)["votes"].reindex(winners.index).fillna(0)
+    margin = (winners["votes"] - runners_up) / winners["total"].where(winners["total"] > 0) * 100
+    return pd.DataFrame({
+        "last_result_year": winners["year"].astype(int),
+        "result_holder_party": winners["party"],
+        "last_margin": margin.round(2),
+    }).reset_index()
+
+
+def format_pvi(lean: pd.Series) -> pd.Series:
+    """Cook-style labels (D+5, R+3, EVEN) from Democratic lean in points"""
+    points = lean.round().astype("Int64")
+    label = pd.Series(pd.NA, index=lean.index, dtype=object)
+    label[points.gt(0).fillna(False)] = "D+" + points[points.gt(0).fillna(False)].astype(str)
+    label[points.lt(0).fillna(False)] = "R+" + (-points[points.lt(0).fillna(False)]).astype(str)
+    label[points.eq(0).fillna(False)] = "EVEN"
+    return label
+
+
+def compute_pvi(presidential: pd.DataFrame) -> pd.DataFrame:
+    """Two-party Democratic share minus the national share, averaged over the last two presidential elections
+
+    Returns one row per (state, district); district '' is statewide.
+    """
+    columns = ["state", "district", "pvi"]
+    if presidential.empty:
+        return pd.DataFrame(columns=columns)
+    years = sorted(presidential["year"].unique())[-2:]
+    frame = presidential[presidential["year"].isin(years)].copy()
+    two_party = frame["dem_votes"] + frame["rep_votes"]
+    frame["share"] = frame["dem_votes"] / two_party.where(two_party > 0)
+
+    statewide = frame[frame["district"].eq("")]
+    national = statewide.groupby("year")[["dem_votes", "rep_votes"]].sum()
+    national_share = national["dem_votes"] / (national["dem_votes"] + national["rep_votes"])
+    frame["lean"] = (frame["share"] - frame["year"].map(national_share)) * 100
+
+    states = presidential.attrs.get("states")
+    if states:
+        frame = frame[frame["state"].isin(states)]
+    lean = frame.groupby(["state", "district"], as_index=False)["lean"].mean()
+    lean["pvi"] = format_pvi(lean["lean"])
+    return lean[columns]
+
+
+def compute_candidate_flags(candidates: pd.DataFrame) -> pd.DataFrame:
+    """Whether an incumbent is running in each seat, and that incumbent's party"""
+    columns = SEAT_KEY + ["seat_incumbent_running", "incumbent_party"]
+    if candidates.empty:
+        return pd.DataFrame(columns=columns)
+    flags = candidates.groupby(SEAT_KEY, as_index=False)["incumbent"].any()
+    flags = flags.rename(columns={"incumbent": "seat_incumbent_running"})
+    incumbents = candidates[candidates["incumbent"]].drop_duplicates(SEAT_KEY)[SEAT_KEY + ["party"]]
+    flags = flags.merge(incumbents.rename(columns={"party": "incumbent_party"}), on=SEAT_KEY, how="left")
+    return flags[columns]
+
+
+def build_profiles(candidates: pd.DataFrame, results: pd.DataFrame, presidential: pd.DataFrame,
+                   calendars: pd.DataFrame) -> pd.DataFrame:
+    """One profile row per seat seen in this cycle's candidates or in past results"""
+    flags = compute_candidate_flags(candidates)
+    margins = compute_margins(results)
+    seats = pd.concat([flags[SEAT_KEY], margins[SEAT_KEY]]).drop_duplicates()
+    seats = seats[seats["state"].ne("") & seats["office"].ne("")]
+
+    profiles = seats.merge(flags, on=SEAT_KEY, how="left").merge(margins, on=SEAT_KEY, how="left")
+    profiles["seat_incumbent_running"] = profiles["seat_incumbent_running"].astype("boolean").fillna(False)
+    profiles["seat_current_holder_party"] = profiles["result_holder_party"].fillna(profiles["incumbent_party"])
+
+    # House seats use their district's lean (at-large falls back to statewide); Senate uses statewide
+    pvi = compute_pvi(presidential)
+    by_district = pvi.rename(columns={"pvi": "district_pvi"})
+    statewide = pvi[pvi["district"].eq("")][["state", "pvi"]].rename(columns={"pvi": "state_pvi"})
+    profiles = profiles.merge(by_district, on=["state", "district"], how="left")
+    profiles = profiles.merge(statewide, on="state", how="left")
+    statewide_seat = profiles["office"].eq("Senate") | profiles["district"].eq("00")
+    profiles["pvi"] = profiles["district_pvi"].where(profiles["district"].ne(""))
+    profiles.loc[statewide_seat, "pvi"] = profiles.loc[statewide_seat, "pvi"].fillna(
+        profiles.loc[statewide_seat, "state_pvi"])
+
+    # Office-specific calendars override the state's default
+    dates = ["primary_date", "runoff_date", "general_date", "calendar_source"]
+    specific = calendars[calendars["office"].ne("")]
+    default = calendars[calendars["office"].eq("")].drop(columns="office")
+    profiles = profiles.merge(specific, on=["state", "office"], how="left")
+    profiles = profiles.merge(default, on="state", how="left", suffixes=("", "_default"))
+    for column in dates:
+        profiles[column] = profiles[column].fillna(profiles[f"{column}_default"])
+
+    profiles["seat_id"] = [seat_id(s, o, d) for s, o, d in zip(profiles["state"], profiles["office"],
+                                                                profiles["district"])]
+    profiles["jurisdiction_type"] = "federal"
+    profiles["jurisdiction_name"] = "United States"
+    profiles["district"] = profiles["district"].where(profiles["district"].ne(""))
+    return profiles[[
+        "seat_id", "jurisdiction_type", "jurisdiction_name", "state", "office", "district",
+        "seat_current_holder_party", "seat_incumbent_running", "pvi", "last_result_year", "last_margin",
+        "primary_date", "runoff_date", "general_date", "calendar_source",
+    ]]
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict("records")
+    for record in records:
+        if record["last_result_year"] is not None:
+            record["last_result_year"] = int(record["last_result_year"])
+        if record["last_margin"] is not None:
+            record["last_margin"] = float(record["last_margin"])
+        record["seat_incumbent_running"] = bool(record["seat_incumbent_running"])
+    return records
+
+
+def upsert_profiles(profiles: pd.DataFrame) -> int:
+    rows = _records(profiles)
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        db.supabase.table('seat_profiles').upsert(rows[start:start + UPSERT_CHUNK_SIZE]).execute()
+    PIPELINE_ROWS.labels("seat_profiles", "upserted").inc(len(rows))
+    return len(rows)
+
+
+def rebuild_seat_profiles(cycle: int, states: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Load sources and candidates, compute every profile and upsert them"""
+    states = [s.upper() for s in states] if states else None
+    start = time.perf_counter()
+    candidates = load_candidates(cycle, states)
+    results = load_results(states)
+    presidential = load_presidential(states)
+    calendars = load_calendars(cycle, states)
+    loaded = time.perf_counter()
+    profiles = build_profiles(candidates, results, presidential, calendars)
+    computed = time.perf_counter()
+    upserted = upsert_profiles(profiles)
+    finished = time.perf_counter()
+
+    return {
+        "cycle": cycle,
+        "states": states or "all",
+        "candidates": len(candidates),
+        "seats": upserted,
+        "with_pvi": int(profiles["pvi"].notna().sum()),
+        "with_margin": int(profiles["last_margin"].notna().sum()),
+        "with_calendar": int(profiles["general_date"].notna().sum()),
+        "incumbents_running": int(profiles["seat_incumbent_running"].sum()),
+        "load_seconds": round(loaded - start, 3),
+        "compute_seconds": round(computed - loaded, 3),
+        "upsert_seconds": round(finished - computed, 3),
+    }
+
+
+@timed(PIPELINE_SECONDS.labels("seat_profiles"))
+async def build_seat_profiles(states: Optional[List[str]] = None, cycle: Optional[int] = None) -> Dict[str, Any]:
+    """Rebuild seat profiles nationally, or only for `states`"""
+    cycle = cycle or settings.backfill_cycles[0]
+    report_progress(phase="build", cycle=cycle, states=states or "all")
+    try:
+        return await asyncio.to_thread(rebuild_seat_profiles, cycle, states)
+    except Exception as e:
+        logger.error("Seat profile build failed", error=str(e))
+        return {"error": str(e)}
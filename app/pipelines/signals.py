@@ -0,0 +1,258 @@
+"""Signal ingestion from social post sources
+
+Sources are configured in config/signal_sources.yml. Each one is streamed
+post by post (jsonl files line by line, HTTP feeds page by page), so memory
+stays flat however large the source is. Posts are matched to candidates
+through an in-memory index of social_profiles handles, and matched posts are
+upserted into signals in batches; the (source, account_handle, posted_at)
+unique key makes re-reading a source harmless.
+
+Each source keeps a posted_at watermark in pipeline_watermarks and skips
+posts older than it on the next run, so posts that arrive far out of order
+may be dropped.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import yaml
+
+from app.db.client import db
+from app.jobs.context import report_progress
+from app.landing import land
+from app.models.common import SignalStatus
+from app.models.records import RecordBatch
+from app.utils.http import get_http_client
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+from app.utils.ratelimit import get_rate_limiter
+from app.utils.retry import api_retry
+
+logger = get_logger(__name__)
+
+SOURCES_PATH = os.path.join(os.path.dirname(__file__), "../..", "config", "signal_sources.yml")
+BATCH_SIZE = 500
+
+
+def load_sources(enabled_only: bool = True) -> List[Dict[str, Any]]:
+    """Source definitions from config/signal_sources.yml"""
+    with open(SOURCES_PATH, 'r') as f:
+        sources = yaml.safe_load(f).get("sources", [])
+    if enabled_only:
+        sources = [s for s in sources if s.get("enabled")]
+    return sources
+
+
+def normalize_handle(handle: Optional[str]) -> Optional[str]:
+    """Lowercase handle without a leading @ or profile URL prefix"""
+    if not handle:
+        return None
+    handle = handle.strip().rstrip("/")
+    if "://" in handle:
+        handle = handle.rsplit("/", 1)[-1]
+    return handle.lstrip("@").lower() or None
+
+
+class HandleIndex:
+    """Handle -> candidate_id lookups built from social_profiles
+
+    Matches on (platform, handle) first; a bare handle only matches when it
+    belongs to a single candidate across platforms.
+    """
+
+    __slots__ = ("_by_platform", "_by_handle")
+
+    def __init__(self):
+        self._by_platform: Dict[tuple, str] = {}
+        self._by_handle: Dict[str, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_platform)
+
+    def add(self, platform: Optional[str], handle: Optional[str], candidate_id: str):
+        handle = normalize_handle(handle)
+        if not handle or not candidate_id:
+            return
+        self._by_platform[(platform, handle)] = candidate_id
+        existing = self._by_handle.get(handle, candidate_id)
+        # None marks a handle shared by several candidates
+        self._by_handle[handle] = candidate_id if existing == candidate_id else None
+
+    def match(self, platform: Optional[str], handle: Optional[str]) -> Optional[str]:
+        handle = normalize_handle(handle)
+        if not handle:
+            return None
+        if platform:
+            candidate_id = self._by_platform.get((platform, handle))
+            if candidate_id:
+                return candidate_id
+        return self._by_handle.get(handle)
+
+    @classmethod
+    def load(cls) -> "HandleIndex":
+        batch = db.scan('social_profiles', RecordBatch(["candidate_id", "platform", "handle", "url"],
+                                                       uuid_columns=["candidate_id"], pooled_columns=["platform"]))
+        index = cls()
+        for candidate_id, platform, handle, url in zip(batch.column("candidate_id"), batch.column("platform"),
+                                                       batch.column("handle"), batch.column("url")):
+            index.add(platform, handle or url, candidate_id)
+        return index
+
+
+# Sources
+
+async def _jsonl_posts(source: Dict[str, Any], since: Optional[datetime]) -> AsyncIterator[Dict[str, Any]]:
+    path = source["path"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(SOURCES_PATH), "..", path)
+    files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".jsonl")) \
+        if os.path.isdir(path) else [path]
+    for file_path in files:
+        with open(file_path) as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield json.loads(line)
+                if line_number % 1000 == 0:
+                    await asyncio.sleep(0)
+
+
+@api_retry()
+async def _fetch_feed_page(source: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    await get_rate_limiter(f"signals:{source['name']}").acquire()
+    response = await get_http_client().get(source["url"], params=params)
+    response.raise_for_status()
+    page = response.json()
+    land("signals", source["name"], params, page)
+    return page
+
+
+async def _http_posts(source: Dict[str, Any], since: Optional[datetime]) -> AsyncIterator[Dict[str, Any]]:
+    params: Dict[str, Any] = {"since": since.isoformat()} if since else {}
+    while True:
+        page = await _fetch_feed_page(source, params)
+        for post in page.get("posts", []):
+            yield post
+        cursor = page.get("cursor")
+        if not cursor or not page.get("posts"):
+            return
+        params["cursor"] = cursor
+
+
+SOURCE_TYPES = {"jsonl": _jsonl_posts, "http": _http_posts}
+
+
+def _parse_posted_at(value: Any) -> Optional[datetime]:
+    try:
+        posted_at = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return posted_at if posted_at.tzinfo else posted_at.replace(tzinfo=timezone.utc)
+
+
+# Ingestion
+
+def _watermark_name(source: Dict[str, Any]) -> str:
+    return f"signals:{source['name']}"
+
+
+def _load_watermark(source: Dict[str, Any]) -> Optional[datetime]:
+    result = db.supabase.table('pipeline_watermarks').select("value").eq('name', _watermark_name(source))\
+        .limit(1).execute()
+    return _parse_posted_at(result.data[0]['value']) if result.data else None
+
+
+def _save_watermark(source: Dict[str, Any], value: datetime):
+    db.supabase.table('pipeline_watermarks').upsert(
+        {"name": _watermark_name(source), "value": value.isoformat()}, on_conflict="name").execute()
+
+
+def _insert_signals(rows: List[Dict[str, Any]]) -> int:
+    result = db.supabase.table('signals')\
+        .upsert(rows, on_conflict="source,account_handle,posted_at", ignore_duplicates=True)\
+        .execute()
+    return len(result.data) if result.data is not None else len(rows)
+
+
+async def ingest_source(source: Dict[str, Any], index: HandleIndex) -> Dict[str, Any]:
+    """Stream one source, inserting posts by known candidate accounts"""
+    stream = SOURCE_TYPES.get(source.get("type"))
+    if stream is None:
+        return {"source": source.get("name"), "error": f"Unknown source type: {source.get('type')}"}
+
+    name, platform = source["name"], source.get("platform")
+    since = await asyncio.to_thread(_load_watermark, source)
+    counts = {"seen": 0, "matched": 0, "unmatched": 0, "old": 0, "invalid": 0, "inserted": 0}
+    inserted_rows = PIPELINE_ROWS.labels("signals", "inserted")
+    newest = since
+    batch: List[Dict[str, Any]] = []
+
+    async def flush():
+        inserted = await asyncio.to_thread(_insert_signals, batch)
+        counts["inserted"] += inserted
+        inserted_rows.inc(inserted)
+        batch.clear()
+        report_progress(**{f"{name}_{k}": v for k, v in counts.items()})
+
+    try:
+        async for post in stream(source, since):
+            counts["seen"] += 1
+            posted_at = _parse_posted_at(post.get("posted_at"))
+            if posted_at is None or not post.get("handle"):
+                counts["invalid"] += 1
+                continue
+            if since and posted_at < since:
+                counts["old"] += 1
+                continue
+            candidate_id = index.match(post.get("platform") or platform, post["handle"])
+            if candidate_id is None:
+                counts["unmatched"] += 1
+                continue
+            counts["matched"] += 1
+            batch.append({
+                "candidate_id": candidate_id,
+                "source": name,
+                "account_handle": normalize_handle(post["handle"]),
+                "posted_at": posted_at.isoformat(),
+                "text": post.get("text"),
+                "url": post.get("url"),
+                "status": SignalStatus.NEW.value,
+            })
+            newest = posted_at if newest is None else max(newest, posted_at)
+            if len(batch) >= BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+    except Exception as e:
+        # Keep what was inserted; the watermark only moves once a source is read to the end
+        logger.error("Signal source failed", source=name, error=str(e))
+        return {"source": name, **counts, "error": str(e)}
+
+    if newest and newest != since:
+        await asyncio.to_thread(_save_watermark, source, newest)
+    return {"source": name, **counts}
+
+
+@timed(PIPELINE_SECONDS.labels("signals"))
+async def ingest_signals(sources: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Ingest the named sources (every enabled one by default) concurrently"""
+    if sources:
+        configured = {s["name"]: s for s in load_sources(enabled_only=False)}
+        unknown = [name for name in sources if name not in configured]
+        if unknown:
+            return {"error": f"Unknown signal sources: {', '.join(unknown)}"}
+        definitions = [configured[name] for name in sources]
+    else:
+        definitions = load_sources()
+    if not definitions:
+        return {"error": "No signal sources enabled in config/signal_sources.yml"}
+
+    index = await asyncio.to_thread(HandleIndex.load)
+    report_progress(phase="ingest", handles=len(index), sources=len(definitions))
+    results = await asyncio.gather(*(ingest_source(source, index) for source in definitions))
+    return {
+        "handles_indexed": len(index),
+        "sources": list(results),
+        "signals_inserted": sum(r.get("inserted", 0) for r in results),
+    }
@@ -0,0 +1,214 @@
+"""Spend statistics per jurisdiction for jurisdiction_profiles
+
+A candidate's spend for a cycle is the sum of total_disbursements over their
+filings whose period ends in that cycle (filings without a candidate count
+under their committee). Each jurisdiction's avg/median/high spend is taken over
+the candidates that spent anything in the last completed cycle.
+
+Filings are streamed page by page into compact columns, together with any of
+the cycle's filings already archived to Parquet (partitions.read_range), summed
+per (jurisdiction, spender) with one groupby, then reduced per jurisdiction with
+numpy: mean and max directly, and the exact median with np.partition, which is
+linear in the number of spenders rather than a full sort.
+
+Incremental runs read only filings updated since the last run's watermark to
+find the jurisdictions they touch, then rescan just those jurisdictions.
+Deleted filings are not seen incrementally; run with full=True to pick them up.
+"""
+import asyncio
+import time
+import uuid
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.db.client import db
+from app.db.partitions import read_range
+from app.integrations.states import load_jurisdictions
+from app.jobs.context import report_progress
+from app.models.records import RecordBatch
+from app.utils.logging import get_logger
+from app.utils.metrics import PIPELINE_ROWS, PIPELINE_SECONDS, timed
+
+logger = get_logger(__name__)
+
+WATERMARK_NAME = "jurisdiction_spend"
+FILING_COLUMNS = ["jurisdiction", "candidate_id", "committee_id", "total_disbursements"]
+UPSERT_CHUNK_SIZE = 500
+
+
+def last_completed_cycle(today: Optional[date] = None) -> int:
+    """Most recent two-year cycle that has ended"""
+    year = (today or date.today()).year
+    return year + year % 2 - 2
+
+
+def _cycle_bounds(cycle: int) -> Tuple[str, str]:
+    return f"{cycle - 1}-01-01", f"{cycle}-12-31"
+
+
+def spend_stats(values: np.ndarray) -> Tuple[float, float, float]:
+    """(mean, exact median, max) of a non-empty array"""
+    n = len(values)
+    middle = n // 2
+    if n % 2:
+        median = np.partition(values, middle)[middle]
+    else:
+        lower, upper = np.partition(values, [middle - 1, middle])[middle - 1:middle + 1]
+        median = (lower + upper) / 2
+    return float(values.mean()), float(median), float(values.max())
+
+
+# Watermark
+
+def load_watermark() -> Optional[str]:
+    result = db.supabase.table('pipeline_watermarks').select("value").eq('name', WATERMARK_NAME).limit(1).execute()
+    return result.data[0]['value'] if result.data else None
+
+
+def save_watermark(value: str):
+    db.supabase.table('pipeline_watermarks').upsert({"name": WATERMARK_NAME, "value": value},
+                                                     on_conflict="name").execute()
+
+
+def _latest_filing_update() -> Optional[str]:
+    result = db.supabase.table('filings').select("updated_at").order("updated_at", desc=True).limit(1).execute()
+    return result.data[0]['updated_at'] if result.data else None
+
+
+def touched_jurisdictions(cycle: int, since: str) -> Tuple[List[str], Optional[str]]:
+    """Jurisdictions with last-cycle filings updated after `since`, and the newest updated_at seen"""
+    start, end = _cycle_bounds(cycle)
+    batch = db.scan('filings', RecordBatch(["jurisdiction", "updated_at"], pooled_columns=["jurisdiction"]),
+                    where=lambda q: q.gt('updated_at', since).gte('period_end', start).lte('period_end', end))
+    updated = [u for u in batch.column("updated_at") if u]
+    return sorted({j for j in batch.column("jurisdiction") if j}), max(updated) if updated else None
+
+
+# Aggregation
+
+def load_spender_totals(cycle: int, jurisdictions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Total disbursements per (jurisdiction, spender) for the cycle"""
+    start, end = _cycle_bounds(cycle)
+    frame = read_range('filings', FILING_COLUMNS, start, end,
+                       isin={"jurisdiction": jurisdictions} if jurisdictions else None,
+                       uuid_columns=["candidate_id", "committee_id"], pooled_columns=["jurisdiction"])
+    if frame.empty:
+        return pd.DataFrame(columns=["jurisdiction", "spender", "spend"])
+    frame["spender"] = frame["candidate_id"].fillna(frame["committee_id"])
+    frame["spend"] = pd.to_numeric(frame["total_disbursements"], errors="coerce")
+    frame = frame.dropna(subset=["jurisdiction", "spender"])
+    totals = frame.groupby(["jurisdiction", "spender"], observed=True, as_index=False)["spend"].sum()
+    return totals[totals["spend"] > 0]
+
+
+def aggregate(totals: pd.DataFrame) -> Dict[str, Tuple[float, float, float, int]]:
+    """(mean, median, max, spenders) per jurisdiction"""
+    if totals.empty:
+        return {}
+    totals = totals.sort_values("jurisdiction")
+    names = totals["jurisdiction"].astype(str).to_numpy()
+    values = totals["spend"].to_numpy(dtype=np.float64)
+    boundaries = np.flatnonzero(names[1:] != names[:-1]) + 1
+    stats = {}
+    for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(values)]):
+        stats[names[start]] = (*spend_stats(values[start:end]), int(end - start))
+    return stats
+
+
+# Profiles
+
+def _profile_index() -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Existing profiles and configured jurisdictions, keyed by every name a filing might use"""
+    result = db.supabase.table('jurisdiction_profiles').select("jurisdiction_id, name, level, state").execute()
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for row in result.data or []:
+        profiles[row["name"].upper()] = row
+        if row["level"] == "state" and row.get("state"):
+            profiles.setdefault(row["state"].upper(), row)
+
+    configured: Dict[str, Dict[str, Any]] = {}
+    for j in load_jurisdictions(enabled_only=False):
+        entry = {"name": j["name"], "level": j["level"], "state": j["id"] if j["level"] == "state" else None}
+        configured[str(j["id"]).upper()] = entry
+        configured[j["name"].upper()] = entry
+    return profiles, configured
+
+
+def build_profile_rows(stats: Dict[str, Tuple[float, float, float, int]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """jurisdiction_profiles upserts for each aggregated jurisdiction, and jurisdictions with no profile"""
+    profiles, configured = _profile_index()
+    rows: Dict[str, Dict[str, Any]] = {}
+    unmatched = []
+    for jurisdiction, (mean, median, high, _) in stats.items():
+        key = jurisdiction.strip().upper()
+        profile = profiles.get(key)
+        if profile is None:
+            entry = configured.get(key)
+            if entry is None:
+                unmatched.append(jurisdiction)
+                continue
+            # Configured but not profiled yet: create the row, and reuse it for aliases (WA / Washington)
+            profile = profiles[key] = profiles.setdefault(entry["name"].upper(), {
+                "jurisdiction_id": str(uuid.uuid4()), **entry})
+        rows[profile["jurisdiction_id"]] = {
+            "jurisdiction_id": profile["jurisdiction_id"],
+            "name": profile["name"],
+            "level": profile["level"],
+            "state": profile.get("state"),
+            "avg_spend_last_cycle": round(mean, 2),
+            "median_spend_last_cycle": round(median, 2),
+            "high_spend_last_cycle": round(high, 2),
+        }
+    return list(rows.values()), unmatched
+
+
+def aggregate_jurisdiction_spend(full: bool = False, cycle: Optional[int] = None) -> Dict[str, Any]:
+    """Recompute spend statistics for touched jurisdictions (all of them when full)"""
+    cycle = cycle or last_completed_cycle()
+    start = time.perf_counter()
+    watermark = None if full else load_watermark()
+
+    if watermark is None:
+        jurisdictions, new_watermark = None, _latest_filing_update()
+    else:
+        jurisdictions, new_watermark = touched_jurisdictions(cycle, watermark)
+        if not jurisdictions:
+            return {"cycle": cycle, "mode": "incremental", "jurisdictions": 0, "message": "No new filings"}
+
+    totals = load_spender_totals(cycle, jurisdictions)
+    loaded = time.perf_counter()
+    stats = aggregate(totals)
+    rows, unmatched = build_profile_rows(stats)
+    computed = time.perf_counter()
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        db.supabase.table('jurisdiction_profiles').upsert(rows[i:i + UPSERT_CHUNK_SIZE]).execute()
+    PIPELINE_ROWS.labels("jurisdiction_spend", "upserted").inc(len(rows))
+    if new_watermark:
+        save_watermark(new_watermark)
+
+    if unmatched:
+        logger.warning("Filings for jurisdictions with no profile", jurisdictions=unmatched[:20])
+    return {
+        "cycle": cycle,
+        "mode": "full" if jurisdictions is None else "incremental",
+        "jurisdictions": len(stats),
+        "spenders": len(totals),
+        "profiles_updated": len(rows),
+        "unmatched_jurisdictions": unmatched,
+        "load_seconds": round(loaded - start, 3),
+        "compute_seconds": round(computed - loaded, 3),
+    }
+
+
+@timed(PIPELINE_SECONDS.labels("jurisdiction_spend"))
+async def update_jurisdiction_spend(full: bool = False, cycle: Optional[int] = None) -> Dict[str, Any]:
+    """Background-job entry point for aggregate_jurisdiction_spend"""
+    report_progress(phase="aggregate", full=full)
+    try:
+        return await asyncio.to_thread(aggregate_jurisdiction_spend, full, cycle)
+    except Exception as e:
+        logger.error("Jurisdiction spend aggregation failed", error=str(e))
+        return {"error": str(e)}
@@ -0,0 +1 @@
+"""Full-table data-quality checks"""
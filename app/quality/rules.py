@@ -0,0 +1,255 @@
+"""Vectorized data-quality rules
+
+Tables are loaded whole into pandas frames (one COPY per table over the direct
+Postgres pool, low-cardinality columns as categoricals) and every rule is a
+function from those frames to a boolean violation mask over one table, so a
+check over 500k candidates is a handful of vector operations rather than a
+Python loop per row.
+
+    report = await run_quality_checks()
+
+pandas is imported here and nowhere on the API startup path; this module is
+only loaded when a check runs.
+"""
+import asyncio
+import io
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Sequence
+
+import pandas as pd
+
+from app.db.client import db
+from app.pipelines.fec import FEC_STATES
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+VALID_STATES = frozenset(FEC_STATES)
+
+# House districts are two digits; 00 is at-large. No state has more than 52.
+HOUSE_DISTRICTS = frozenset(f"{i:02d}" for i in range(53))
+STATEWIDE_DISTRICTS = frozenset(["", "00"])
+
+# H6CA12345 (House/Senate: office, cycle digit, state, serial) or P60012345
+FEC_CANDIDATE_ID = r"(?:[HS]\d[A-Z]{2}\d{5}|P\d{8})"
+OFFICE_PREFIX = {"House": "H", "Senate": "S", "President": "P"}
+
+FIRST_FEC_CYCLE = 1976
+EXAMPLE_LIMIT = 5
+
+# Columns loaded per table; those in CATEGORICAL become pandas categoricals
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    "candidates": ["candidate_id", "full_name", "state", "office", "district", "election_cycle",
+                   "source_system", "source_candidate_ID"],
+    "committees": ["committee_id"],
+    "candidate_committees": ["candidate_id", "committee_id"],
+    "filings": ["filing_id", "candidate_id", "period_start", "period_end",
+                "total_receipts", "total_disbursements", "cash_on_hand"],
+}
+CATEGORICAL = ("state", "office", "district", "source_system")
+# COPY writes NULL as this, so empty strings and NULLs stay apart in the frames
+NULL_MARKER = r"\N"
+ID_COLUMN = {"candidates": "candidate_id", "committees": "committee_id", "filings": "filing_id"}
+
+Frames = Dict[str, pd.DataFrame]
+
+
+class Rule:
+    __slots__ = ("name", "table", "description", "needs", "check")
+
+    def __init__(self, name: str, table: str, description: str, needs: Sequence[str],
+                 check: Callable[[Frames], pd.Series]):
+        self.name = name
+        self.table = table
+        self.description = description
+        self.needs = (table, *needs)
+        self.check = check
+
+
+RULES: List[Rule] = []
+
+
+def rule(table: str, name: str, description: str, needs: Sequence[str] = ()):
+    """Register a check returning a boolean mask of violating rows in `table`
+
+    `needs` lists other tables the check reads (e.g. for orphan checks).
+    """
+    def decorator(fn: Callable[[Frames], pd.Series]):
+        RULES.append(Rule(name, table, description, needs, fn))
+        return fn
+    return decorator
+
+
+def _is_blank(series: pd.Series) -> pd.Series:
+    return series.isna() | series.str.strip().eq("")
+
+
+# Candidates
+
+@rule("candidates", "missing_full_name", "full_name is empty")
+def _missing_full_name(frames: Frames) -> pd.Series:
+    return _is_blank(frames["candidates"]["full_name"])
+
+
+@rule("candidates", "invalid_state", "state is not a USPS state, territory or US code")
+def _invalid_state(frames: Frames) -> pd.Series:
+    df = frames["candidates"]
+    presidential_without_state = df["office"].eq("President") & df["state"].isna()
+    return ~df["state"].isin(VALID_STATES) & ~presidential_without_state
+
+
+@rule("candidates", "invalid_district", "House district is not 00-52, or a Senate/President row has a district")
+def _invalid_district(frames: Frames) -> pd.Series:
+    df = frames["candidates"]
+    district = df["district"]
+    bad_house = df["office"].eq("House") & ~district.isin(HOUSE_DISTRICTS)
+    bad_statewide = df["office"].isin(["Senate", "President"]) & district.notna() & ~district.isin(STATEWIDE_DISTRICTS)
+    return bad_house | bad_statewide
+
+
+@rule("candidates", "invalid_cycle", "election_cycle is missing, odd, or outside the FEC era")
+def _invalid_cycle(frames: Frames) -> pd.Series:
+    cycle = pd.to_numeric(frames["candidates"]["election_cycle"], errors="coerce")
+    last_cycle = date.today().year + 6
+    return cycle.isna() | (cycle % 2 != 0) | (cycle < FIRST_FEC_CYCLE) | (cycle > last_cycle)
+
+
+@rule("candidates", "invalid_fec_id", "FEC-sourced row's source_candidate_ID is not an FEC candidate ID")
+def _invalid_fec_id(frames: Frames) -> pd.Series:
+    df = frames["candidates"]
+    matches = df["source_candidate_ID"].str.fullmatch(FEC_CANDIDATE_ID).fillna(False).astype(bool)
+    return df["source_system"].eq("fec") & ~matches
+
+
+@rule("candidates", "fec_id_office_mismatch", "FEC ID prefix (H/S/P) disagrees with office")
+def _fec_id_office_mismatch(frames: Frames) -> pd.Series:
+    df = frames["candidates"]
+    expected = df["office"].map(OFFICE_PREFIX).astype(object)
+    prefix = df["source_candidate_ID"].str[0]
+    return expected.notna() & prefix.notna() & expected.ne(prefix)
+
+
+@rule("candidates", "duplicate_fec_id", "source_candidate_ID appears on more than one row")
+def _duplicate_fec_id(frames: Frames) -> pd.Series:
+    fec_ids = frames["candidates"]["source_candidate_ID"]
+    return fec_ids.notna() & fec_ids.duplicated(keep=False)
+
+
+# Candidate/committee links
+
+@rule("candidate_committees", "orphaned_candidate", "candidate_id has no candidates row", needs=("candidates",))
+def _link_orphaned_candidate(frames: Frames) -> pd.Series:
+    links = frames["candidate_committees"]
+    return ~links["candidate_id"].isin(frames["candidates"]["candidate_id"])
+
+
+@rule("candidate_committees", "orphaned_committee", "committee_id has no committees row", needs=("committees",))
+def _link_orphaned_committee(frames: Frames) -> pd.Series:
+    links = frames["candidate_committees"]
+    return ~links["committee_id"].isin(frames["committees"]["committee_id"])
+
+
+# Filings
+
+@rule("filings", "orphaned_candidate", "candidate_id is set but has no candidates row", needs=("candidates",))
+def _filing_orphaned_candidate(frames: Frames) -> pd.Series:
+    filings = frames["filings"]
+    return filings["candidate_id"].notna() & ~filings["candidate_id"].isin(frames["candidates"]["candidate_id"])
+
+
+@rule("filings", "period_reversed", "period_start is after period_end")
+def _period_reversed(frames: Frames) -> pd.Series:
+    filings = frames["filings"]
+    start = pd.to_datetime(filings["period_start"], errors="coerce")
+    end = pd.to_datetime(filings["period_end"], errors="coerce")
+    return (start > end).fillna(False)
+
+
+@rule("filings", "negative_amount", "receipts, disbursements or cash on hand is negative")
+def _negative_amount(frames: Frames) -> pd.Series:
+    filings = frames["filings"]
+    mask = pd.Series(False, index=filings.index)
+    for column in ("total_receipts", "total_disbursements", "cash_on_hand"):
+        mask |= pd.to_numeric(filings[column], errors="coerce").lt(0)
+    return mask
+
+
+def _examples(table: str, frame: pd.DataFrame, mask: pd.Series) -> List[Any]:
+    rows = frame.loc[mask]
+    if table == "candidate_committees":
+        return (rows["candidate_id"].astype(str) + "/" + rows["committee_id"].astype(str)).head(EXAMPLE_LIMIT).tolist()
+    return rows[ID_COLUMN[table]].head(EXAMPLE_LIMIT).tolist()
+
+
+def _read_frame(data: bytes, columns: Sequence[str]) -> pd.DataFrame:
+    # Every value arrives as text, as it did over REST; rules coerce what they compare as numbers or dates
+    dtype = {c: "category" if c in CATEGORICAL else object for c in columns}
+    return pd.read_csv(io.BytesIO(data), dtype=dtype, keep_default_na=False, na_values=[NULL_MARKER])
+
+
+async def _load_table(conn, table: str) -> pd.DataFrame:
+    columns = TABLE_COLUMNS[table]
+    select = ", ".join(f'"{c}"::text AS "{c}"' for c in columns)
+    output = io.BytesIO()
+    await conn.copy_from_query(f"SELECT {select} FROM {table}", output=output, format="csv", header=True,
+                               null=NULL_MARKER)
+    return await asyncio.to_thread(_read_frame, output.getvalue(), columns)
+
+
+async def load_frames(tables: Sequence[str] = tuple(TABLE_COLUMNS)) -> Dict[str, Any]:
+    """Load each table into a DataFrame; a table that fails to load maps to its error"""
+    frames: Dict[str, Any] = {}
+    try:
+        pool = await db.get_pool()
+    except Exception as e:
+        logger.warning("Could not open Postgres pool for quality checks", error=str(e))
+        return {table: e for table in tables}
+    async with pool.acquire() as conn:
+        for table in tables:
+            try:
+                frames[table] = await _load_table(conn, table)
+            except Exception as e:
+                logger.warning("Could not load table for quality checks", table=table, error=str(e))
+                frames[table] = e
+    return frames
+
+
+def run_rules(frames: Dict[str, Any], rules: Sequence[Rule] = RULES) -> List[Dict[str, Any]]:
+    """Evaluate rules over loaded frames, one result per rule"""
+    results = []
+    for r in rules:
+        result: Dict[str, Any] = {"rule": r.name, "table": r.table, "description": r.description}
+        failed = [t for t in r.needs if isinstance(frames.get(t), Exception)]
+        if failed:
+            result["error"] = f"{failed[0]}: {frames[failed[0]]}"
+        else:
+            frame = frames[r.table]
+            try:
+                mask = r.check(frames)
+                result["checked"] = len(frame)
+                result["violations"] = int(mask.sum())
+                result["examples"] = _examples(r.table, frame, mask) if result["violations"] else []
+            except Exception as e:
+                logger.warning("Quality rule failed", rule=r.name, error=str(e))
+                result["error"] = str(e)
+        results.append(result)
+    return results
+
+
+async def run_quality_checks() -> Dict[str, Any]:
+    """Load candidates, committees, links and filings and run every rule"""
+    start = time.perf_counter()
+    frames = await load_frames()
+    loaded = time.perf_counter()
+    results = await asyncio.to_thread(run_rules, frames)
+    finished = time.perf_counter()
+
+    return {
+        "tables": {t: len(f) for t, f in frames.items() if isinstance(f, pd.DataFrame)},
+        "rules": results,
+        "violations_total": sum(r.get("violations", 0) for r in results),
+        "rules_failed": [f"{r['table']}.{r['rule']}" for r in results if r.get("violations") or r.get("error")],
+        "load_seconds": round(loaded - start, 3),
+        "check_seconds": round(finished - loaded, 3),
+    }
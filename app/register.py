@@ -1,13 +1,37 @@
 """Register Prefect deployments"""
-import asyncio
 from app.utils.logging import setup_logging, get_logger
 
 setup_logging()
 logger = get_logger(__name__)
 
-async def register_deployments():
-    """Register all Prefect deployments"""
-    logger.info("Ready for Prefect deployment registration")
+
+def build_deployments():
+    """Deployments for every pipeline flow, with their schedules"""
+    from app.flows.ingestion import (
+        enrichment_flow,
+        fec_backfill_flow,
+        fec_incremental_flow,
+        full_pipeline_flow,
+        jurisdictions_flow,
+    )
+
+    return [
+        fec_backfill_flow.to_deployment(name="fec-backfill"),
+        fec_incremental_flow.to_deployment(name="fec-incremental", cron="0 */6 * * *"),
+        jurisdictions_flow.to_deployment(name="jurisdictions", cron="0 3 * * *"),
+        enrichment_flow.to_deployment(name="enrichment", cron="30 */6 * * *"),
+        full_pipeline_flow.to_deployment(name="full-pipeline", cron="0 2 * * *"),
+    ]
+
+
+def register_deployments():
+    """Register all Prefect deployments and serve them from this process"""
+    from prefect import serve
+
+    deployments = build_deployments()
+    logger.info("Registering Prefect deployments", count=len(deployments))
+    serve(*deployments)
+
 
 if __name__ == "__main__":
-    asyncio.run(register_deployments())
+    register_deployments()
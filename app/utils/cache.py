@@ -0,0 +1,172 @@
+"""In-process caches for hot read paths
+
+`LRUCache` is a plain TTL + LRU map. `cached_route` builds on it for read
+endpoints whose responses are aggregates over whole tables: each route gets
+its own LRU with a TTL (overridable per route with `route_cache_ttls`), and
+concurrent misses for the same arguments share one computation, so 50
+dashboards polling at once cost one query. Routes are tagged with the tables
+they read; `invalidate(table)` (called by write routes via `invalidates` and
+by jobs when they finish) drops those routes' entries and detaches in-flight
+computations so nothing computed before the write is cached after it.
+"""
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Least-recently-used cache of at most `maxsize` entries, each kept for `ttl` seconds
+
+    Not shared across processes; expiry is the only invalidation, so `ttl`
+    bounds how stale a hit can be. Safe to use from worker threads: the lock
+    only covers the dict operations.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._hits = CACHE_REQUESTS.labels(name, "hit")
+        self._misses = CACHE_REQUESTS.labels(name, "miss")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._entries[key]
+                entry = _MISSING
+            else:
+                self._entries.move_to_end(key)
+        if entry is _MISSING:
+            self._misses.inc()
+            return default
+        self._hits.inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = self._hits.value, self._misses.value
+        return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl, "hits": hits,
+                "misses": misses, "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None}
+
+
+class RouteCache:
+    """Cached responses of one read route, with single-flight computation of misses"""
+
+    def __init__(self, name: str, ttl: float, tags: Iterable[str]):
+        self.name = name
+        self.tags = frozenset(tags)
+        self._default_ttl = ttl
+        self._cache: Optional[LRUCache] = None
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self._coalesced = CACHE_REQUESTS.labels(f"route:{name}", "coalesced")
+
+    @property
+    def cache(self) -> LRUCache:
+        # Built on first use so settings are only read once a request comes in
+        if self._cache is None:
+            ttls = settings.route_cache_ttls_map
+            self._cache = LRUCache(f"route:{self.name}", settings.route_cache_size,
+                                   ttls.get(self.name, self._default_ttl))
+        return self._cache
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        future = self._in_flight.get(key)
+        if future is None:
+            # A task, not the caller's coroutine: a disconnecting client must not cancel it for the others
+            future = asyncio.ensure_future(compute())
+            self._in_flight[key] = future
+            future.add_done_callback(functools.partial(self._done, key, self._generation))
+        else:
+            self._coalesced.inc()
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, generation: int, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if future.cancelled() or future.exception() is not None or generation != self._generation:
+            return
+        value = future.result()
+        # Routes report failures as {"error": ...}; those are retried, not cached
+        if not (isinstance(value, dict) and "error" in value):
+            self.cache.set(key, value)
+
+    def invalidate(self):
+        self._generation += 1
+        self._in_flight.clear()
+        if self._cache is not None:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "coalesced": self._coalesced.value, "in_flight": len(self._in_flight),
+                "tags": sorted(self.tags)}
+
+
+_route_caches: Dict[str, RouteCache] = {}
+
+
+def cached_route(name: str, ttl: float, tags: Iterable[str]):
+    """Cache a read route's responses per arguments for `ttl` seconds; `tags` are the tables it reads"""
+    route_cache = _route_caches[name] = RouteCache(name, ttl, tags)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return await route_cache.get(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags: str) -> List[str]:
+    """Drop cached responses of routes reading any of these tables; returns the routes invalidated"""
+    names = []
+    for route_cache in _route_caches.values():
+        if route_cache.tags & set(tags):
+            route_cache.invalidate()
+            names.append(route_cache.name)
+    return names
+
+
+def invalidates(*tags: str):
+    """Invalidate these tables' cached routes after a write route runs, even if it failed partway"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                invalidate(*tags)
+        return wrapper
+    return decorator
+
+
+def route_cache_stats() -> Dict[str, Any]:
+    return {name: route_cache.stats() for name, route_cache in _route_caches.items()}
@@ -0,0 +1,194 @@
+"""Dependency health, probed in the background and served from memory
+
+A monitor task checks Supabase, the direct Postgres pool (when one has been
+opened), the job queue backlog, shared HTTP client saturation and, less often,
+FEC API reachability. Each result is kept with its latency and time, so
+/livez, /readyz and /healthz answer without touching any dependency, however
+often an orchestrator polls them.
+
+Ready means every critical check (Supabase; Postgres once a pool exists)
+passed and the results are fresh. A stalled monitor makes results stale,
+which fails readiness, and a crashed one fails liveness.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.db.client import db
+from app.jobs.manager import job_manager
+from app.utils.http import get_http_client, http_clients
+from app.utils.logging import get_logger
+from app.utils.metrics import Gauge, registry
+
+logger = get_logger(__name__)
+
+FEC_HEALTH_URL = "https://api.open.fec.gov/v1/"
+OK, DEGRADED, DOWN = "ok", "degraded", "down"
+
+# Share of capacity in use (job queue, connection pool) at which a check reports degraded
+SATURATION = 0.9
+
+
+class CheckResult:
+    __slots__ = ("status", "critical", "latency_ms", "checked_at", "detail")
+
+    def __init__(self, status: str, critical: bool, latency_ms: float, detail: Dict[str, Any]):
+        self.status = status
+        self.critical = critical
+        self.latency_ms = latency_ms
+        self.checked_at = datetime.now(timezone.utc).isoformat()
+        self.detail = detail
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "critical": self.critical, "latency_ms": self.latency_ms,
+                "checked_at": self.checked_at, **self.detail}
+
+
+# Probes return (status, detail); raising or timing out means down
+
+def _check_supabase():
+    db.supabase.table('candidates').select("candidate_id").limit(1).execute()
+    return OK, {}
+
+
+async def check_supabase():
+    return await asyncio.to_thread(_check_supabase)
+
+
+async def check_postgres():
+    pool = db._pool
+    if pool is None:
+        return OK, {"pool": "not opened"}
+    size, idle, max_size = pool.get_size(), pool.get_idle_size(), pool.get_max_size()
+    in_use = size - idle
+    detail = {"pool_in_use": in_use, "pool_size": size, "pool_max_size": max_size}
+    if idle == 0:
+        # Acquiring would queue behind real work or open a connection just for the probe
+        return DEGRADED, {**detail, "probe": "skipped, no idle connection"}
+    async with pool.acquire() as conn:
+        await conn.fetchval("SELECT 1")
+    return (DEGRADED if in_use >= max_size * SATURATION else OK), detail
+
+
+async def check_jobs():
+    backlog, capacity = job_manager.backlog, job_manager.queue_size or settings.job_queue_size
+    status = DEGRADED if backlog >= capacity * SATURATION else OK
+    return status, {"backlog": backlog, "queue_size": capacity, "running": job_manager.running}
+
+
+async def check_http():
+    waiting = {host: s["waiting"] for host, s in http_clients.stats().items() if s["waiting"]}
+    return (DEGRADED if waiting else OK), {"waiting_by_host": waiting}
+
+
+async def check_fec():
+    # No API key: reachability only, without spending the key's request budget
+    response = await get_http_client().get(FEC_HEALTH_URL)
+    status = DOWN if response.status_code >= 500 else OK
+    return status, {"status_code": response.status_code}
+
+
+class HealthMonitor:
+    def __init__(self):
+        self.results: Dict[str, CheckResult] = {}
+        self.checked_at: Optional[float] = None
+        self.started_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._fec_checked_at = 0.0
+        # name -> (probe, critical)
+        self.checks: Dict[str, tuple] = {
+            "supabase": (check_supabase, True),
+            "postgres": (check_postgres, True),
+            "jobs": (check_jobs, False),
+            "http": (check_http, False),
+        }
+
+    async def _run(self, name: str, probe: Callable[[], Awaitable], critical: bool) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            status, detail = await asyncio.wait_for(probe(), settings.health_check_timeout)
+        except asyncio.TimeoutError:
+            status, detail = DOWN, {"error": f"timed out after {settings.health_check_timeout}s"}
+        except Exception as e:
+            status, detail = DOWN, {"error": str(e)}
+        result = CheckResult(status, critical, round((time.perf_counter() - start) * 1000, 1), detail)
+        previous = self.results.get(name)
+        if previous is not None and previous.status != status:
+            logger.warning("Dependency health changed", check=name, status=status, previous=previous.status,
+                           **detail)
+        self.results[name] = result
+        return result
+
+    async def check_once(self):
+        """Run every check concurrently; FEC only every health_fec_interval seconds"""
+        checks: List[tuple] = [(name, probe, critical) for name, (probe, critical) in self.checks.items()]
+        now = time.monotonic()
+        if now - self._fec_checked_at >= settings.health_fec_interval:
+            self._fec_checked_at = now
+            checks.append(("fec", check_fec, False))
+        await asyncio.gather(*(self._run(*check) for check in checks))
+        self.checked_at = time.monotonic()
+
+    async def _loop(self):
+        while True:
+            await self.check_once()
+            await asyncio.sleep(settings.health_check_interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="health-monitor")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # Probe answers, from memory
+
+    @property
+    def alive(self) -> bool:
+        """False once the monitor task has died, which only a restart fixes"""
+        return self._task is None or not self._task.done()
+
+    def _stale(self) -> bool:
+        return self.checked_at is None or time.monotonic() - self.checked_at > settings.health_stale_seconds
+
+    @property
+    def ready(self) -> bool:
+        if self._stale():
+            return False
+        return all(r.status != DOWN for r in self.results.values() if r.critical)
+
+    def status(self) -> str:
+        if self.checked_at is None:
+            return "starting"
+        if not self.ready:
+            return "unavailable"
+        return DEGRADED if any(r.status != OK for r in self.results.values()) else OK
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status(),
+            "ready": self.ready,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "checks": {name: result.as_dict() for name, result in self.results.items()},
+        }
+
+
+# Global instance
+health_monitor = HealthMonitor()
+
+
+def _health_metrics():
+    up = Gauge("dependency_up", "1 if the dependency's last health check passed", ("check",))
+    latency = Gauge("dependency_check_latency_ms", "Latency of the last health check", ("check",))
+    for name, result in health_monitor.results.items():
+        up.labels(name).set(0 if result.status == DOWN else 1)
+        latency.labels(name).set(result.latency_ms)
+    return [up, latency]
+
+
+registry.register_collector(_health_metrics)
@@ -0,0 +1,223 @@
+"""Shared, application-scoped HTTP client
+
+One httpx.AsyncClient is created for the process (in the FastAPI lifespan, or
+lazily on first use from the CLI and flows) so connections and TLS sessions to
+api.open.fec.gov are kept alive and reused across requests. Requests to each
+host are capped by a semaphore, and connection events are counted so reuse can
+be checked from /http-stats.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.utils.logging import get_logger
+from app.utils.metrics import (
+    Counter,
+    Gauge,
+    OUTBOUND_IN_FLIGHT,
+    OUTBOUND_REQUEST_SECONDS,
+    endpoint_label,
+    registry,
+    service_for_host,
+)
+
+logger = get_logger(__name__)
+
+
+class HostStats:
+    __slots__ = ("requests", "new_connections", "tls_handshakes", "in_flight", "waiting")
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.in_flight = 0
+        self.waiting = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else None,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that frees the host slot once the body is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport with per-host concurrency caps and connection tracing"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, per_host_limit: int, host_limits: Dict[str, int]):
+        self._transport = transport
+        self._per_host_limit = per_host_limit
+        self._host_limits = host_limits
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[str, HostStats] = defaultdict(HostStats)
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self._host_limits.get(host, self._per_host_limit))
+        return sem
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        stats = self.stats[host]
+        sem = self._semaphore(host)
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+            elif event_name == "connection.start_tls.complete":
+                stats.tls_handshakes += 1
+
+        request.extensions = {**request.extensions, "trace": trace}
+
+        service = service_for_host(host)
+        latency = OUTBOUND_REQUEST_SECONDS.labels(service, endpoint_label(request.url.path))
+        in_flight = OUTBOUND_IN_FLIGHT.labels(service)
+
+        stats.waiting += 1
+        await sem.acquire()
+        stats.waiting -= 1
+        stats.requests += 1
+        stats.in_flight += 1
+        in_flight.inc()
+        start = time.perf_counter()
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                latency.observe(time.perf_counter() - start)
+                in_flight.dec()
+                stats.in_flight -= 1
+                sem.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientManager:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[HostLimitedTransport] = None
+
+    def _build(self) -> httpx.AsyncClient:
+        http2 = settings.http2 and _http2_available()
+        if settings.http2 and not http2:
+            logger.warning("h2 is not installed, falling back to HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        self._transport = HostLimitedTransport(
+            httpx.AsyncHTTPTransport(http2=http2, limits=limits, retries=1),
+            per_host_limit=settings.http_per_host_concurrency,
+            host_limits=settings.http_host_limits_map,
+        )
+        logger.info("HTTP client created", http2=http2, max_connections=settings.http_max_connections)
+        return httpx.AsyncClient(
+            transport=self._transport,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            headers={"User-Agent": settings.scrape_user_agent},
+            follow_redirects=True,
+        )
+
+    def set_client(self, client: httpx.AsyncClient):
+        """Install a pre-built client (benchmarks replay fixtures through a mock transport)"""
+        self._client = client
+        self._transport = client._transport if isinstance(client._transport, HostLimitedTransport) else None
+
+    async def start(self) -> httpx.AsyncClient:
+        """Create the shared client; call from the application lifespan"""
+        return self.client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._transport = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request and connection reuse counters"""
+        if self._transport is None:
+            return {}
+        return {host: s.as_dict() for host, s in self._transport.stats.items()}
+
+
+# Global instance
+http_clients = HTTPClientManager()
+
+
+def _connection_metrics():
+    requests = Counter("http_client_requests_total", "Requests sent by the shared HTTP client", ("host",))
+    connections = Counter("http_client_new_connections_total", "New TCP connections opened", ("host",))
+    handshakes = Counter("http_client_tls_handshakes_total", "TLS handshakes performed", ("host",))
+    waiting = Gauge("http_client_waiting", "Requests waiting on a per-host concurrency slot", ("host",))
+    for host, stats in http_clients.stats().items():
+        requests.labels(host).inc(stats["requests"])
+        connections.labels(host).inc(stats["new_connections"])
+        handshakes.labels(host).inc(stats["tls_handshakes"])
+        waiting.labels(host).set(stats["waiting"])
+    return [requests, connections, handshakes, waiting]
+
+
+registry.register_collector(_connection_metrics)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client; also usable as a FastAPI dependency"""
+    return http_clients.client
@@ -1,35 +1,341 @@
-"""Structured logging setup"""
-import structlog
+"""Structured logging setup
+
+Events are built by structlog on the calling thread, then the event dict is
+queued as-is; a writer thread renders JSON and writes to stdout in batches. A
+burst of logging costs the event loop a few processors and a queue put per
+event rather than serialization and a blocking write, and when stdout can't
+keep up events are dropped (counted in log_events_dropped_total) instead of
+stalling the loop.
+
+Per-row events are kept cheap in two ways:
+
+- sampling: `log_sampling` rules keep a fraction (``0.01``) or a rate
+  (``5/s``) of debug/info events from a logger or one event of a logger, e.g.
+  ``app.integrations.fec_client:Making FEC API request=5/s``. Warnings and
+  errors are never sampled. The next kept event carries ``sampled_out`` with
+  the number dropped before it.
+- summaries: `LogSummary` counts occurrences and logs one aggregated event per
+  `log_summary_seconds` ("Stored FEC candidates", count=N), instead of a line
+  per row.
+
+`log_levels` sets levels per subsystem (``httpx=WARNING,app.pipelines=DEBUG``).
+"""
+import atexit
 import logging
+import queue
 import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.utils.metrics import LOG_EVENTS_DROPPED
+
+_summaries: List["LogSummary"] = []
+
+# Levels that are always logged whatever the sampling rules say
+_UNSAMPLED = {"warning", "warn", "error", "critical", "exception", "fatal"}
+
+
+def _logging_settings() -> Dict[str, Any]:
+    """Logging settings, or their defaults when the environment isn't configured yet"""
+    from app.config import Settings, get_settings
+
+    names = ("log_level", "log_levels", "log_sampling", "log_summary_seconds", "log_queue_size")
+    try:
+        configured = get_settings()
+        return {name: getattr(configured, name) for name in names}
+    except Exception:
+        return {name: Settings.model_fields[name].default for name in names}
+
+
+def parse_pairs(value: str) -> Dict[str, str]:
+    """"a=1,b=2" -> {"a": "1", "b": "2"}; keys may contain spaces and colons"""
+    pairs = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, setting = item.rsplit("=", 1)
+            pairs[key.strip()] = setting.strip()
+    return pairs
+
+
+class _Rule:
+    """Keep 1 in `every` events, or at most `per_second` events in each second"""
+
+    __slots__ = ("every", "per_second", "seen", "window", "in_window", "dropped", "lock")
+
+    def __init__(self, spec: str):
+        self.every, self.per_second = 1, None
+        if spec.endswith("/s"):
+            self.per_second = float(spec[:-2])
+        else:
+            fraction = float(spec)
+            self.every = max(round(1 / fraction), 1) if fraction > 0 else 0
+        self.seen = 0
+        self.window = 0
+        self.in_window = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def keep(self) -> Tuple[bool, int]:
+        """Whether to keep this event, and how many were dropped since the last kept one"""
+        with self.lock:
+            if self.per_second is not None:
+                window = int(time.monotonic())
+                if window != self.window:
+                    self.window, self.in_window = window, 0
+                self.in_window += 1
+                kept = self.in_window <= self.per_second
+            else:
+                self.seen += 1
+                kept = self.every > 0 and self.seen % self.every == 1 % self.every
+            if not kept:
+                self.dropped += 1
+                return False, 0
+            dropped, self.dropped = self.dropped, 0
+            return True, dropped
+
+
+class EventSampler:
+    """structlog processor applying `log_sampling` rules to debug and info events"""
+
+    def __init__(self, rules: Dict[str, str]):
+        self._rules = {}
+        for key, spec in rules.items():
+            name, _, event = key.partition(":")
+            self._rules[(name, event or None)] = _Rule(spec)
+        self._resolved: Dict[Tuple[str, Any], Optional[_Rule]] = {}
+        self._sampled = LOG_EVENTS_DROPPED.labels("sampled")
+
+    def _rule(self, name: str, event: Any) -> Optional[_Rule]:
+        key = (name, event)
+        if key not in self._resolved:
+            rule = None
+            # The most specific rule wins: this event, then this logger, then its parent packages
+            parts = name.split(".")
+            while parts and rule is None:
+                prefix = ".".join(parts)
+                rule = self._rules.get((prefix, event)) or self._rules.get((prefix, None))
+                parts.pop()
+            self._resolved[key] = rule
+        return self._resolved[key]
+
+    def __call__(self, logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._rules or method_name in _UNSAMPLED:
+            return event_dict
+        rule = self._rule(getattr(logger, "name", ""), event_dict.get("event"))
+        if rule is None:
+            return event_dict
+        kept, dropped = rule.keep()
+        if not kept:
+            self._sampled.inc()
+            raise structlog.DropEvent
+        if dropped:
+            event_dict["sampled_out"] = dropped
+        return event_dict
+
+
+class LogSummary:
+    """Counts occurrences of a per-row event and logs the count once per interval"""
+
+    def __init__(self, logger, event: str, interval: Optional[float] = None):
+        self.logger = logger
+        self.event = event
+        self.interval = interval
+        self.total = 0
+        self._count = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        _summaries.append(self)
+
+    def inc(self, n: int = 1):
+        if self.interval is None:
+            self.interval = _logging_settings()["log_summary_seconds"]
+        with self._lock:
+            self._count += n
+            self.total += n
+            due = time.monotonic() - self._started >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Log the count since the last summary, if any"""
+        with self._lock:
+            count, self._count = self._count, 0
+            now = time.monotonic()
+            elapsed, self._started = now - self._started, now
+        if count:
+            self.logger.info(self.event, count=count, total=self.total, seconds=round(elapsed, 1))
+
+
+def flush_summaries():
+    for summary in _summaries:
+        summary.flush()
+
+
+_STOP = object()
+
+
+class _Writer:
+    """Thread that renders queued events and writes them to stdout, a batch per write"""
+
+    def __init__(self, stream, size: int):
+        self.stream = stream
+        self.queue: queue.Queue = queue.Queue(size)
+        self._overflow = LOG_EVENTS_DROPPED.labels("queue_full")
+        self._render = structlog.processors.JSONRenderer()
+        self._decode = structlog.processors.UnicodeDecoder()
+        # Records from plain stdlib loggers (uvicorn, httpx, ...) get the same fields
+        self._formatter = structlog.stdlib.ProcessorFormatter(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.UnicodeDecoder(),
+                structlog.processors.JSONRenderer(),
+            ],
+            foreign_pre_chain=[
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.processors.format_exc_info,
+            ],
+        )
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, item: Any):
+        # A full queue means stdout can't keep up; drop rather than block the event loop
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self._overflow.inc()
+
+    def _line(self, item: Any) -> str:
+        if isinstance(item, logging.LogRecord):
+            return self._formatter.format(item)
+        return self._render(None, None, self._decode(None, None, item))
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in batch
+            lines = []
+            for item in batch:
+                if item is _STOP:
+                    continue
+                try:
+                    lines.append(self._line(item))
+                except Exception as e:
+                    lines.append(f'{{"event": "Unrenderable log event", "error": {str(e)!r}}}')
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            if stop:
+                return
+
+    def stop(self):
+        self.queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+
+_writer: Optional[_Writer] = None
+
+
+class _QueuedLogger:
+    """structlog logger that hands finished event dicts to the writer thread
+
+    Levels still come from the stdlib logger of the same name, so `log_levels`
+    and libraries' own logging configuration apply to both.
+    """
+
+    __slots__ = ("name", "_stdlib")
+
+    def __init__(self, name: str = "root"):
+        self.name = name
+        self._stdlib = logging.getLogger(name)
+
+    @property
+    def disabled(self) -> bool:
+        return self._stdlib.disabled
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self._stdlib.isEnabledFor(level)
+
+    def getEffectiveLevel(self) -> int:
+        return self._stdlib.getEffectiveLevel()
+
+    def _emit(self, event_dict: Dict[str, Any]):
+        if _writer is not None:
+            _writer.put(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = msg = log = _emit
+
+
+def _queued(logger, method_name: str, event_dict: Dict[str, Any]):
+    # Final processor: the event dict itself is the message, rendered on the writer thread
+    return (event_dict,), {}
+
+
+class _RecordHandler(logging.Handler):
+    """Root handler passing stdlib records to the writer thread unformatted"""
+
+    def emit(self, record: logging.LogRecord):
+        if _writer is not None:
+            _writer.put(record)
+
+
+def shutdown_logging():
+    """Log pending summaries and drain the queue"""
+    global _writer
+    flush_summaries()
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
 
 
 def setup_logging():
     """Configure structured logging"""
+    global _writer
+    config = _logging_settings()
+
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
+            EventSampler(parse_pairs(config["log_sampling"])),
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
+            # Exceptions are read here, while sys.exc_info() still refers to them
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            _queued,
         ],
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
+        logger_factory=_QueuedLogger,
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
 
     # Configure stdlib logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
-    )
+    if _writer is not None:
+        _writer.stop()
+    _writer = _Writer(sys.stdout, config["log_queue_size"])
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_RecordHandler())
+    root.setLevel(config["log_level"].upper())
+    for name, level in parse_pairs(config["log_levels"]).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str):
@@ -0,0 +1,365 @@
+"""Prometheus-style metrics
+
+A small in-process metrics registry rendered in the Prometheus text format at
+/metrics. Metrics are recorded from the event loop and from worker threads
+(pipelines run their Supabase calls, which are synchronous, in
+asyncio.to_thread). Creating a labelled child takes a lock, so two threads
+asking for the same new label values get the same child. Recording is not
+locked: an observation is a dict lookup, a bisect and a couple of additions,
+and two threads updating one child at the same instant can lose an update,
+which is an acceptable error for monitoring. Bind labels once
+(``HIST.labels(...)``) outside the hot loop and keep the child around; that is
+what keeps the per-call cost well under a microsecond.
+
+``timed`` wraps a function in a histogram child; it times pipeline runs
+(pipeline_run_seconds) and multi-request database operations
+(db_operation_seconds).
+"""
+import asyncio
+import functools
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[A-Za-z0-9_-]{6,}$")
+
+
+def _escape(value: str) -> str:
+    """Label value escaping of the text format: backslash, double quote and newline"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        """Return the child for these label values, creating it on first use"""
+        if kwargs:
+            values = tuple(str(kwargs[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._default.dec(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def samples(self):
+        # A copy: another thread may add a child while this renders
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        """Add a callable that builds metrics at scrape time (for state owned elsewhere)"""
+        self._collectors.append(collector)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = Registry()
+
+OUTBOUND_REQUEST_SECONDS = registry.histogram(
+    "outbound_request_seconds", "Outbound HTTP request latency", ("service", "endpoint"))
+OUTBOUND_IN_FLIGHT = registry.gauge(
+    "outbound_requests_in_flight", "Outbound HTTP requests in flight", ("service",))
+ROUTE_REQUEST_SECONDS = registry.histogram(
+    "http_request_seconds", "API request latency by route", ("method", "route", "status"))
+ROUTE_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "API requests being handled")
+PIPELINE_ROWS = registry.counter(
+    "pipeline_rows_total", "Rows processed by ingestion pipelines", ("pipeline", "outcome"))
+RATE_LIMIT_WAIT_SECONDS = registry.histogram(
+    "rate_limit_wait_seconds", "Time spent waiting on rate limits", ("service",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0))
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "In-process cache lookups by outcome", ("cache", "outcome"))
+LOG_EVENTS_DROPPED = registry.counter(
+    "log_events_dropped_total", "Log events not written, by reason", ("reason",))
+PUSH_EVENTS = registry.counter(
+    "push_events_total", "Outbound push events by destination and outcome", ("destination", "outcome"))
+PIPELINE_SECONDS = registry.histogram(
+    "pipeline_run_seconds", "Wall time of ingestion pipeline runs", ("pipeline",),
+    buckets=(1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 10800.0))
+DB_OPERATION_SECONDS = registry.histogram(
+    "db_operation_seconds", "Wall time of database operations spanning several requests", ("operation",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0, 300.0))
+PUSH_DELIVERY_LAG_SECONDS = registry.histogram(
+    "push_delivery_lag_seconds", "Time from a candidate change to its delivery", ("destination",),
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0))
+
+
+def service_for_host(host: str) -> str:
+    if host == "api.open.fec.gov":
+        return "fec"
+    if host.endswith(".supabase.co"):
+        return "supabase"
+    return host
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse ID-like path segments so labels stay low-cardinality"""
+    return "/".join("{id}" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/"))
+
+
+def timed(histogram_child: _HistogramChild):
+    """Decorator recording the wall time of a sync or async function"""
+    perf_counter = time.perf_counter
+    observe = histogram_child.observe
+
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    observe(perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(perf_counter() - start)
+        return wrapper
+
+    return decorator
+
+
+def instrument_sync_httpx(client, service: Optional[str] = None):
+    """Record latency for a synchronous httpx.Client (e.g. the Supabase REST session)"""
+    perf_counter = time.perf_counter
+
+    def on_request(request):
+        request.extensions["metrics_start"] = perf_counter()
+
+    def on_response(response):
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            OUTBOUND_REQUEST_SECONDS.labels(
+                service or service_for_host(response.request.url.host),
+                endpoint_label(response.request.url.path),
+            ).observe(perf_counter() - start)
+
+    client.event_hooks["request"].append(on_request)
+    client.event_hooks["response"].append(on_response)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        ROUTE_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            ROUTE_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            ROUTE_REQUEST_SECONDS.labels(scope["method"], route_path, status_code).observe(
+                time.perf_counter() - start)
@@ -0,0 +1,71 @@
+"""Shared request budgets for external APIs
+
+Every caller of an API draws from the same token bucket, so concurrent
+pipelines, jobs and collection units together stay inside the provider's
+limit instead of each pausing on its own schedule.
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.config import settings
+from app.utils.metrics import RATE_LIMIT_WAIT_SECONDS
+
+
+class RateLimiter:
+    """Async token bucket; `rate` tokens per second, bursting up to `burst`
+
+    A rate of None means unlimited (used by the offline benchmarks).
+    """
+
+    def __init__(self, rate: Optional[float], burst: float = 1.0, service: str = ""):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._wait_seconds = RATE_LIMIT_WAIT_SECONDS.labels(service or "unknown")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and take them; waiters are served in order"""
+        if self.rate is None:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        start = time.perf_counter()
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+        self._wait_seconds.observe(time.perf_counter() - start)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(service: str) -> RateLimiter:
+    """The process-wide limiter for a service, created from settings on first use"""
+    limiter = _limiters.get(service)
+    if limiter is None:
+        if service == "fec":
+            limiter = RateLimiter(settings.fec_requests_per_second, settings.fec_request_burst, service)
+        elif service.startswith("push:"):
+            # One budget per push destination, so a slow receiver never holds up another
+            limiter = RateLimiter(settings.push_requests_per_second, settings.push_request_burst, service)
+        else:
+            limiter = RateLimiter(None, service=service)
+        _limiters[service] = limiter
+    return limiter
+
+
+def set_rate_limiter(service: str, limiter: RateLimiter):
+    """Replace a service's limiter (e.g. an unlimited one for offline benchmarks)"""
+    _limiters[service] = limiter
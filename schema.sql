@@ -1,3 +1,6 @@
+-- Baseline schema (migration version 1). Change the schema by adding a numbered file to
+-- app/db/migrations rather than editing this one; `python -m app migrate` applies both.
+
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
@@ -0,0 +1,202 @@
+"""Replay FEC API responses through an httpx mock transport
+
+Responses are built from the JSON pages in fixtures/ (captured with
+scripts/bench/record_fec.py). To benchmark at sizes larger than a recorded
+page, the recorded candidate records are used as templates and cloned with
+unique IDs and names, so the payload shape stays exactly what FEC returns.
+"""
+import copy
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_CANDIDATE_COMMITTEES = re.compile(r"^/v1/candidate/([^/]+)/committees/?$")
+_FORM_DOCUMENT = re.compile(r"^/cgi-bin/forms/([^/]+)/(\d+)/?$")
+
+DOCS_HOST = "docquery.fec.gov"
+OCCUPATIONS = ["ATTORNEY", "TEACHER", "SMALL BUSINESS OWNER", "NURSE", "ENGINEER", "VETERAN", "PHYSICIAN"]
+
+STATES = ["AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA",
+          "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
+          "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT",
+          "VA", "WA", "WV", "WI", "WY"]
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+def synthesize_candidates(count: int) -> List[Dict[str, Any]]:
+    """`count` FEC candidate records cloned from the recorded page"""
+    templates = load_fixture("fec_candidates_page.json")["results"]
+    candidates = []
+    for i in range(count):
+        record = copy.deepcopy(templates[i % len(templates)])
+        state = STATES[i % len(STATES)]
+        district = f"{(i // len(STATES)) % 53 + 1:02d}"
+        last, first = record["name"].split(", ", 1)
+        # Same shape as real FEC IDs, unique for up to 100k candidates
+        record["candidate_id"] = f"H6{state}{i % 100000:05d}"
+        record["name"] = f"{last}{i}, {first}"
+        record["state"] = state
+        record["district"] = district
+        record["district_number"] = int(district)
+        candidates.append(record)
+    return candidates
+
+
+class FakeFEC:
+    """Mock transport handler serving synthesized FEC data"""
+
+    def __init__(self, candidates: List[Dict[str, Any]]):
+        self.candidates = candidates
+        self.committee_template = load_fixture("fec_candidate_committees.json")["results"][0]
+        self.calls: Counter = Counter()
+        self._filter_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _page(self, results: List[Dict[str, Any]], params: httpx.QueryParams) -> Dict[str, Any]:
+        per_page = int(params.get("per_page", 20))
+        page = int(params.get("page", 1))
+        start = (page - 1) * per_page
+        return {
+            "api_version": "1.0",
+            "pagination": {
+                "count": len(results),
+                "is_count_exact": True,
+                "page": page,
+                "pages": max(1, math.ceil(len(results) / per_page)),
+                "per_page": per_page,
+            },
+            "results": results[start:start + per_page],
+        }
+
+    def _filtered(self, params: httpx.QueryParams) -> List[Dict[str, Any]]:
+        # Searches are paged through one page at a time; filter each search once
+        key = tuple(params.get(f) for f in ("office", "party", "state", "district", "election_year"))
+        cached = self._filter_cache.get(key)
+        if cached is None:
+            cached = self._filter_cache[key] = self._filter(params)
+        return cached
+
+    def _filter(self, params: httpx.QueryParams) -> List[Dict[str, Any]]:
+        results = self.candidates
+        for field in ("office", "party", "state", "district"):
+            value = params.get(field)
+            if value:
+                results = [c for c in results if c.get(field) == value]
+        year = params.get("election_year")
+        if year:
+            results = [c for c in results if int(year) in c.get("election_years", ())]
+        return results
+
+    def _filings(self, params: httpx.QueryParams) -> List[Dict[str, Any]]:
+        # Only Form 2 documents; one per candidate, numbered after its FEC ID
+        filer = params.get("candidate_id")
+        if params.get("form_type") != "F2" or not filer:
+            return []
+        file_number = int(re.sub(r"\D", "", filer) or 0)
+        return [{"candidate_id": filer, "form_type": "F2", "file_number": file_number, "receipt_date": "2025-03-01",
+                 "html_url": f"https://{DOCS_HOST}/cgi-bin/forms/{filer}/{file_number}/"}]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        params = request.url.params
+
+        if path.rstrip("/") == "/v1/candidates":
+            self.calls["candidates"] += 1
+            return httpx.Response(200, json=self._page(self._filtered(params), params))
+
+        match = _CANDIDATE_COMMITTEES.match(path)
+        if match:
+            self.calls["candidate_committees"] += 1
+            committee = dict(self.committee_template)
+            committee["committee_id"] = "C" + match.group(1)[-8:].rjust(8, "0")
+            committee["candidate_ids"] = [match.group(1)]
+            return httpx.Response(200, json=self._page([committee], params))
+
+        if path.rstrip("/") == "/v1/filings":
+            self.calls["filings"] += 1
+            return httpx.Response(200, json=self._page(self._filings(params), params))
+
+        match = _FORM_DOCUMENT.match(path)
+        if match and request.url.host == DOCS_HOST:
+            self.calls["documents"] += 1
+            return httpx.Response(200, text=form_document(match.group(1), int(match.group(2))),
+                                  headers={"content-type": "text/html"})
+
+        if path.rstrip("/") == "/v1/committees":
+            self.calls["committees"] += 1
+            return httpx.Response(200, json=self._page([self.committee_template], params))
+
+        self.calls["other"] += 1
+        return httpx.Response(200, json=self._page([], params))
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler), timeout=30.0)
+
+
+def form_document(filer: str, file_number: int) -> str:
+    """An F2 HTML page shaped like docquery's: label and value cells among boilerplate rows"""
+    rows = "".join(f"<tr><td>LINE {i}</td><td>{'X' * (i % 7 + 3)}</td></tr>" for i in range(60))
+    return (f"<html><head><title>FEC Form 2</title></head><body><h1>STATEMENT OF CANDIDACY</h1>"
+            f"<table>{rows}<tr><td>CANDIDATE ID</td><td>{filer}</td></tr>"
+            f"<tr><td>OCCUPATION</td><td>{OCCUPATIONS[file_number % len(OCCUPATIONS)]}</td></tr>"
+            f"<tr><td>EMPLOYER:</td><td>{'SELF' if file_number % 3 == 0 else f'EMPLOYER {file_number % 97}'}</td></tr>"
+            f"{rows}</table></body></html>")
+
+
+def synthesize_efile(path: str, rows: int, committee_id: str = "C00123456"):
+    """A format 8.3 .fec file: HDR, F3 cover, then `rows` Schedule A/B itemizations (about 4:1)"""
+    fs = "\x1c"
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(fs.join(["HDR", "FEC", "8.3", "BenchSoft", "1.0", "", "0", ""]) + "\n")
+        f.write(fs.join(["F3N", committee_id, "FRIENDS OF BENCH", "1 MAIN ST", "", "SEATTLE", "WA", "98101"]) + "\n")
+        for i in range(rows):
+            date = f"2025{i % 12 + 1:02d}{i % 28 + 1:02d}"
+            if i % 5:
+                fields = ["SA11AI", committee_id, f"SA{i}", "", "", "IND", "", f"DONOR{i % 5000}", "PAT", "", "", "",
+                          f"{i} ELM ST", "", "SEATTLE", STATES[i % len(STATES)], f"{98000 + i % 1000}", "P2026", "",
+                          date, f"{(i * 37) % 2900 + 10}.00", f"{(i * 91) % 5000 + 10}.00", "", "SELF",
+                          OCCUPATIONS[i % len(OCCUPATIONS)]] + [""] * 17 + ["X" if i % 50 == 1 else ""]
+            else:
+                fields = ["SB17", committee_id, f"SB{i}", "", "", "ORG", f"VENDOR {i % 300} LLC", "", "", "", "", "",
+                          "9 PINE ST", "", "PORTLAND", "OR", "97201", "P2026", "", date, f"{(i * 13) % 9000 + 1}.50",
+                          "", "DIGITAL ADVERTISING"]
+            f.write(fs.join(fields) + "\n")
+
+
+def synthesize_seat_sources(candidates: List[Dict[str, Any]], directory: str):
+    """results.csv, presidential.csv and calendars.json covering every seat the candidates run for"""
+    seats = sorted({(c["state"], c["district"]) for c in candidates})
+    with open(os.path.join(directory, "results.csv"), "w") as f:
+        f.write("year,state,office,district,party,candidate,votes\n")
+        for i, (state, district) in enumerate(seats):
+            for year in range(2012, 2026, 2):
+                dem = 100000 + (i * 7919 + year * 31) % 90000
+                rep = 100000 + (i * 104729 + year * 17) % 90000
+                f.write(f"{year},{state},H,{district},DEM,D{i},{dem}\n")
+                f.write(f"{year},{state},H,{district},REP,R{i},{rep}\n")
+                f.write(f"{year},{state},H,{district},LIB,L{i},{(dem + rep) // 50}\n")
+    with open(os.path.join(directory, "presidential.csv"), "w") as f:
+        f.write("year,state,district,dem_votes,rep_votes\n")
+        for year in (2016, 2020, 2024):
+            for i, state in enumerate(STATES):
+                f.write(f"{year},{state},,{3000000 + i * 10000},{3000000 + (i * 7) % 50 * 20000}\n")
+            for i, (state, district) in enumerate(seats):
+                f.write(f"{year},{state},{district},{300000 + (i * 31) % 100 * 1000},{300000 + (i * 17) % 100 * 1000}\n")
+    calendars = [{"cycle": 2026, "state": state, "office": None, "primary_date": "2026-08-04",
+                  "runoff_date": None, "general_date": "2026-11-03", "source": "manual"} for state in STATES]
+    with open(os.path.join(directory, "calendars.json"), "w") as f:
+        json.dump(calendars, f)
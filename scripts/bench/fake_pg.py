@@ -0,0 +1,89 @@
+"""Stand-in for the asyncpg pool behind db.get_pool() in the COPY benchmarks
+
+COPY'd records are consumed and counted, not kept, so a benchmark's peak
+memory reflects the loader rather than the fake. copy_from_query() reads a
+plain column SELECT back out of the FakeSupabase tables as CSV. Every
+execute(), copy_records_to_table() and copy_from_query() counts as one round
+trip on the FakeSupabase.
+"""
+import re
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Iterable, Sequence
+
+from scripts.bench.fake_supabase import FakeSupabase
+
+# The column SELECTs copy_from_query() understands: "col"::type AS "col", ...
+_SELECT = re.compile(r"^SELECT (.+) FROM (\w+)$", re.S)
+_COLUMN = re.compile(r'^"?([^"]+)"?(?:::\w+)?(?: AS "?[^"]+"?)?$')
+
+
+class FakeConnection:
+    def __init__(self, client: FakeSupabase):
+        self._client = client
+        self.copied_rows: Counter = Counter()
+        self.statements: Counter = Counter()
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query: str, *args: Any) -> str:
+        self._client.round_trips += 1
+        self.statements[query.split(None, 1)[0].upper()] += 1
+        return "OK"
+
+    async def fetchval(self, query: str, *args: Any) -> Any:
+        self._client.round_trips += 1
+        return 1
+
+    async def copy_records_to_table(self, table: str, records: Iterable[Sequence[Any]],
+                                    columns: Sequence[str]) -> str:
+        self._client.round_trips += 1
+        count = 0
+        for record in records:
+            if len(record) != len(columns):
+                raise ValueError(f"record has {len(record)} values for {len(columns)} columns")
+            count += 1
+        self.copied_rows[table] += count
+        return f"COPY {count}"
+
+    async def copy_from_query(self, query: str, *args: Any, output, format: str = "csv", header: bool = False,
+                              null: str = "") -> str:
+        """CSV of `SELECT col, ... FROM table`; values are quoted, NULLs written as `null` unquoted"""
+        self._client.round_trips += 1
+        match = _SELECT.match(query.strip())
+        if match is None or format != "csv":
+            raise ValueError(f"unsupported COPY query: {query}")
+        columns = [_COLUMN.match(c.strip()).group(1) for c in match.group(1).split(",")]
+        self._client.table(match.group(2))  # raises like PostgREST for a missing table
+        rows = self._client.tables[match.group(2)].rows.values()
+
+        def cell(value: Any) -> str:
+            return null if value is None else '"' + str(value).replace('"', '""') + '"'
+
+        lines = [",".join(columns)] if header else []
+        lines += [",".join(cell(row.get(c)) for c in columns) for row in rows]
+        output.write(("\n".join(lines) + "\n").encode())
+        return f"COPY {len(rows)}"
+
+
+class FakePool:
+    def __init__(self, client: FakeSupabase):
+        self.connection = FakeConnection(client)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+    def get_size(self) -> int:
+        return 1
+
+    def get_idle_size(self) -> int:
+        return 1
+
+    def get_max_size(self) -> int:
+        return 5
+
+    async def close(self):
+        pass
@@ -0,0 +1,523 @@
+"""In-memory stand-in for the Supabase client
+
+Implements the subset of the supabase-py/postgrest query builder the app uses
+(select/insert/upsert/update/delete, eq/neq/is_/not_/in_/gt/gte/lt/lte, or_,
+order/range/limit, count='exact', rpc) over plain dicts. Every execute() is
+counted as one database round trip.
+"""
+import bisect
+import copy
+import re
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Synthetic primary key for tables keyed on several columns (e.g. candidate_committees)
+ROWID = "_rowid"
+
+
+class FakeAPIError(Exception):
+    """Mirrors postgrest.exceptions.APIError: a message and the Postgres SQLSTATE as code"""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeTable:
+    def __init__(self, name: str, primary_key: str, unique: Sequence[Tuple[str, ...]] = (), serial: bool = False):
+        self.name = name
+        self.primary_key = primary_key
+        self.serial = serial
+        self._next_serial = 1
+        self.unique = [tuple(u) for u in unique]
+        self.rows: Dict[Any, Dict[str, Any]] = {}
+        self._unique_index: Dict[Tuple[str, ...], Dict[Tuple, Any]] = {u: {} for u in self.unique}
+        self.version = 0
+        self._order_cache: Dict[Tuple, List[Any]] = {}
+
+    def _key(self, cols: Tuple[str, ...], row: Dict[str, Any]) -> Optional[Tuple]:
+        values = tuple(row.get(c) for c in cols)
+        return None if any(v is None for v in values) else values
+
+    def load(self, rows: List[Dict[str, Any]], enforce_unique: bool = True):
+        """Bulk-load seed rows without counting round trips"""
+        for row in rows:
+            self._insert(dict(row), enforce_unique=enforce_unique)
+
+    @staticmethod
+    def _touch(row: Dict[str, Any]):
+        # The update_<table>_updated_at triggers of schema.sql and the migrations
+        if "updated_at" in row:
+            row["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+    def _insert(self, row: Dict[str, Any], enforce_unique: bool = True) -> Dict[str, Any]:
+        if self.primary_key not in row or row[self.primary_key] is None:
+            if self.serial:
+                row[self.primary_key] = self._next_serial
+            else:
+                row[self.primary_key] = str(uuid.uuid4())
+        if self.serial:
+            self._next_serial = max(self._next_serial, row[self.primary_key] + 1)
+        now = datetime.now(timezone.utc).isoformat()
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+
+        if row[self.primary_key] in self.rows:
+            raise FakeAPIError(f"duplicate key value violates unique constraint \"{self.name}_pkey\"", "23505")
+        for cols in self.unique:
+            key = self._key(cols, row)
+            if key is None:
+                continue
+            if enforce_unique and key in self._unique_index[cols]:
+                raise FakeAPIError(f"duplicate key value violates unique constraint on {cols}", "23505")
+            self._unique_index[cols].setdefault(key, row[self.primary_key])
+
+        self.rows[row[self.primary_key]] = row
+        self.version += 1
+        return row
+
+    def _reindex(self, pk: Any, old: Dict[str, Any], new: Dict[str, Any]):
+        for cols in self.unique:
+            old_key, new_key = self._key(cols, old), self._key(cols, new)
+            if old_key != new_key:
+                if old_key is not None and self._unique_index[cols].get(old_key) == pk:
+                    del self._unique_index[cols][old_key]
+                if new_key is not None:
+                    if new_key in self._unique_index[cols]:
+                        raise FakeAPIError(f"duplicate key value violates unique constraint on {cols}", "23505")
+                    self._unique_index[cols][new_key] = pk
+
+    def _delete(self, pk: Any):
+        row = self.rows.pop(pk)
+        for cols in self.unique:
+            key = self._key(cols, row)
+            if key is not None and self._unique_index[cols].get(key) == pk:
+                del self._unique_index[cols][key]
+        self.version += 1
+
+    def ordered_keys(self, order: Sequence[Tuple[str, bool]]) -> List[Any]:
+        cache_key = (tuple(order), self.version)
+        keys = self._order_cache.get(cache_key)
+        if keys is None:
+            self._order_cache.clear()
+            keys = list(self.rows)
+            # Stable sorts from the last key to the first give the multi-column order
+            for column, desc in reversed(order):
+                keys.sort(key=lambda pk: (self.rows[pk].get(column) is None, self.rows[pk].get(column) or ""),
+                          reverse=desc)
+            self._order_cache[cache_key] = keys
+        return keys
+
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+}
+
+
+def _split_top_level(expr: str) -> List[str]:
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append("".join(current))
+    return parts
+
+
+def _parse_logic(expr: str) -> Callable[[Dict[str, Any]], bool]:
+    """Predicate for a PostgREST or=/and= expression such as `a.lt.1,and(a.eq.1,b.lt."x")`"""
+    if expr.startswith(("and(", "or(")):
+        combine = all if expr.startswith("and(") else any
+        inner = [_parse_logic(p) for p in _split_top_level(expr[expr.index("(") + 1:-1])]
+        return lambda row: combine(p(row) for p in inner)
+    column, op, value = expr.split(".", 2)
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+    compare = _COMPARISONS[op]
+    return lambda row: compare(row.get(column), value)
+
+
+def _matches_is(value: Any, expected: str) -> bool:
+    if expected == "null":
+        return value is None
+    if expected == "true":
+        return value is True
+    if expected == "false":
+        return value is False
+    return False
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: FakeTable):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._pk_eq: Optional[Any] = None
+        self._pk_in: Optional[set] = None
+        self._order: List[Tuple[str, bool]] = []
+        self._range: Optional[Tuple[int, int]] = None
+        self._limit: Optional[int] = None
+        self._negate_next = False
+
+    # Operations
+
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self._op = "select"
+        cols = [c.strip() for c in columns.split(",")]
+        self._columns = None if cols == ["*"] else cols
+        self._count = count
+        return self
+
+    def insert(self, payload, **kwargs):
+        self._op = "insert"
+        self._payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict: Optional[str] = None, ignore_duplicates: bool = False, **kwargs):
+        self._op = "upsert"
+        self._payload = payload
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs):
+        self._op = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # Filters
+
+    @property
+    def not_(self):
+        self._negate_next = True
+        return self
+
+    def _add(self, predicate: Callable[[Dict[str, Any]], bool]):
+        if self._negate_next:
+            self._negate_next = False
+            self._filters.append(lambda row: not predicate(row))
+        else:
+            self._filters.append(predicate)
+        return self
+
+    def eq(self, column: str, value: Any):
+        if column == self._table.primary_key and not self._negate_next:
+            self._pk_eq = value
+        return self._add(lambda row: row.get(column) == value)
+
+    def neq(self, column: str, value: Any):
+        return self._add(lambda row: row.get(column) != value)
+
+    def is_(self, column: str, value: str):
+        return self._add(lambda row: _matches_is(row.get(column), value))
+
+    def or_(self, filters: str, **kwargs):
+        inner = [_parse_logic(p) for p in _split_top_level(filters)]
+        return self._add(lambda row: any(p(row) for p in inner))
+
+    def in_(self, column: str, values: Sequence[Any]):
+        values = set(values)
+        if column == self._table.primary_key and not self._negate_next:
+            self._pk_in = values
+        return self._add(lambda row: row.get(column) in values)
+
+    def gt(self, column: str, value: Any):
+        return self._add(lambda row: row.get(column) is not None and row.get(column) > value)
+
+    def gte(self, column: str, value: Any):
+        return self._add(lambda row: row.get(column) is not None and row.get(column) >= value)
+
+    def lt(self, column: str, value: Any):
+        return self._add(lambda row: row.get(column) is not None and row.get(column) < value)
+
+    def lte(self, column: str, value: Any):
+        return self._add(lambda row: row.get(column) is not None and row.get(column) <= value)
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, **kwargs):
+        self._order.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    # Execution
+
+    def _candidate_keys(self) -> List[Any]:
+        table = self._table
+        if self._pk_eq is not None:
+            return [self._pk_eq] if self._pk_eq in table.rows else []
+        if self._pk_in is not None and not self._order:
+            return [pk for pk in self._pk_in if pk in table.rows]
+        if self._order:
+            return table.ordered_keys(self._order)
+        return list(table.rows)
+
+    def _matching(self) -> List[Dict[str, Any]]:
+        rows = self._table.rows
+        out = []
+        # A plain limited select can stop at the limit, like an index scan would
+        stop = self._limit if self._limit is not None and self._range is None and self._count is None \
+            and self._op == "select" else None
+        keys = self._candidate_keys()
+        if not self._filters and self._range is not None and self._count is None and self._op == "select":
+            # An unfiltered page is read straight from the index, so offset paging isn't quadratic here
+            start, end = self._range
+            self._range = (0, end - start)
+            keys = keys[start:end + 1]
+        for pk in keys:
+            row = rows[pk]
+            if all(f(row) for f in self._filters):
+                out.append(row)
+                if stop is not None and len(out) >= stop:
+                    break
+        return out
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self._columns is None:
+            return {k: v for k, v in row.items() if k != ROWID}
+        return {c: row.get(c) for c in self._columns if c != "count"}
+
+    def execute(self) -> FakeResponse:
+        self._client.round_trips += 1
+        table = self._table
+
+        if self._op in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            stored = []
+            for item in payload:
+                row = copy.copy(item)
+                if self._op == "upsert":
+                    existing = self._find_conflict(row)
+                    if existing is not None and self._ignore_duplicates:
+                        continue
+                    if existing is not None:
+                        old = dict(table.rows[existing])
+                        table.rows[existing].update(row)
+                        table._touch(table.rows[existing])
+                        table._reindex(existing, old, table.rows[existing])
+                        table.version += 1
+                        stored.append(dict(table.rows[existing]))
+                        continue
+                stored.append(dict(table._insert(row)))
+            return FakeResponse(stored)
+
+        matched = self._matching()
+
+        if self._op == "update":
+            for row in matched:
+                old = dict(row)
+                row.update(self._payload)
+                table._touch(row)
+                table._reindex(row[table.primary_key], old, row)
+            table.version += 1
+            return FakeResponse([dict(r) for r in matched])
+
+        if self._op == "delete":
+            for row in matched:
+                table._delete(row[table.primary_key])
+            return FakeResponse([dict(r) for r in matched])
+
+        count = len(matched) if self._count == "exact" else None
+        if self._range is not None:
+            matched = matched[self._range[0]:self._range[1] + 1]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        if self._columns == ["count"]:
+            return FakeResponse([], count)
+        return FakeResponse([self._project(r) for r in matched], count)
+
+    def _find_conflict(self, row: Dict[str, Any]) -> Optional[Any]:
+        table = self._table
+        if self._on_conflict:
+            cols = tuple(c.strip() for c in self._on_conflict.split(","))
+            if cols == (table.primary_key,):
+                pk = row.get(table.primary_key)
+                return pk if pk in table.rows else None
+            key = table._key(cols, row)
+            if cols in table._unique_index:
+                return table._unique_index[cols].get(key)
+            for pk, existing in table.rows.items():
+                if table._key(cols, existing) == key:
+                    return pk
+            return None
+        pk = row.get(table.primary_key)
+        return pk if pk in table.rows else None
+
+
+class FakeRPC:
+    def __init__(self, client: "FakeSupabase", fn: Callable[..., List[Dict[str, Any]]], params: Dict[str, Any]):
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> FakeResponse:
+        self._client.round_trips += 1
+        return FakeResponse(self._fn(**self._params))
+
+
+class FakeSupabase:
+    """Drop-in for supabase.Client in benchmarks"""
+
+    def __init__(self):
+        self.tables: Dict[str, FakeTable] = {}
+        self.functions: Dict[str, Callable[..., List[Dict[str, Any]]]] = {}
+        self.round_trips = 0
+
+    def create_table(self, name: str, primary_key: str, unique: Sequence[Tuple[str, ...]] = (),
+                     serial: bool = False) -> FakeTable:
+        self.tables[name] = FakeTable(name, primary_key, unique, serial)
+        return self.tables[name]
+
+    def table(self, name: str) -> FakeQuery:
+        if name not in self.tables:
+            raise FakeAPIError(f"relation \"{name}\" does not exist", "42P01")
+        return FakeQuery(self, self.tables[name])
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        if fn not in self.functions:
+            raise FakeAPIError(f"function {fn} does not exist", "42883")
+        return FakeRPC(self, self.functions[fn], params or {})
+
+
+def _trigrams(text: str) -> set:
+    grams = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FakeSearch:
+    """search_entities (migration 0011) over the fake's candidates and media_mentions
+
+    Keeps word and trigram postings per table version, standing in for the
+    GIN indexes, so a query costs about what an index lookup would.
+    """
+
+    SIMILARITY_THRESHOLD = 0.3
+
+    def __init__(self, client: FakeSupabase):
+        self._client = client
+        self._indexes: Dict[str, Tuple[int, Any]] = {}
+
+    def _index(self, table_name: str, document: Callable[[Dict[str, Any]], str], names: bool):
+        table = self._client.tables[table_name]
+        cached = self._indexes.get(table_name)
+        if cached and cached[0] == table.version:
+            return cached[1]
+        words, grams, name_grams = [], {}, {}
+        for pk, row in table.rows.items():
+            words += [(w, pk) for w in set(re.findall(r"\w+", document(row).lower()))]
+            if names:
+                name_grams[pk] = _trigrams(f"{row.get('full_name') or ''} {row.get('preferred_name') or ''}")
+                for gram in name_grams[pk]:
+                    grams.setdefault(gram, []).append(pk)
+        words.sort()
+        index = ([w for w, _ in words], [pk for _, pk in words], grams, name_grams)
+        self._indexes[table_name] = (table.version, index)
+        return index
+
+    @staticmethod
+    def _prefix_matches(index, prefix_query: str) -> set:
+        keys, pks = index[0], index[1]
+        matched = None
+        for term in (t.strip().rstrip(":*") for t in prefix_query.split("&")):
+            lo = bisect.bisect_left(keys, term)
+            hi = bisect.bisect_left(keys, term + "\uffff")
+            found = set(pks[lo:hi])
+            matched = found if matched is None else matched & found
+        return matched or set()
+
+    def __call__(self, search_text: str, prefix_query: str, max_results: int = 10,
+                 include_mentions: bool = True) -> List[Dict[str, Any]]:
+        candidates = self._client.tables["candidates"].rows
+        index = self._index("candidates", lambda r: " ".join(
+            str(r.get(c) or "") for c in ("full_name", "preferred_name", "office", "state", "bio_summary")), True)
+        scores = {pk: 0.5 for pk in self._prefix_matches(index, prefix_query)}
+        query_grams = _trigrams(search_text)
+        shared = Counter(pk for gram in query_grams for pk in index[2].get(gram, ()))
+        for pk, count in shared.items():
+            similarity = count / (len(query_grams) + len(index[3][pk]) - count)
+            if similarity >= self.SIMILARITY_THRESHOLD:
+                scores[pk] = max(scores.get(pk, 0.0), similarity)
+        results = [{"kind": "candidate", "id": pk, "candidate_id": pk, "title": candidates[pk].get("full_name"),
+                    "detail": ", ".join(filter(None, (candidates[pk].get("office"), candidates[pk].get("state")))),
+                    "score": score} for pk, score in scores.items()]
+
+        if include_mentions:
+            mentions = self._client.tables["media_mentions"].rows
+            mention_index = self._index("media_mentions", lambda r: f"{r.get('title') or ''} {r.get('snippet') or ''}",
+                                        False)
+            results += [{"kind": "mention", "id": pk, "candidate_id": mentions[pk].get("candidate_id"),
+                         "title": mentions[pk].get("title"), "detail": mentions[pk].get("publisher"), "score": 0.4}
+                        for pk in self._prefix_matches(mention_index, prefix_query)]
+        results.sort(key=lambda r: -r["score"])
+        return results[:max_results]
+
+
+def build_fake_database() -> FakeSupabase:
+    """A FakeSupabase with the tables of schema.sql and the migrations"""
+    fake = FakeSupabase()
+    fake.create_table("candidates", "candidate_id", unique=[("source_candidate_ID",)])
+    fake.create_table("committees", "committee_id", unique=[("fec_committee_id",)])
+    fake.create_table("candidate_committees", ROWID, unique=[("candidate_id", "committee_id")])
+    fake.create_table("filings", "filing_id")
+    fake.create_table("social_profiles", "profile_id")
+    fake.create_table("media_mentions", "mention_id")
+    fake.create_table("seat_profiles", "seat_id")
+    fake.create_table("signals", "signal_id", unique=[("source", "account_handle", "posted_at")])
+    fake.create_table("jurisdiction_profiles", "jurisdiction_id")
+    fake.create_table("jobs", "job_id")
+    fake.create_table("collection_checkpoints", ROWID, unique=[("run_id", "unit_key")])
+    fake.create_table("candidate_changes", "seq", serial=True)
+    fake.create_table("push_outbox", "outbox_id", unique=[("destination", "candidate_id", "last_seq")], serial=True)
+    fake.create_table("push_cursors", "name")
+    fake.create_table("pipeline_watermarks", "name")
+    fake.create_table("fec_documents", "document_url")
+    fake.create_table("archived_partitions", "partition_name")
+    fake.functions["search_entities"] = FakeSearch(fake)
+    # candidate_changes_horizon (migration 0016): writes here commit as they happen, so nothing is ever in flight
+    changes = fake.tables["candidate_changes"]
+    fake.functions["candidate_changes_horizon"] = lambda pending_xids=(): [
+        {"last_seq": changes._next_serial - 1, "in_flight": [], "pending_done": True}]
+    return fake
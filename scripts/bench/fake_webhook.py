@@ -0,0 +1,31 @@
+"""Local webhook receiver for the push benchmarks
+
+Mounted next to FakeFEC on the mock transport; accepts batched push payloads
+for any host other than api.open.fec.gov and records what arrived.
+"""
+import json
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+
+
+class WebhookSink:
+    def __init__(self, fail_every: int = 0):
+        self.requests: Counter = Counter()
+        self.events: Dict[str, List[Dict[str, Any]]] = {}
+        # Reject every Nth request with a 503 to exercise retries
+        self.fail_every = fail_every
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        destination = request.url.path.strip("/") or request.url.host
+        self.requests[destination] += 1
+        if self.fail_every and self.requests[destination] % self.fail_every == 0:
+            return httpx.Response(503)
+        body = json.loads(request.content)
+        self.events.setdefault(destination, []).extend(body["events"])
+        return httpx.Response(200, json={"received": len(body["events"])})
@@ -0,0 +1,86 @@
+"""Import-time budget for API cold start and CLI invocation
+
+Each entry point is started in a fresh interpreter under `python -X importtime`
+with an empty environment (no .env credentials), and the total import time is
+checked against a fixed budget. Heavy optional dependencies must also stay off
+these paths; they belong to the subsystems that use them.
+
+    python -m scripts.bench.importtime
+"""
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# name -> (python args, budget in seconds)
+TARGETS: Dict[str, Tuple[List[str], float]] = {
+    "api": (["-c", "import app.main"], 1.0),
+    "cli": (["-m", "app", "--help"], 0.3),
+}
+
+# Imported lazily by the code that needs them, never at startup
+DEFERRED_MODULES = ("supabase", "asyncpg", "prefect", "pandas", "numpy", "playwright", "lxml", "bs4")
+
+RUNS = 3
+
+
+def _clean_env() -> Dict[str, str]:
+    env = {k: os.environ[k] for k in ("PATH", "HOME", "LANG") if k in os.environ}
+    env["PYTHONPATH"] = REPO_ROOT
+    return env
+
+
+def profile(args: List[str]) -> Tuple[float, Dict[str, int]]:
+    """Total import seconds and per-module cumulative microseconds for one run"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=REPO_ROOT, env=_clean_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"{' '.join(args)} exited {proc.returncode}:\n{tail}")
+
+    modules: Dict[str, int] = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)  # top-level import; nested ones are included in it
+    return total_us / 1e6, modules
+
+
+def check(target: str) -> Tuple[float, float, List[str]]:
+    """(best total seconds, budget, problems) over a few runs of `target`"""
+    args, budget = TARGETS[target]
+    best, modules = min((profile(args) for _ in range(RUNS)), key=lambda r: r[0])
+    problems = []
+    if best > budget:
+        top_level = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        heaviest = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in top_level)
+        problems.append(f"{best:.3f}s > {budget}s budget (heaviest: {heaviest})")
+    loaded = sorted({m for m in modules for d in DEFERRED_MODULES if m == d or m.startswith(d + ".")})
+    if loaded:
+        problems.append("imports deferred modules: " + ", ".join(m for m in loaded if "." not in m))
+    return best, budget, problems
+
+
+def main() -> int:
+    failures = 0
+    print(f"{'entry point':<20}{'import s':>10}{'budget s':>10}  verdict")
+    for target in TARGETS:
+        best, budget, problems = check(target)
+        verdict = "REGRESSION: " + "; ".join(problems) if problems else "ok"
+        failures += bool(problems)
+        print(f"{target:<20}{best:>10.3f}{budget:>10.2f}  {verdict}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
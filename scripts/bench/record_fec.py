@@ -0,0 +1,38 @@
+"""Record live FEC responses into the benchmark fixtures
+
+    FEC_API_KEY=... python -m scripts.bench.record_fec
+"""
+import asyncio
+import json
+import os
+
+import httpx
+
+from scripts.bench.fake_fec import FIXTURES_DIR
+
+FEC_BASE_URL = "https://api.open.fec.gov/v1"
+
+
+async def record():
+    api_key = os.environ["FEC_API_KEY"]
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(f"{FEC_BASE_URL}/candidates/", params={
+            "api_key": api_key, "election_year": 2026, "office": "H", "party": "DEM",
+            "per_page": 100, "page": 1, "sort": "name",
+        })
+        response.raise_for_status()
+        page = response.json()
+        with open(os.path.join(FIXTURES_DIR, "fec_candidates_page.json"), "w") as f:
+            json.dump(page, f, indent=2)
+
+        fec_id = page["results"][0]["candidate_id"]
+        response = await client.get(f"{FEC_BASE_URL}/candidate/{fec_id}/committees/", params={"api_key": api_key})
+        response.raise_for_status()
+        with open(os.path.join(FIXTURES_DIR, "fec_candidate_committees.json"), "w") as f:
+            json.dump(response.json(), f, indent=2)
+
+    print(f"Recorded {len(page['results'])} candidates into {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    asyncio.run(record())
@@ -0,0 +1,555 @@
+"""Offline benchmark runner
+
+Replays FEC fixtures through an httpx mock transport and runs the pipelines
+and stats routes against the in-memory FakeSupabase, so nothing touches live
+FEC or Supabase; push deliveries go to a local webhook sink on the same
+transport, and COPY loads to a counting stand-in for the asyncpg pool. Each scenario is measured for wall time, outbound API calls,
+database round trips and peak Python memory, then compared with baseline.json.
+
+    python -m scripts.bench.run                          # everything
+    python -m scripts.bench.run --sizes 1000 --scenarios dedup,stats
+    python -m scripts.bench.run --update-baseline        # accept current numbers
+
+After the scenarios, API and CLI import times are checked against the budgets
+in scripts/bench/importtime.py (skip with --skip-importtime). Exits non-zero if
+any scenario regresses past the tolerances below or an entry point is over budget.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+# The app reads these at import time; the benchmark never talks to them
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench.bench.bench")
+os.environ.setdefault("DATABASE_PASSWORD", "bench")
+os.environ.setdefault("FEC_API_KEY", "bench")
+
+from scripts.bench.fake_fec import DOCS_HOST, FakeFEC, synthesize_candidates  # noqa: E402
+from scripts.bench.fake_pg import FakePool  # noqa: E402
+from scripts.bench.fake_supabase import FakeSupabase, build_fake_database  # noqa: E402
+from scripts.bench.fake_webhook import WebhookSink  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+FEC_HOST = "api.open.fec.gov"
+PUSH_DESTINATIONS = {"zapier": "http://webhooks.bench/zapier", "crm": "http://webhooks.bench/crm"}
+
+# A run regresses if it is this much worse than baseline. Wall time also gets
+# an absolute allowance so sub-second scenarios don't flap on noisy machines.
+WALL_TIME_TOLERANCE = 0.25
+WALL_TIME_SLACK_SECONDS = 0.05
+MEMORY_TOLERANCE = 0.25
+
+
+class BenchContext:
+    def __init__(self, size: int):
+        self.size = size
+        self.fec = FakeFEC(synthesize_candidates(size))
+        self.db: FakeSupabase = build_fake_database()
+        self.webhooks = WebhookSink()
+        self.pg = FakePool(self.db)
+        self.landing_dir = tempfile.TemporaryDirectory()
+
+    def route(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host in (FEC_HOST, DOCS_HOST):
+            return self.fec.handler(request)
+        return self.webhooks.handler(request)
+
+    @property
+    def api_calls(self) -> int:
+        return self.fec.total_calls + self.webhooks.total_requests
+
+    def seed_candidates(self, fraction: float = 1.0, duplicate_fraction: float = 0.0, **overrides):
+        """Load the first `fraction` of FEC candidates into the candidates table"""
+        from app.pipelines.fec import build_candidate_record
+
+        keep = int(len(self.fec.candidates) * fraction)
+        rows = []
+        for i, candidate in enumerate(self.fec.candidates[:keep]):
+            row = build_candidate_record(candidate)
+            row["created_at"] = f"2025-01-01T00:00:{i % 60:02d}.{i:06d}+00:00"
+            row.setdefault("committee_id", None)
+            row.setdefault("occupation", None)
+            row.update(overrides)
+            rows.append(row)
+        dupes = [dict(r, created_at="2025-06-01T00:00:00+00:00") for r in rows[:int(len(rows) * duplicate_fraction)]]
+        self.db.tables["candidates"].load(rows + dupes, enforce_unique=not dupes)
+
+
+def install(ctx: BenchContext):
+    """Point the app at the fakes"""
+    # Import cost is not part of any scenario (importtime.py budgets it separately)
+    import app.api.routes  # noqa: F401
+    import app.quality.rules  # noqa: F401
+    from app.config import get_settings
+    from app.db.client import db
+    from app.utils.http import http_clients
+    from app.utils.ratelimit import RateLimiter, set_rate_limiter
+
+    get_settings().landing_dir = ctx.landing_dir.name
+    db.supabase = ctx.db
+    db._pool = ctx.pg
+    http_clients.set_client(httpx.AsyncClient(transport=httpx.MockTransport(ctx.route), timeout=30.0))
+    # Request budgets are policy, not cost
+    set_rate_limiter("fec", RateLimiter(None, service="fec"))
+    for destination in PUSH_DESTINATIONS:
+        set_rate_limiter(f"push:{destination}", RateLimiter(None, service=f"push:{destination}"))
+
+
+# Scenarios: (setup, run). Setup is not measured.
+
+def _setup_backfill(ctx: BenchContext):
+    pass
+
+
+async def _run_backfill(ctx: BenchContext):
+    from app.integrations.fec_client import FECClient
+    async with FECClient() as client:
+        await client.backfill_cycle(2026)
+
+
+def _setup_fill_gaps(ctx: BenchContext):
+    ctx.seed_candidates(fraction=0.9)
+
+
+async def _run_fill_gaps(ctx: BenchContext):
+    from app.pipelines import fec_collection
+    await fec_collection.collect_candidates(resume=False)
+
+
+def _setup_dedup(ctx: BenchContext):
+    ctx.seed_candidates(duplicate_fraction=0.05)
+
+
+async def _run_dedup(ctx: BenchContext):
+    from app.pipelines import fec as fec_pipeline
+    await fec_pipeline.remove_duplicates()
+
+
+def _setup_enrichment(ctx: BenchContext):
+    ctx.seed_candidates()
+
+
+async def _run_enrichment(ctx: BenchContext):
+    from app.pipelines import fec as fec_pipeline
+    await fec_pipeline.enrich_committee_ids()
+
+
+def _setup_stats(ctx: BenchContext):
+    ctx.seed_candidates()
+
+
+async def _run_stats(ctx: BenchContext):
+    from app.api import routes
+    await routes.count_and_check_duplicates()
+    await routes.verify_data()
+    await routes.get_candidates()
+    await routes.enrichment_status()
+
+
+def _setup_push(ctx: BenchContext):
+    # A backfill's inserts, each followed shortly by an enrichment update
+    ctx.seed_candidates()
+    ids = list(ctx.db.tables["candidates"].rows)
+    changes = []
+    for start in range(0, len(ids), 100):
+        block = ids[start:start + 100]
+        changes += [{"candidate_id": c, "op": "I", "changed": {"full_name": "x"}} for c in block]
+        changes += [{"candidate_id": c, "op": "U", "changed": {"committee_id": "C00000001"}} for c in block]
+    for seq, change in enumerate(changes, 1):
+        change.update(seq=seq, changed_at="2025-01-01T00:00:00+00:00")
+    ctx.db.tables["candidate_changes"].load(changes)
+    ctx.db.tables["push_cursors"].load([{"name": "candidate_changes", "seq": 0}])
+
+
+async def _run_push(ctx: BenchContext):
+    from app.integrations.push import push_dispatcher
+    await push_dispatcher.flush(PUSH_DESTINATIONS)
+
+
+def _setup_seats(ctx: BenchContext):
+    from app.config import get_settings
+    from scripts.bench.fake_fec import synthesize_seat_sources
+
+    ctx.seed_candidates()
+    ctx.seat_dir = tempfile.TemporaryDirectory()
+    synthesize_seat_sources(ctx.fec.candidates, ctx.seat_dir.name)
+    get_settings().seat_data_dir = ctx.seat_dir.name
+
+
+async def _run_seats(ctx: BenchContext):
+    from app.pipelines.seats import build_seat_profiles
+    await build_seat_profiles(cycle=2026)
+
+
+def _setup_spend(ctx: BenchContext):
+    from scripts.bench.fake_fec import STATES
+
+    candidates = [f"00000000-0000-4000-8000-{i:012d}" for i in range(max(ctx.size // 4, 1))]
+    filings = []
+    for i in range(ctx.size):
+        candidate = candidates[i % len(candidates)]
+        filings.append({
+            "candidate_id": candidate,
+            "committee_id": None,
+            "jurisdiction": STATES[hash(candidate) % len(STATES)],
+            "period_end": f"{2021 + i % 4}-{i % 12 + 1:02d}-28",
+            "total_disbursements": float((i * 7919) % 250000),
+            "updated_at": "2025-01-01T00:00:00+00:00",
+        })
+    ctx.db.tables["filings"].load(filings)
+    ctx.db.tables["jurisdiction_profiles"].load([
+        {"name": state, "level": "state", "state": state} for state in STATES[:25]])
+
+
+async def _run_spend(ctx: BenchContext):
+    from app.pipelines.spend import aggregate_jurisdiction_spend
+
+    aggregate_jurisdiction_spend(full=True, cycle=2024)
+    # New filings land in two jurisdictions; only those are recomputed
+    touched = [r for r in ctx.db.tables["filings"].rows.values() if r["jurisdiction"] in ("WA", "OR")]
+    for row in touched[:max(len(touched) // 10, 1)]:
+        row["updated_at"] = "2025-06-01T00:00:00+00:00"
+    aggregate_jurisdiction_spend(cycle=2024)
+
+
+def _setup_signals(ctx: BenchContext):
+    from app.pipelines import signals
+
+    accounts = max(ctx.size // 10, 1)
+    ctx.db.tables["social_profiles"].load([
+        {"candidate_id": f"00000000-0000-4000-8000-{i:012d}", "platform": "bluesky", "handle": f"@cand{i}.bsky.social"}
+        for i in range(accounts)])
+    ctx.signal_dir = tempfile.TemporaryDirectory()
+    posts_path = os.path.join(ctx.signal_dir.name, "posts.jsonl")
+    with open(posts_path, "w") as f:
+        for i in range(ctx.size):
+            # One post in five is from an account we don't track
+            handle = f"other{i}.bsky.social" if i % 5 == 0 else f"cand{i % accounts}.bsky.social"
+            f.write(json.dumps({"handle": handle, "posted_at": f"2025-{i % 12 + 1:02d}-01T00:{i // 60 % 60:02d}:"
+                                f"{i % 60:02d}.{i:06d}Z", "text": f"post {i}"}) + "\n")
+    sources_path = os.path.join(ctx.signal_dir.name, "signal_sources.yml")
+    with open(sources_path, "w") as f:
+        json.dump({"sources": [{"name": "bench", "type": "jsonl", "platform": "bluesky", "path": posts_path}]}, f)
+    signals.SOURCES_PATH = sources_path
+
+
+async def _run_signals(ctx: BenchContext):
+    from app.db.signals import list_signals, set_status
+    from app.models.common import SignalStatus
+    from app.pipelines.signals import ingest_signals
+
+    await ingest_signals(["bench"])
+    # A reviewer works through the first pages of the queue, triaging as they go
+    cursor = None
+    for _ in range(20):
+        rows, cursor = list_signals(SignalStatus.NEW, 100, cursor)
+        set_status([r["signal_id"] for r in rows], SignalStatus.TRIAGED)
+        if cursor is None:
+            break
+
+
+def _setup_search(ctx: BenchContext):
+    from app.db.search import get_search_cache
+
+    ctx.seed_candidates()
+    names = [r["full_name"] for r in list(ctx.db.tables["candidates"].rows.values())[:10]]
+    # Five staff typing names character by character, twice each, plus a few misspellings
+    ctx.queries = [name[:n] for name in names[:5] for n in range(2, len(name) + 1)] * 2
+    ctx.queries += [name[:3] + name[4:] for name in names[5:]]
+    get_search_cache().clear()
+
+
+async def _run_search(ctx: BenchContext):
+    from app.api import routes
+
+    for q in ctx.queries:
+        await routes.search(q, limit=10, mentions=True)
+
+
+def _setup_documents(ctx: BenchContext):
+    ctx.seed_candidates(fraction=0.1)
+    # A tenth already went through a run, so their documents come from the cache
+    rows = list(ctx.db.tables["candidates"].rows.values())
+    ctx.db.tables["fec_documents"].load([{
+        "document_url": f"https://{DOCS_HOST}/cgi-bin/forms/{r['source_candidate_ID']}/"
+                        f"{int(''.join(ch for ch in r['source_candidate_ID'] if ch.isdigit()))}/",
+        "content_hash": "0" * 64, "fields": {"occupation": "Teacher"}} for r in rows[:len(rows) // 10]])
+
+
+async def _run_documents(ctx: BenchContext):
+    from app.pipelines.fec_documents import extract_candidate_documents
+    await extract_candidate_documents()
+
+
+def _setup_contributions(ctx: BenchContext):
+    from scripts.bench.fake_fec import synthesize_efile
+
+    # Itemizations outnumber candidates; ten rows per candidate over four filings
+    ctx.efile_dir = tempfile.TemporaryDirectory()
+    for i in range(4):
+        synthesize_efile(os.path.join(ctx.efile_dir.name, f"{1500000 + i}.fec"), ctx.size * 10 // 4)
+
+
+async def _run_contributions(ctx: BenchContext):
+    from app.pipelines.contributions import load_contributions
+    await load_contributions([ctx.efile_dir.name])
+
+
+def _setup_graph(ctx: BenchContext):
+    from app.graph.committees import committee_graph
+
+    ctx.seed_candidates()
+    candidates = list(ctx.db.tables["candidates"].rows)
+    # A principal committee each, and a leadership PAC or joint fundraiser per 20 candidates;
+    # treasurers are professionals who serve many committees
+    principals = [{"committee_id": f"10000000-0000-4000-8000-{i:012d}", "name": f"COMMITTEE {i}",
+                   "fec_committee_id": f"C{i:08d}", "designation": "P", "treasurer_name": f"TREASURER, {i % 500}"}
+                  for i in range(len(candidates))]
+    shared = [{"committee_id": f"20000000-0000-4000-8000-{i:012d}", "name": f"PAC {i}",
+               "fec_committee_id": f"C9{i:07d}", "designation": "D" if i % 2 else "J",
+               "treasurer_name": f"Treasurer. {i % 500}"} for i in range(max(len(candidates) // 20, 1))]
+    ctx.db.tables["committees"].load(principals + shared)
+    links = [{"candidate_id": c, "committee_id": principals[i]["committee_id"], "role": "Principal campaign committee"}
+             for i, c in enumerate(candidates)]
+    links += [{"candidate_id": c, "committee_id": shared[(i * 7919) % len(shared)]["committee_id"],
+               "role": "Leadership PAC" if (i * 7919) % len(shared) % 2 else "Joint fundraising committee"}
+              for i, c in enumerate(candidates) if i % 4 == 0]
+    ctx.db.tables["candidate_committees"].load(links)
+    ctx.graph_candidates = candidates[::max(len(candidates) // 200, 1)]
+    committee_graph.__init__()
+
+
+async def _run_graph(ctx: BenchContext):
+    from app.api import routes
+    from app.db.client import db
+    from app.graph.committees import committee_graph
+    from app.models.common import SharedVia
+
+    async def queries():
+        for c in ctx.graph_candidates:
+            await routes.graph_neighborhood(c, depth=2, limit=100)
+            await routes.graph_shared(c, SharedVia.COMMITTEE, "leadership", 50)
+            await routes.graph_shared(c, SharedVia.TREASURER, None, 50)
+
+    await queries()
+    # A treasurer change and a handful of new links arrive; the refresh reads only those rows
+    db.supabase.table('committees').update({"treasurer_name": "NEW TREASURER"})\
+        .eq('committee_id', '10000000-0000-4000-8000-000000000000').execute()
+    db.supabase.table('candidate_committees').upsert([
+        {"candidate_id": c, "committee_id": "20000000-0000-4000-8000-000000000000", "role": "Leadership PAC"}
+        for c in ctx.graph_candidates[:20]], on_conflict="candidate_id,committee_id").execute()
+    await committee_graph.refresh()
+    await queries()
+
+
+def _setup_dashboard(ctx: BenchContext):
+    from app.utils.cache import invalidate
+
+    ctx.seed_candidates()
+    invalidate("candidates", "committees", "candidate_committees", "filings")
+
+
+async def _run_dashboard(ctx: BenchContext):
+    import asyncio
+    from app.api import routes
+    from app.utils.cache import invalidate
+
+    # 50 dashboards poll the summary routes together, ten times; a job finishes halfway through
+    for poll in range(10):
+        if poll == 5:
+            invalidate("candidates")
+        await asyncio.gather(*(route() for route in (
+            routes.get_candidates, routes.enrichment_status, routes.count_and_check_duplicates) for _ in range(50)))
+
+
+def _setup_replay(ctx: BenchContext):
+    # A collection's pages and enrichment lookups as landed, over a table seeded with the wrong party
+    from app.config import get_settings
+    from app.landing import land
+
+    get_settings().landing_dir = ctx.landing_dir.name
+    ctx.seed_candidates(party="Democratic")
+    candidates = ctx.fec.candidates
+    for page, start in enumerate(range(0, len(candidates), 100), 1):
+        land("fec", "candidates", {"election_year": 2026, "page": page}, {"results": candidates[start:start + 100]})
+    for i, candidate in enumerate(candidates[:1000]):
+        land("fec", "candidate/committees", {"candidate_id": candidate["candidate_id"]},
+             {"results": [{"committee_id": f"C{i:08d}", "name": f"COMMITTEE {i}", "designation": "P"}]})
+
+
+async def _run_replay(ctx: BenchContext):
+    from app.landing.replay import replay_landing
+    await replay_landing()
+
+
+def _land_candidate_pages(ctx: BenchContext):
+    # As a collection run over the same searches would have left them
+    from app.config import get_settings
+    from app.landing import land
+
+    get_settings().landing_dir = ctx.landing_dir.name
+    candidates = ctx.fec.candidates
+    for page, start in enumerate(range(0, len(candidates), 100), 1):
+        land("fec", "candidates", {"election_year": 2026, "office": "H", "party": "DEM", "page": page},
+             {"results": candidates[start:start + 100]})
+
+
+def _setup_reconcile_consistent(ctx: BenchContext):
+    ctx.seed_candidates()
+    _land_candidate_pages(ctx)
+
+
+def _setup_reconcile_gaps(ctx: BenchContext):
+    # 1% missing, a handful of rows with a stale field
+    ctx.seed_candidates(fraction=0.99)
+    _land_candidate_pages(ctx)
+    for row in list(ctx.db.tables["candidates"].rows.values())[:5]:
+        row["status"] = "P"
+
+
+async def _run_reconcile(ctx: BenchContext):
+    from app.pipelines.reconcile import reconcile_candidates
+    await reconcile_candidates()
+
+
+SCENARIOS: Dict[str, tuple] = {
+    "backfill_initial": (_setup_backfill, _run_backfill),
+    "fill_gaps": (_setup_fill_gaps, _run_fill_gaps),
+    "dedup": (_setup_dedup, _run_dedup),
+    "enrichment": (_setup_enrichment, _run_enrichment),
+    "stats": (_setup_stats, _run_stats),
+    "push": (_setup_push, _run_push),
+    "seats": (_setup_seats, _run_seats),
+    "spend": (_setup_spend, _run_spend),
+    "signals": (_setup_signals, _run_signals),
+    "search": (_setup_search, _run_search),
+    "documents": (_setup_documents, _run_documents),
+    "contributions": (_setup_contributions, _run_contributions),
+    "graph": (_setup_graph, _run_graph),
+    "dashboard": (_setup_dashboard, _run_dashboard),
+    "replay": (_setup_replay, _run_replay),
+    "reconcile_consistent": (_setup_reconcile_consistent, _run_reconcile),
+    "reconcile_gaps": (_setup_reconcile_gaps, _run_reconcile),
+}
+
+
+def _measure(name: str, size: int, trace_memory: bool) -> Dict[str, Any]:
+    setup, run = SCENARIOS[name]
+    ctx = BenchContext(size)
+    setup(ctx)
+    install(ctx)
+    ctx.db.round_trips = 0
+    ctx.fec.calls.clear()
+    ctx.webhooks.requests.clear()
+    gc.collect()
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(run(ctx))
+    wall = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "wall_time_s": round(wall, 4),
+        "api_calls": ctx.api_calls,
+        "db_round_trips": ctx.db.round_trips,
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def measure(name: str, size: int) -> Dict[str, Any]:
+    """Time a clean run, then repeat under tracemalloc for peak memory"""
+    result = _measure(name, size, trace_memory=False)
+    result["peak_memory_mb"] = _measure(name, size, trace_memory=True)["peak_memory_mb"]
+    return result
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe every way `result` is worse than `baseline`"""
+    problems = []
+    allowed = baseline["wall_time_s"] * (1 + WALL_TIME_TOLERANCE) + WALL_TIME_SLACK_SECONDS
+    if result["wall_time_s"] > allowed:
+        problems.append(f"wall time {result['wall_time_s']}s > {allowed:.3f}s")
+    for key in ("api_calls", "db_round_trips"):
+        if result[key] > baseline[key]:
+            problems.append(f"{key} {result[key]} > {baseline[key]}")
+    allowed_mb = baseline["peak_memory_mb"] * (1 + MEMORY_TOLERANCE) + 1
+    if result["peak_memory_mb"] > allowed_mb:
+        problems.append(f"peak memory {result['peak_memory_mb']}MB > {allowed_mb:.1f}MB")
+    return problems
+
+
+def load_baseline() -> Dict[str, Any]:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def save_baseline(baseline: Dict[str, Any]):
+    with open(BASELINE_PATH, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--skip-importtime", action="store_true")
+    args = parser.parse_args(argv)
+
+    from app.utils.logging import setup_logging
+    setup_logging()
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    scenarios = [s.strip() for s in args.scenarios.split(",")]
+    baseline = load_baseline()
+    failures = 0
+
+    print(f"{'scenario':<20}{'size':>8}{'wall s':>10}{'api':>8}{'db rt':>8}{'peak MB':>10}  verdict")
+    for name in scenarios:
+        for size in sizes:
+            key = f"{name}@{size}"
+            result = measure(name, size)
+            if args.update_baseline:
+                baseline[key] = result
+                verdict = "recorded"
+            elif key not in baseline:
+                verdict = "no baseline"
+            else:
+                problems = compare(result, baseline[key])
+                verdict = "REGRESSION: " + "; ".join(problems) if problems else "ok"
+                failures += bool(problems)
+            print(f"{name:<20}{size:>8}{result['wall_time_s']:>10.3f}{result['api_calls']:>8}"
+                  f"{result['db_round_trips']:>8}{result['peak_memory_mb']:>10.1f}  {verdict}")
+
+    if args.update_baseline:
+        save_baseline(baseline)
+
+    if not args.skip_importtime:
+        from scripts.bench import importtime
+        print()
+        failures += importtime.main()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())